@@ -11,12 +11,17 @@ Steps:
    by 10 % on every side.
 3. Crop *every* frame to this final rectangle.
 4. Resize the crop to --dstH × --dstW and save it into the output folder.
+   Sprites whose pixels are identical to an earlier one are hard-linked to
+   it instead of being encoded again, and a dedup summary is printed.  With
+   --link-root the sprites already under that folder (other states, the
+   other colour) count as earlier ones too.
 
 Example
 -------
 python frames_to_sprites.py --frames frames/ \
                            --out sprites/ \
-                           --dstH 64 --dstW 64
+                           --dstH 64 --dstW 64 \
+                           --link-root pieces/
 """
 from __future__ import annotations
 
@@ -24,6 +29,8 @@ import cv2
 import numpy as np
 from pathlib import Path
 import argparse
+import hashlib
+import os
 from typing import Tuple, List
 
 # ---------------------------------------------------------------------------
@@ -69,12 +76,86 @@ def _expand_rect(rect: Tuple[int, int, int, int], w_max: int, h_max: int, margin
     new_y2 = min(h_max - 1, y2 + dy)
     return new_x1, new_y1, new_x2, new_y2
 
+
+def _content_key(img: np.ndarray) -> Tuple[Tuple[int, ...], str, bytes]:
+    """Key identifying a decoded frame by shape, dtype and pixel hash."""
+    digest = hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+    return img.shape, str(img.dtype), digest
+
+
+def _write_or_link(sprite: np.ndarray, out_fp: Path, seen: dict) -> bool:
+    """Write *sprite* to *out_fp*, hard-linking to an identical earlier sprite.
+
+    Returns True when the sprite was a duplicate.
+    """
+    key = _content_key(sprite)
+    first = seen.get(key)
+    if out_fp.exists():
+        # never write through an old hard link into another state's sprite
+        out_fp.unlink()
+    if first is not None:
+        try:
+            os.link(first, out_fp)
+        except OSError:
+            cv2.imwrite(str(out_fp), sprite)  # filesystem without hard links
+        return True
+    cv2.imwrite(str(out_fp), sprite)
+    seen[key] = out_fp
+    return False
+
+
+def _iter_sprites(root: Path):
+    """(path, decoded image) for every readable PNG under *root*."""
+    for fp in sorted(root.rglob("*.png")):
+        img = cv2.imread(str(fp), cv2.IMREAD_UNCHANGED)
+        if img is not None:
+            yield fp, img
+
+
+def index_sprites(root: Path, exclude: Path | None = None) -> dict:
+    """Content key -> first PNG under *root* with those pixels (skipping *exclude*).
+
+    Seeds process_frames' *seen* map, so sprites identical to ones already
+    compiled elsewhere under *root* are hard-linked to them.
+    """
+    seen: dict = {}
+    exclude = exclude.resolve() if exclude is not None else None
+    for fp, img in _iter_sprites(root):
+        if exclude is not None and fp.resolve().is_relative_to(exclude):
+            continue
+        seen.setdefault(_content_key(img), fp)
+    return seen
+
+
+def dedup_report(root: Path) -> Tuple[int, int, int]:
+    """Scan every PNG under *root* and report identical decoded frames.
+
+    Returns (frames, unique, bytes_saved) where *bytes_saved* is the decoded
+    memory that sharing identical frames saves.
+    """
+    seen = set()
+    frames = saved = 0
+    for _, img in _iter_sprites(root):
+        frames += 1
+        key = _content_key(img)
+        if key in seen:
+            saved += img.nbytes
+        else:
+            seen.add(key)
+    return frames, len(seen), saved
+
 # ---------------------------------------------------------------------------
 #                               PIPELINE
 # ---------------------------------------------------------------------------
 
 
-def process_frames(frames_dir: Path, out_dir: Path, dst_h: int, dst_w: int):
+def process_frames(frames_dir: Path, out_dir: Path, dst_h: int, dst_w: int, seen: dict | None = None):
+    """Compile *frames_dir* into sprites in *out_dir*.
+
+    *seen* maps content keys to sprites already written; pass the same dict
+    (or one from index_sprites) across calls to share identical sprites
+    between states and colours, not just within one folder.
+    """
     if not frames_dir.is_dir():
         raise FileNotFoundError(f"Input directory not found: {frames_dir}")
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -105,7 +186,10 @@ def process_frames(frames_dir: Path, out_dir: Path, dst_h: int, dst_w: int):
     union = _union_rect(rects)
     final_rect = _expand_rect(union, w_max, h_max)
 
-    # Pass 2: crop, resize, save
+    # Pass 2: crop, resize, save (identical sprites share one file)
+    if seen is None:
+        seen = {}
+    dups = saved = 0
     for fp in frame_paths:
         img = cv2.imread(str(fp), cv2.IMREAD_UNCHANGED)
         if img is None or img.shape[2] < 4:
@@ -114,8 +198,11 @@ def process_frames(frames_dir: Path, out_dir: Path, dst_h: int, dst_w: int):
         crop = img[y1:y2+1, x1:x2+1].copy()
         sprite = cv2.resize(crop, (dst_w, dst_h), interpolation=cv2.INTER_AREA)
         out_fp = out_dir / fp.name
-        cv2.imwrite(str(out_fp), sprite)
+        if _write_or_link(sprite, out_fp, seen):
+            dups += 1
+            saved += sprite.nbytes
     print(f"Processed {len(frame_paths)} frames → {out_dir}")
+    print(f"Dedup: {dups} duplicate sprites linked, {saved / 1024:.1f} KiB decoded memory saved")
 
 # ---------------------------------------------------------------------------
 #                               CLI ENTRY
@@ -124,13 +211,28 @@ def process_frames(frames_dir: Path, out_dir: Path, dst_h: int, dst_w: int):
 
 def main():
     ap = argparse.ArgumentParser(description="Convert RGBA video frames to cropped & resized sprites.")
-    ap.add_argument("--frames", required=True, help="Input directory containing RGBA frames")
-    ap.add_argument("--out", required=True, help="Output directory for sprites")
-    ap.add_argument("--dstH", type=int, required=True, help="Destination sprite height")
-    ap.add_argument("--dstW", type=int, required=True, help="Destination sprite width")
+    ap.add_argument("--frames", help="Input directory containing RGBA frames")
+    ap.add_argument("--out", help="Output directory for sprites")
+    ap.add_argument("--dstH", type=int, help="Destination sprite height")
+    ap.add_argument("--dstW", type=int, help="Destination sprite width")
+    ap.add_argument("--dedup-report", metavar="ROOT",
+                    help="Only report identical frames under ROOT (e.g. pieces/) and exit")
+    ap.add_argument("--link-root", metavar="ROOT",
+                    help="Also hard-link to identical sprites already under ROOT (e.g. pieces/)")
     args = ap.parse_args()
 
-    process_frames(Path(args.frames), Path(args.out), args.dstH, args.dstW)
+    if args.dedup_report:
+        frames, unique, saved = dedup_report(Path(args.dedup_report))
+        print(f"{frames} frames, {unique} unique, {saved / 1024:.1f} KiB decoded memory saved by sharing")
+        return
+
+    if not (args.frames and args.out and args.dstH and args.dstW):
+        ap.error("--frames, --out, --dstH and --dstW are required")
+
+    seen = None
+    if args.link_root and Path(args.link_root).is_dir():
+        seen = index_sprites(Path(args.link_root), exclude=Path(args.out))
+    process_frames(Path(args.frames), Path(args.out), args.dstH, args.dstW, seen)
 
 
 if __name__ == "__main__":
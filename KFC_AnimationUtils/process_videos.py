@@ -100,6 +100,9 @@ def process_video(video_path: Path) -> None:
             "128",
             "--dstW",
             "128",
+            # identical frames in other videos' sprites are hard-linked too
+            "--link-root",
+            str(SPRITES_ROOT),
         ]
     )
     if rc != 0:
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+
+class ClockSync:
+    """
+    NTP-style estimate of the server's game clock relative to ours.
+
+    Each exchange gives four stamps: t0 (we send), t1 (server receives),
+    t2 (server replies) on the server's clock, t3 (we receive) on ours.
+    rtt = (t3 - t0) - (t2 - t1) and offset = ((t1 - t0) + (t2 - t3)) / 2.
+    The offset is taken from the lowest-RTT sample in a small window (the
+    one least distorted by queueing); the RTT is smoothed like TCP's SRTT.
+    """
+
+    def __init__(self, window: int = 8, alpha: float = 0.125,
+                 clock: Callable[[], float] = lambda: time.monotonic() * 1000.0):
+        self._clock = clock
+        self._alpha = alpha
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)  # (rtt, offset)
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples = 0
+
+    def now_ms(self) -> float:
+        return self._clock()
+
+    def add_sample(self, t0: float, t1: float, t2: float, t3: float) -> None:
+        rtt = max(0.0, (t3 - t0) - (t2 - t1))
+        offset = ((t1 - t0) + (t2 - t3)) / 2.0
+        self._samples.append((rtt, offset))
+        self.samples += 1
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2.0
+        else:
+            self.rttvar = (1 - self._alpha / 2) * self.rttvar + (self._alpha / 2) * abs(self.srtt - rtt)
+            self.srtt = (1 - self._alpha) * self.srtt + self._alpha * rtt
+
+    @property
+    def synced(self) -> bool:
+        return bool(self._samples)
+
+    @property
+    def offset_ms(self) -> Optional[float]:
+        """server clock - our clock (None until the first sample)."""
+        if not self._samples:
+            return None
+        return min(self._samples)[1]
+
+    def server_now_ms(self) -> float:
+        """Our estimate of the server's game time right now."""
+        return self._clock() + (self.offset_ms or 0.0)
+
+    def reset(self) -> None:
+        """Forget everything (a new server run has a new clock)."""
+        self._samples.clear()
+        self.srtt = self.rttvar = None
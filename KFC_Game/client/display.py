@@ -6,6 +6,8 @@ from typing import Optional
 class NullDisplay:
     def present(self, img):  # img: numpy array (H,W,3|4)
         pass
+    def poll(self):
+        pass
     def close(self):
         pass
 
@@ -32,6 +34,10 @@ class Cv2Display:
         
         self.cv2.waitKey(1)
 
+    def poll(self):
+        # keep the window responsive on ticks where nothing was redrawn
+        self.cv2.waitKey(1)
+
     def close(self):
         try:
             self.cv2.destroyWindow(self.window_name)
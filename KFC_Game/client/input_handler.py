@@ -6,22 +6,35 @@ from ..config.input_maps import P1_MAP, P2_MAP
 
 
 class ToWSQueue:
-    """Adapter to send commands via WebSocket client."""
-    def __init__(self, ws_client, loop):
+    """Adapter to send commands via WebSocket client (predicting moves first, if given a predictor)."""
+    def __init__(self, ws_client, loop, predictor=None):
         self.ws = ws_client
         self.loop = loop
+        self.predictor = predictor
 
     def put(self, cmd):
         import asyncio
+        if self.predictor is not None:
+            # the predictor belongs to the event loop's thread
+            self.loop.call_soon_threadsafe(self._predict_and_send, cmd)
+            return
         # Schedule the coroutine to run in the main event loop from another thread
         future = asyncio.run_coroutine_threadsafe(self.ws.send_command(cmd), self.loop)
 
+    def _predict_and_send(self, cmd):
+        import asyncio
+        # stamp first: the server starts the move at cmd.timestamp, so the
+        # predicted motion must start there too or it jumps on confirmation
+        in_server_time = self.ws.stamp_command(cmd)
+        self.predictor.predict(cmd, start_ms=cmd.timestamp if in_server_time else None)
+        asyncio.ensure_future(self.ws.send_command(cmd, stamped=True))
+
     async def send_command(self, cmd):
         """Direct async method for sending commands."""
         await self.ws.send_command(cmd)
 
 
-def setup_input_handling(game, ws_client, player, board_mirror=None):
+def setup_input_handling(game, ws_client, player, board_mirror=None, predictor=None):
     """
     Setup input handling for client mode.
     
@@ -30,6 +43,7 @@ def setup_input_handling(game, ws_client, player, board_mirror=None):
         ws_client: WebSocket client
         player: Player color ("W" or "B")
         board_mirror: BoardMirror instance for accurate state
+        predictor: optional MovePredictor that shows our moves before the server confirms them
     
     Returns:
         KeyboardProducer instance
@@ -42,7 +56,7 @@ def setup_input_handling(game, ws_client, player, board_mirror=None):
     
     kb = KeyboardProducer(
         game, 
-        ToWSQueue(ws_client, asyncio.get_event_loop()), 
+        ToWSQueue(ws_client, asyncio.get_event_loop(), predictor), 
         kp, 
         player=player_num, 
         board_mirror=board_mirror
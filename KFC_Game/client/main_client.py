@@ -8,7 +8,7 @@ from pathlib import Path
 # Import shared components
 from ..server.game_factory import create_game
 from ..graphics.graphics_factory import ImgFactory
-from ..config.settings import PIECES_DIR, WS_HOST, WS_PORT
+from ..config.settings import PIECES_DIR, WS_HOST, WS_PORT, PREDICT_MOVES
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +28,17 @@ async def run_client(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, player:
     
     try:
         # Create game instance for client - this will properly subscribe to all events including move_history
-        game = create_game(PIECES_DIR, ImgFactory())
+        game = create_game(PIECES_DIR, ImgFactory(), lazy_sprites=True)
         
         # Import client-specific modules
         from .ws_client import WSClient
         from .event_bridge import EventBridge
         from .renderer import ClientRenderer
         from .display import Cv2Display
-        from .render_loop import ClientRenderLoop
+        from .render_thread import ClientRenderThread
         from .ui_state_sync import BoardMirror, subscribe_state_sync, subscribe_render
         from .input_handler import setup_input_handling
+        from .prediction import MovePredictor, rules_from_pieces
         
         # Setup WebSocket connection
         ws_uri = f"ws://{host}:{port}"
@@ -55,14 +56,15 @@ async def run_client(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, player:
         # Setup renderer and display
         player_num = 1 if player == "W" else 2
         renderer = ClientRenderer(game.board, PIECES_DIR, ImgFactory(), player_num=player_num)
-        subscribe_render(game.bus, renderer)
+        predictor = MovePredictor(rules_from_pieces(game.pieces), color=player) if PREDICT_MOVES else None
+        subscribe_render(game.bus, renderer, predictor)
         
-        display = Cv2Display("Kung Fu Chess")
-        render_loop = ClientRenderLoop(renderer, hz=60.0, display=display)
-        render_loop.start()
+        render_thread = ClientRenderThread(renderer, hz=60.0,
+                                           display_factory=lambda: Cv2Display("Kung Fu Chess"))
+        render_thread.start()
         
         # Setup input handling
-        input_handler = setup_input_handling(game, ws_client, player, board_mirror)
+        input_handler = setup_input_handling(game, ws_client, player, board_mirror, predictor)
         input_handler.start()
         
         # Main client loop
@@ -72,8 +74,8 @@ async def run_client(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, player:
         except KeyboardInterrupt:
             pass
         finally:
-            await render_loop.stop()
-            display.close()
+            render_thread.stop()
+            logger.info("render stats: %s", render_thread.stats())
             
     except Exception as e:
         logger.error(f"Client error: {e}")
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..shared.command import Command
+from ..shared.moves import Moves
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class PieceRules:
+    """One piece type's state machine, as far as the client needs it to predict moves."""
+    moves: Dict[str, Tuple[Moves, bool]]  # idle state -> (move table, needs a clear path)
+    speed_m_s: float                      # of the move state
+    after: Dict[str, str]                 # state -> state its "done" leads to
+    duration_ms: Dict[str, float]         # rest/jump state -> how long it lasts
+    cell_m: Tuple[float, float]           # (row, col) size of a cell in metres
+
+    def travel_ms(self, src, dst) -> float:
+        dist = math.hypot((dst[0] - src[0]) * self.cell_m[0], (dst[1] - src[1]) * self.cell_m[1])
+        return dist / self.speed_m_s * 1000.0
+
+
+def rules_from_pieces(pieces) -> Dict[str, PieceRules]:
+    """
+    Per piece type ("PW", "NB", ...), walked from each piece's current state:
+    the move tables of its idle states, the move speed and the timed states
+    that follow a move or jump.  A freshly created client-side Game's pieces
+    (all idle) reach every state.
+    """
+    rules: Dict[str, PieceRules] = {}
+    for p in pieces:
+        kind = p.id.split("_", 1)[0]
+        if kind in rules:
+            continue
+        states, todo = {}, [p.state]
+        while todo:
+            st = todo.pop()
+            if st.name in states:
+                continue
+            states[st.name] = st
+            todo.extend(st.transitions.values())
+        moves, after, duration, speed = {}, {}, {}, None
+        for name, st in states.items():
+            if st.moves is not None and "move" in st.transitions:
+                moves[name] = (st.moves, st.physics.is_need_clear_path())
+            if "done" in st.transitions:
+                after[name] = st.transitions["done"].name
+            if hasattr(st.physics, "duration_s"):
+                duration[name] = st.physics.duration_s * 1000.0
+            speed = getattr(st.physics, "speed_m_s", None) or speed
+        if moves and speed:
+            board = p.state.physics.board
+            rules[kind] = PieceRules(moves, speed, after, duration, (board.cell_H_m, board.cell_W_m))
+    return rules
+
+
+@dataclass
+class Prediction:
+    cmd_id: str
+    piece_id: str
+    src: Cell
+    dst: Cell
+    start_ms: float        # server game time the move starts
+    speed_m_s: float
+    made_ms: float         # our clock, for the timeout
+    applied: bool = False  # the server's "applied" result has arrived
+
+    def motion(self) -> dict:
+        return {"from": list(self.src), "to": list(self.dst),
+                "start_ms": int(self.start_ms), "speed_m_s": self.speed_m_s}
+
+
+class MovePredictor:
+    """
+    Client-side prediction of the local player's own moves.
+
+    predict() checks a move against the latest authoritative snapshot with
+    the same Moves tables and state rules the server applies, and if the
+    server would start it, shows the piece moving at once: every snapshot
+    handed on to *submit* (normally the renderer) carries the predicted
+    "motion".  Snapshots and COMMAND_RESULTs then reconcile.  A prediction
+    the server shows moving to the same square (or arrived, or captured) is
+    done and the server's own motion takes over; a "rejected" result or a
+    snapshot that contradicts it rolls it back, and the piece snaps back to
+    where the server has it.  So does no word within *timeout_ms*, checked
+    on an event-loop timer (or by calling tick()).
+
+    Snapshots only go out when something moves, so a piece's entry may be
+    stale: whether it is idle is worked out by running its state machine
+    forward from the entry's motion/until_ms to the estimated server time.
+
+    Not thread-safe: call everything from the event loop's thread.
+    """
+
+    def __init__(self, rules: Dict[str, PieceRules], submit: Optional[Callable[[dict], Any]] = None, *,
+                 color: Optional[str] = None, timeout_ms: float = 1000.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._rules = rules
+        self.submit = submit
+        self._color = color  # only this side's pieces are predicted (None = any)
+        self._timeout_ms = timeout_ms
+        self._clock = clock
+        self._snapshot: Optional[dict] = None
+        self._received_ms = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.pending: Dict[str, Prediction] = {}  # cmd_id -> prediction
+        self.predicted = 0
+        self.confirmed = 0
+        self.rollbacks: Counter = Counter()  # reason -> count
+        self.last_rollback: Optional[Tuple[str, str]] = None  # (piece_id, reason)
+
+    def _local_ms(self) -> float:
+        return self._clock() * 1000.0
+
+    def server_now_ms(self) -> Optional[float]:
+        """Server game time extrapolated from the last snapshot (like the renderer does)."""
+        if self._snapshot is None or self._snapshot.get("time_ms") is None:
+            return None
+        return self._snapshot["time_ms"] + (self._local_ms() - self._received_ms)
+
+    def _pieces(self) -> Dict[str, dict]:
+        return {p["id"]: p for p in self._snapshot.get("pieces", [])} if self._snapshot else {}
+
+    @staticmethod
+    def _at(entry: dict, rules: Optional[PieceRules], now_ms: float) -> Tuple[Optional[str], Cell]:
+        """(state, cell) of a piece at *now_ms*; the state is None while a timed one is still running."""
+        state, until = entry.get("state"), entry.get("until_ms")
+        cell = tuple(entry["cell"])
+        motion = entry.get("motion")
+        if motion is not None:
+            if rules is None:
+                return None, cell
+            state = "move"
+            until = motion["start_ms"] + rules.travel_ms(motion["from"], motion["to"])
+            if now_ms >= until:
+                cell = tuple(motion["to"])
+        while until is not None and now_ms >= until:
+            state = rules.after.get(state) if rules is not None else None
+            if state is None:
+                return None, cell  # a state nothing leads out of
+            until = until + rules.duration_ms[state] if state in rules.duration_ms else None
+        return (None if until is not None else state), cell
+
+    def check(self, piece_id: str, dst) -> Optional[str]:
+        """Why moving *piece_id* to *dst* would not start now (None = it would)."""
+        now = self.server_now_ms()
+        if now is None:
+            return "no snapshot"
+        pieces = self._pieces()
+        entry = pieces.get(piece_id)
+        if entry is None:
+            return "unknown piece"
+        if self._color is not None and piece_id[1] != self._color:
+            return "wrong player"
+        rules = self._rules.get(piece_id.split("_", 1)[0])
+        if rules is None:
+            return "no rules"
+        state, src = self._at(entry, rules, now)
+        if state not in rules.moves or any(p.piece_id == piece_id for p in self.pending.values()):
+            return "busy"  # the server would defer it until the piece is idle
+        cell2piece: Dict[Cell, list] = {}
+        for p in pieces.values():
+            cell = self._at(p, self._rules.get(p["id"].split("_", 1)[0]), now)[1]
+            cell2piece.setdefault(cell, []).append(SimpleNamespace(id=p["id"]))
+        moves, need_clear_path = rules.moves[state]
+        if not moves.is_valid(src, tuple(dst), cell2piece, need_clear_path, piece_id[1]):
+            return "illegal move"
+        return None
+
+    def predict(self, cmd: Command, start_ms: Optional[float] = None) -> bool:
+        """
+        Show *cmd* (a "move") at once if the server would accept it; gives it
+        a cmd_id.  *start_ms* is the server time the server will start the
+        move at (the command's server-time stamp); defaults to our estimate.
+        """
+        if cmd.type != "move" or len(cmd.params) < 2:
+            return False
+        reason = self.check(cmd.piece_id, cmd.params[1])
+        if reason is not None:
+            logger.debug("not predicting %s: %s", cmd, reason)
+            return False
+        if cmd.cmd_id is None:
+            cmd.cmd_id = uuid.uuid4().hex
+        rules = self._rules[cmd.piece_id.split("_", 1)[0]]
+        now = self.server_now_ms()
+        src = self._at(self._pieces()[cmd.piece_id], rules, now)[1]
+        self.pending[cmd.cmd_id] = Prediction(cmd.cmd_id, cmd.piece_id, src, tuple(cmd.params[1]),
+                                              now if start_ms is None else start_ms,
+                                              rules.speed_m_s, self._local_ms())
+        self.predicted += 1
+        self._show()
+        self._schedule_tick()
+        return True
+
+    @staticmethod
+    def _shows(entry: dict, pred: Prediction) -> bool:
+        motion = entry.get("motion")
+        if motion is not None:
+            return tuple(motion["to"]) == pred.dst
+        return tuple(entry["cell"]) == pred.dst
+
+    def on_snapshot(self, payload: dict) -> None:
+        """Adopt an authoritative snapshot, reconcile the pending predictions and show the result."""
+        self._snapshot = payload
+        self._received_ms = self._local_ms()
+        pieces = self._pieces()
+        for pred in list(self.pending.values()):
+            entry = pieces.get(pred.piece_id)
+            if entry is None or self._shows(entry, pred):
+                del self.pending[pred.cmd_id]  # captured on the way counts as resolved too
+                self.confirmed += 1
+            elif pred.applied or tuple(entry["cell"]) != pred.src:
+                self._roll_back(pred, "overridden")
+        self._expire()
+        self._show()
+
+    def on_result(self, payload: dict) -> None:
+        """COMMAND_RESULT: a rejection rolls the move back with the server's reason."""
+        pred = self.pending.get(payload.get("cmd_id"))
+        if pred is None:
+            return
+        status = payload.get("status")
+        if status == "rejected":
+            self._roll_back(pred, payload.get("reason") or "rejected")
+            self._show()
+        elif status == "applied":
+            pred.applied = True
+
+    def tick(self) -> None:
+        """Roll back predictions the server has not answered within timeout_ms."""
+        if self._expire():
+            self._show()
+        self._schedule_tick()
+
+    def _expire(self) -> int:
+        now = self._local_ms()
+        expired = [p for p in self.pending.values() if now - p.made_ms >= self._timeout_ms]
+        for pred in expired:
+            self._roll_back(pred, "timeout")
+        return len(expired)
+
+    def _schedule_tick(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self.pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (tests, tools): the owner calls tick()
+        due = min(p.made_ms for p in self.pending.values()) + self._timeout_ms
+        self._timer = loop.call_later(max(0.0, due - self._local_ms()) / 1000.0, self.tick)
+
+    def _roll_back(self, pred: Prediction, reason: str) -> None:
+        del self.pending[pred.cmd_id]
+        self.rollbacks[reason] += 1
+        self.last_rollback = (pred.piece_id, reason)
+        logger.info("rolled back predicted move of %s %s -> %s: %s", pred.piece_id, pred.src, pred.dst, reason)
+
+    def overlay(self) -> Optional[dict]:
+        """The last snapshot, advanced to now, with the predicted moves in motion."""
+        if self._snapshot is None:
+            return None
+        by_piece = {p.piece_id: p for p in self.pending.values()}
+        out = dict(self._snapshot)
+        out["time_ms"] = self.server_now_ms()
+        out["pieces"] = [dict(e, state="move", motion=by_piece[e["id"]].motion()) if e["id"] in by_piece else e
+                         for e in self._snapshot.get("pieces", [])]
+        return out
+
+    def _show(self) -> None:
+        if self.submit is not None and self._snapshot is not None:
+            self.submit(self.overlay())
+
+    def stats(self) -> dict:
+        return {"predicted": self.predicted, "confirmed": self.confirmed,
+                "pending": len(self.pending), "rollbacks": dict(self.rollbacks)}
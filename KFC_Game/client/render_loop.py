@@ -4,12 +4,15 @@ import logging
 import asyncio
 import contextlib
 
+from ..shared.scheduler import FixedRateScheduler
+
 class ClientRenderLoop:
     """
     Simple client-side render ticker.
-    Calls renderer.frame() at a fixed rate (hz). You can later extend it to:
-    - interpolate positions between snapshots
-    - present frames to a window
+    Calls renderer.frame() at a fixed rate (hz) and presents it. Renderers
+    exposing needs_frame() are only asked for a frame when the state, cursor
+    or an animation changed; idle ticks just let the display poll its window.
+    Pacing uses absolute deadlines, so draw cost does not lower the frame rate.
     """
     def __init__(self, renderer, hz: float = 60.0, display=None):
         self.renderer = renderer
@@ -18,11 +21,21 @@ class ClientRenderLoop:
         self._task = None
         self._running = False
         self.frames = 0
+        self.skipped = 0  # ticks with nothing new to draw
+        self.scheduler = FixedRateScheduler(hz, catch_up=False)
 
     async def _run(self):
-        period = 1.0 / self.hz if self.hz and self.hz > 0 else 0.0
         try:
+            needs_frame = getattr(self.renderer, "needs_frame", None)
+            poll = getattr(self.display, "poll", None)
             while self._running:
+                if needs_frame is not None and not needs_frame():
+                    self.skipped += 1
+                    if poll is not None:
+                        poll()
+                    await self.scheduler.wait()
+                    continue
+
                 # pull the current frame from the renderer (side effects update the board image)
                 frame = self.renderer.frame()
                 self.frames += 1
@@ -35,7 +48,7 @@ class ClientRenderLoop:
                 if self.display is not None:
                     self.display.present(frame)
                 # yield control at a steady cadence
-                await asyncio.sleep(period)
+                await self.scheduler.wait()
         except asyncio.CancelledError:
             pass
 
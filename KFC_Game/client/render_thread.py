@@ -0,0 +1,82 @@
+# KFC_Game/client/render_thread.py
+from __future__ import annotations
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from ..shared.scheduler import FixedRateScheduler
+from ..shared.stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRenderThread(threading.Thread):
+    """
+    Render + present on a dedicated thread, off the asyncio loop.
+
+    The thread creates (and therefore owns) the display window through
+    *display_factory*.  The network side only hands snapshots over via
+    renderer.submit_snapshot() (a lock-free mailbox), so cv2.imshow/waitKey
+    and the drawing itself never delay WebSocket reads or command sends.
+    Frame times and dropped frames (missed display deadlines) are tracked.
+    """
+
+    def __init__(self, renderer, hz: float = 60.0,
+                 display_factory: Optional[Callable[[], object]] = None,
+                 stats_window: int = 600):
+        super().__init__(daemon=True, name="client-render")
+        self.renderer = renderer
+        self.hz = hz
+        self._display_factory = display_factory
+        self._stop_evt = threading.Event()
+        self.frames = 0
+        self.skipped = 0        # ticks with nothing new to draw
+        self.frame_ms = RollingStats(stats_window)
+        self.scheduler = FixedRateScheduler(hz, catch_up=False, window=stats_window)
+
+    @property
+    def dropped(self) -> int:
+        """Display deadlines missed because a tick overran."""
+        return self.scheduler.dropped
+
+    def run(self):
+        display = self._display_factory() if self._display_factory else None
+        needs_frame = getattr(self.renderer, "needs_frame", None)
+        poll = getattr(display, "poll", None)
+        try:
+            while not self._stop_evt.is_set():
+                t0 = time.perf_counter()
+                try:
+                    if needs_frame is None or needs_frame():
+                        frame = self.renderer.frame()
+                        if display is not None:
+                            display.present(frame)
+                        self.frames += 1
+                        self.frame_ms.add((time.perf_counter() - t0) * 1000.0)
+                    else:
+                        self.skipped += 1
+                        if poll is not None:
+                            poll()
+                except Exception:
+                    logger.exception("render tick failed")
+
+                self.scheduler.wait_blocking(self._stop_evt)
+        finally:
+            if display is not None:
+                display.close()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_evt.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "coalesced_snapshots": getattr(self.renderer, "coalesced", 0),
+            "frame_ms": self.frame_ms.summary(),
+            "pacing": self.scheduler.stats(),
+        }
@@ -1,25 +1,51 @@
 # KFC_Game/client/renderer.py
 from __future__ import annotations
 import logging
-from typing import Dict, Any, Tuple
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 from ..shared.board import Board
 from ..graphics.graphics_factory import GraphicsFactory, ImgFactory
 from ..graphics.graphics import Graphics
+from ..shared.img import Img
+from ..shared.physics import MovePhysics
 
 class ClientRenderer:
     """
     Render snapshot payloads onto the board image.
-    Caches per‑piece‑type sprites (idle) at board cell size.
+    Caches per‑piece‑type sprites (idle) at board cell size, and the static
+    layers (table background + board) composited once; every snapshot starts
+    from a copy of that composite in a preallocated framebuffer.
+    Pieces whose snapshot entry carries "motion" are interpolated locally on
+    every frame() with the same math as MovePhysics.
     """
-    def __init__(self, board: Board, pieces_root: Path, img_factory=None, player_num: int = None, keyboard_processor=None):
+    def __init__(self, board: Board, pieces_root: Path, img_factory=None, player_num: int = None, keyboard_processor=None,
+                 clock: Callable[[], float] = time.monotonic):
         self._board = board
         self._pieces_root = Path(pieces_root)
         self._gfx_factory = GraphicsFactory(img_factory or ImgFactory())
         self._cache: Dict[str, Graphics] = {}  # key: "PW"/"KB"/...
         self._player_num = player_num  # Current player number (1 for White, 2 for Black)
         self._keyboard_processor = keyboard_processor  # Reference to local keyboard processor for cursor
+        self._static: Optional[Img] = None       # background + board, built once
+        # two preallocated framebuffers: draw into the back one, then flip, so the
+        # frame handed to the display is never the one being drawn
+        self._framebuffers: list[Img] = []
+        self._back = 0
+        self._clock = clock
+        self._payload: Optional[Dict[str, Any]] = None
+        self._received_ms = 0.0      # local clock when the snapshot arrived
+        self._in_flight = False      # some piece is still interpolating
+        # lock-free handoff from the network side: one (seq, payload) tuple is
+        # swapped in atomically; the render side draws the newest seq only
+        self._mailbox: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._submitted = 0
+        self._drawn_seq = 0
+        self.coalesced = 0           # snapshots replaced before they were drawn
+        self._drawn_cursor = None
         
         # Ensure board image is loaded
         if self._board.img is None:
@@ -62,62 +88,124 @@ class ClientRenderer:
             self._cache[type_name] = g
         return g
 
-    def render_snapshot(self, payload: Dict[str, Any]) -> None:
-        if self._board.img is None:
-            logging.error("Failed to load board image")
-            return
-            
-        # Start with a fresh copy of the background
+    def _static_layers(self) -> Img:
+        """Background with the chess board centred on it, decoded and composited once."""
+        if self._static is not None:
+            return self._static
+
         bg_path = str(Path(__file__).resolve().parent.parent.parent / "table_bg_13in.png")
         if Path(bg_path).exists():
-            canvas = self._gfx_factory._img_factory(bg_path, (1920, 1080))
+            static = self._gfx_factory._img_factory(bg_path, (1920, 1080))
         else:
-            canvas = self._board.img.copy()
-        
+            static = self._board.img.copy()
+
         # Draw the chess board on top of the background
         board_path = str(Path(__file__).resolve().parent.parent.parent / "pieces" / "board.png")
         if Path(board_path).exists():
             board_img = self._gfx_factory._img_factory(board_path, (512, 512))
             # Center the board on the background
-            board_x = (canvas.img.shape[1] - 512) // 2  # Center horizontally
-            board_y = (canvas.img.shape[0] - 512) // 2  # Center vertically
-            board_img.draw_on(canvas, board_x, board_y)
-            # logging.debug(f"Drew chess board at position ({board_x}, {board_y})")
-            
+            board_x = (static.img.shape[1] - 512) // 2  # Center horizontally
+            board_y = (static.img.shape[0] - 512) // 2  # Center vertically
+            board_img.draw_on(static, board_x, board_y)
+
+        self._static = static
+        self._framebuffers = [static.copy(), static.copy()]
+        return static
+
+    def invalidate_static(self) -> None:
+        """Drop the cached background/board composite (e.g. after a theme change)."""
+        self._static = None
+        self._framebuffers = []
+
+    def _local_ms(self) -> float:
+        return self._clock() * 1000.0
+
+    def server_now_ms(self) -> Optional[float]:
+        """Estimated server game time, extrapolated from the last snapshot's time_ms."""
+        if self._payload is None or self._payload.get("time_ms") is None:
+            return None
+        return self._payload["time_ms"] + (self._local_ms() - self._received_ms)
+
+    def _piece_pixel(self, p: Dict[str, Any], now_ms: Optional[float]) -> Optional[Tuple[int, int]]:
+        """Board-relative pixel of a piece; moving pieces are interpolated to *now_ms*."""
+        motion = p.get("motion")
+        if motion and now_ms is not None:
+            elapsed = max(0.0, now_ms - motion["start_ms"])
+            pos, arrived = MovePhysics.interpolate(self._board, tuple(motion["from"]), tuple(motion["to"]),
+                                                   motion["speed_m_s"], elapsed)
+            if arrived:
+                pos = self._board.cell_to_m(tuple(motion["to"]))
+            else:
+                self._in_flight = True
+            return self._board.m_to_pix(pos)
+
+        cell = tuple(p["cell"]) if isinstance(p.get("cell"), (list, tuple)) else p.get("cell")
+        if cell is None:
+            return None
+        # cell[0] is row (0-7), cell[1] is column (0-7)
+        row, col = cell[0], cell[1]
+        return col * 64, row * 64
+
+    def submit_snapshot(self, payload: Dict[str, Any]) -> None:
+        """Remember the newest snapshot; it is drawn on the next frame(). Bursts coalesce."""
+        self._submitted += 1
+        self._mailbox = (self._submitted, payload)
+
+    def needs_frame(self) -> bool:
+        """True when the next frame() would differ from the last one drawn."""
+        box = self._mailbox
+        if box is not None and box[0] != self._drawn_seq:
+            return True
+        if self._payload is None:
+            return False  # nothing drawn yet
+        if self._in_flight:
+            return True
+        if self._keyboard_processor is not None:
+            return tuple(self._keyboard_processor.get_cursor()) != self._drawn_cursor
+        return False
+
+    def render_snapshot(self, payload: Dict[str, Any]) -> None:
+        if self._board.img is None:
+            logging.error("Failed to load board image")
+            return
+        self._payload = payload
+        self._received_ms = self._local_ms()
+        self._draw(payload, self.server_now_ms())
+
+    def _draw(self, payload: Dict[str, Any], now_ms: Optional[float]) -> None:
+        self._in_flight = False
+
+        # Start from the cached static composite, copied into the reused framebuffer
+        static = self._static_layers()
+        canvas = self._framebuffers[self._back]
+        np.copyto(canvas.img, static.img)
+
         pieces = payload.get("pieces", [])
         # logging.debug(f"Rendering snapshot with {len(pieces)} pieces")
 
+        # Calculate position on the board (centered on background)
+        board_x_offset = (canvas.img.shape[1] - 512) // 2
+        board_y_offset = (canvas.img.shape[0] - 512) // 2
+
         for p in pieces:
             pid = p["id"]
-            cell = tuple(p["cell"]) if isinstance(p.get("cell"), (list, tuple)) else p.get("cell")
-            if cell is None:
+            pix = self._piece_pixel(p, now_ms)
+            if pix is None:
                 continue
-            
-            # Fix coordinate mapping: chess notation (row, col) to screen coordinates
-            # cell[0] is row (0-7), cell[1] is column (0-7)
-            row, col = cell[0], cell[1]
-            
-            # Calculate position on the board (centered on background)
-            board_x_offset = (canvas.img.shape[1] - 512) // 2
-            board_y_offset = (canvas.img.shape[0] - 512) // 2
-            
-            # Calculate cell position within the board
-            cell_x = col * 64 + 32  # column * cell_width + center_offset
-            cell_y = row * 64 + 32  # row * cell_height + center_offset
-            
+
             # Final position on canvas
-            sprite_x = board_x_offset + cell_x - 32  # center the sprite
-            sprite_y = board_y_offset + cell_y - 32
-            
-            # Center the sprite on the cell
+            sprite_x = board_x_offset + pix[0]
+            sprite_y = board_y_offset + pix[1]
+
             sprite = self._sprite(self._type_name(pid)).get_img()
-            
-            logging.debug(f"Drawing piece {pid} at cell ({row}, {col}) -> pixel ({sprite_x}, {sprite_y})")
+
+            logging.debug(f"Drawing piece {pid} -> pixel ({sprite_x}, {sprite_y})")
             sprite.draw_on(canvas, sprite_x, sprite_y)
 
         # Draw local player cursor (selection indicator)
         if self._keyboard_processor is not None:
             cursor_cell = self._keyboard_processor.get_cursor()
+            self._drawn_cursor = tuple(cursor_cell)
             row, col = cursor_cell[0], cursor_cell[1]
             
             # Calculate cursor position
@@ -139,10 +227,19 @@ class ClientRenderer:
             logging.debug(f"Drawing local cursor for player {self._player_num} at cell ({row}, {col}) -> rect ({x1}, {y1}) to ({x2}, {y2})")
 
         self._board.img = canvas
+        self._back ^= 1
 
     def frame(self):
         if self._board.img is None:
             logging.error("Board image is None in frame()")
             return None
+        box = self._mailbox
+        if box is not None and box[0] != self._drawn_seq:
+            self.coalesced += box[0] - self._drawn_seq - 1
+            self._drawn_seq = box[0]
+            self.render_snapshot(box[1])
+        elif self._payload is not None and self.needs_frame():
+            # advance moving pieces / cursor to the display time
+            self._draw(self._payload, self.server_now_ms())
         # logging.debug(f"Returning board image with shape {self._board.img.img.shape}")
         return self._board.img.img  # Return the actual numpy array, not the wrapper
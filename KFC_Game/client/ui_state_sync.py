@@ -17,9 +17,19 @@ def subscribe_state_sync(bus, board_ui):
         board_ui.replace_all(evt.payload["pieces"])
     bus.subscribe(EventType.STATE_SNAPSHOT, on_snapshot)
 
-def subscribe_render(bus, renderer):
+def subscribe_render(bus, renderer, predictor=None):
+    # Renderers that support it only mark the snapshot as pending here; the
+    # render loop draws it at most once per display frame.
+    submit = getattr(renderer, "submit_snapshot", None) or renderer.render_snapshot
+    if predictor is not None:
+        # snapshots reach the renderer through the predictor, with our own
+        # not-yet-confirmed moves already in motion
+        predictor.submit = submit
+        submit = predictor.on_snapshot
+        bus.subscribe(EventType.COMMAND_RESULT, lambda evt: predictor.on_result(evt.payload))
+
     def on_snapshot(evt):
-        renderer.render_snapshot(evt.payload)
+        submit(evt.payload)
     bus.subscribe(EventType.STATE_SNAPSHOT, on_snapshot)
     
     # Subscribe to player assignment events to know which cursor to show
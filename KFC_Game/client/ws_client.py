@@ -1,14 +1,20 @@
 import asyncio, websockets
 import json
+import time
 import uuid
+from collections import OrderedDict
 from ..network.transport import TransportClient
-from ..network.protocol import command_to_json, event_from_json
+from .clock_sync import ClockSync
+from ..network.protocol import command_to_json, events_from_json
+from ..network.snapshots import apply_delta
 from ..shared.command import Command
-from ..shared.event import Event
+from ..shared.event import Event, EventType
+from ..shared.latency import LatencyTracker, server_stages
 
 
 class WSClient(TransportClient):
-    def __init__(self, uri: str,  *, ping_interval: float = 10.0, ping_timeout: float = 5.0):
+    def __init__(self, uri: str,  *, ping_interval: float = 10.0, ping_timeout: float = 5.0,
+                 stamp_server_time: bool = True, sync_probes: int = 4):
         self._uri = uri
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._player: str = "W"
@@ -16,13 +22,20 @@ class WSClient(TransportClient):
         self._ping_interval = ping_interval
         self._ping_timeout = ping_timeout
         self._lock = asyncio.Lock()
+        self._snapshot: dict | None = None  # last full state, base for STATE_DELTA replies
+        self._last_seq: int | None = None   # last sequenced event seen, reported on rejoin
+        self._log_id: str | None = None     # identifies the server run that numbered it
+        self._sent_at: OrderedDict[str, float] = OrderedDict()  # cmd_id -> local send time (ms)
+        self.latency = LatencyTracker()     # rtt, network and the server's stages, per command
+        self.clock = ClockSync()            # server game clock vs ours, refreshed every heartbeat
+        self._stamp_server_time = stamp_server_time
+        self._sync_probes = sync_probes
 
     async def connect(self, player="W"):
         self._player = player
         async with self._lock:
             self._ws = await websockets.connect(self._uri)
-            await self._ws.send(json.dumps({"kind": "join", "player": self._player}))
-            await self._request_snapshot()
+            await self._join()
             if self._hb_task is None or self._hb_task.done():
                 self._hb_task = asyncio.create_task(self._heartbeat())
         return self
@@ -45,8 +58,7 @@ class WSClient(TransportClient):
             while True:
                 try:
                     self._ws = await websockets.connect(self._uri)
-                    await self._ws.send(json.dumps({"kind": "join", "player": self._player}))
-                    await self._request_snapshot()
+                    await self._join()
                     return
                 except Exception:
                     await asyncio.sleep(backoff)
@@ -61,6 +73,7 @@ class WSClient(TransportClient):
             try:
                 waiter = await ws.ping()
                 await asyncio.wait_for(waiter, timeout=self._ping_timeout)
+                await self._probe_clock()
             except Exception:
                 try:
                     await ws.close()
@@ -69,11 +82,24 @@ class WSClient(TransportClient):
                 self._ws = None
                 await self._reconnect()
 
-    async def send_command(self, cmd: Command) -> None:
+    def stamp_command(self, cmd: Command) -> bool:
+        """Give *cmd* an id and, once synced, our estimate of the server time; True if it did the latter."""
         if getattr(cmd, "cmd_id", None) is None:
             cmd.cmd_id = uuid.uuid4().hex
+        if self._stamp_server_time and self.clock.synced:
+            # the server orders near-simultaneous moves by these stamps (and starts moves at them)
+            cmd.timestamp = int(round(self.clock.server_now_ms()))
+            return True
+        return False
+
+    async def send_command(self, cmd: Command, *, stamped: bool = False) -> None:
+        if not stamped:
+            self.stamp_command(cmd)
 
         payload = command_to_json(cmd)
+        self._sent_at[cmd.cmd_id] = time.perf_counter() * 1000.0
+        while len(self._sent_at) > 1024:
+            self._sent_at.popitem(last=False)
 
         if self._ws is None:
             await self._reconnect()
@@ -94,14 +120,116 @@ class WSClient(TransportClient):
                 await self._reconnect()
             try:
                 msg = await self._ws.recv()
-                yield event_from_json(msg)
+                events = events_from_json(msg)  # a single event or a per-tick batch
             except Exception:
                 self._ws = None
                 await self._reconnect()
                 await asyncio.sleep(0)
+                continue
+            for evt in events:
+                if not self._track_seq(evt):
+                    continue
+                if evt.type == EventType.TIME_SYNC:
+                    self._track_clock(evt)
+                    continue
+                if evt.type == EventType.COMMAND_RESULT:
+                    self._track_latency(evt)
+                evt = self._track_snapshot(evt)
+                if evt is not None:
+                    yield evt
+
+    def _track_latency(self, evt: Event) -> None:
+        """
+        On a command's "applied" result: round trip on our clock, the server's
+        own stages from its stamps, and the network share as the difference.
+        """
+        status = evt.payload.get("status")
+        cmd_id = evt.payload.get("cmd_id")
+        if status == "rejected":
+            self._sent_at.pop(cmd_id, None)
+        if status != "applied":
+            return
+        sent = self._sent_at.pop(cmd_id, None)
+        stages = server_stages(evt.payload.get("stamps") or {})
+        if sent is not None:
+            stages["rtt"] = time.perf_counter() * 1000.0 - sent
+            if "server" in stages:
+                stages["network"] = stages["rtt"] - stages["server"]
+        self.latency.add_all(stages)
+
+    async def _probe_clock(self, count: int = 1) -> None:
+        for _ in range(count):
+            await self._ws.send(json.dumps({"kind": "time_sync", "t0": self.clock.now_ms()}))
+
+    def _track_clock(self, evt: Event) -> None:
+        p = evt.payload
+        if p.get("t0") is not None:
+            self.clock.add_sample(p["t0"], p["t1"], p["t2"], self.clock.now_ms())
+
+    @property
+    def rtt_ms(self) -> float | None:
+        """Smoothed round-trip time to the server (None before the first probe)."""
+        return self.clock.srtt
+
+    @property
+    def clock_offset_ms(self) -> float | None:
+        """Server game time minus our clock (None before the first probe)."""
+        return self.clock.offset_ms
+
+    def server_time_ms(self) -> float:
+        """Estimated server game time now."""
+        return self.clock.server_now_ms()
+
+    def latency_stats(self) -> dict:
+        """p50/p90/p99/max per stage: rtt, network, queue, apply, broadcast, server."""
+        return self.latency.summary()
+
+    @property
+    def version(self):
+        """state_version of the last snapshot received (None before the first)."""
+        return self._snapshot.get("version") if self._snapshot else None
+
+    async def _join(self):
+        # the server answers a join with the events we missed since last_seq,
+        # or with the state; reporting the version we hold turns the latter
+        # into "not modified" or a small delta after a blip
+        await self._ws.send(json.dumps({
+            "kind": "join", "player": self._player, "version": self.version,
+            "last_seq": self._last_seq, "log_id": self._log_id,
+        }))
+        await self._probe_clock(self._sync_probes)  # a few samples so the first commands are stamped
+
+    def _track_seq(self, evt: Event) -> bool:
+        """False for a sequenced event already seen (replays may overlap)."""
+        if evt.type == EventType.ASSIGN_PLAYER and evt.payload.get("log_id") != self._log_id:
+            self._log_id = evt.payload.get("log_id")
+            self._last_seq = None  # a new server run numbers from scratch
+            self.clock.reset()     # ... and has its own game clock
+        if evt.seq is None:
+            return True
+        if self._last_seq is not None and evt.seq <= self._last_seq:
+            return False
+        self._last_seq = evt.seq
+        return True
+
+    def _track_snapshot(self, evt: Event) -> Event | None:
+        """Keep the last full state; expand deltas into STATE_SNAPSHOT events."""
+        if evt.type == EventType.STATE_SNAPSHOT:
+            self._snapshot = evt.payload
+            return evt
+        if evt.type == EventType.SNAPSHOT_NOT_MODIFIED:
+            return None
+        if evt.type == EventType.STATE_DELTA:
+            if self._snapshot is None or evt.payload.get("base") != self.version:
+                self._snapshot = None
+                asyncio.create_task(self._request_snapshot())  # cannot apply: ask for a keyframe
+                return None
+            self._snapshot = apply_delta(self._snapshot, evt.payload)
+            return Event(EventType.STATE_SNAPSHOT, self._snapshot, evt.timestamp)
+        return evt
 
     async def _request_snapshot(self):
         try:
-            await self._ws.send(json.dumps({"kind": "get_snapshot"}))
+            await self._ws.send(json.dumps({"kind": "get_snapshot", "version": self.version}))
         except Exception:
             pass
\ No newline at end of file
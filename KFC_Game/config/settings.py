@@ -7,3 +7,28 @@ PIECES_DIR = str(Path(__file__).parent.parent.parent / "pieces")
 WS_HOST = os.getenv("KFC_HOST", "127.0.0.1")
 WS_PORT = int(os.getenv("KFC_PORT", "8765"))
 WS_URI = f"ws://{WS_HOST}:{WS_PORT}"
+
+# Run the server simulation on its own thread instead of the asyncio loop
+SIM_THREAD = os.getenv("KFC_SIM_THREAD", "0") == "1"
+
+# Send everything one server tick publishes as a single batch message per client
+BATCH_EVENTS = os.getenv("KFC_BATCH_EVENTS", "0") == "1"
+
+# Journal accepted commands (and checkpoint state) here; a restart resumes from it
+JOURNAL_DIR = os.getenv("KFC_JOURNAL_DIR") or None
+
+# Time each phase of every server tick (Game.enable_profiling); dump with SIGUSR1
+PROFILE_TICKS = os.getenv("KFC_PROFILE_TICKS", "0") == "1"
+
+# Log server ticks longer than this many ms (0 = off); optionally with the sim thread's stack
+TICK_BUDGET_MS = float(os.getenv("KFC_TICK_BUDGET_MS", "0"))
+SLOW_TICK_STACKS = os.getenv("KFC_SLOW_TICK_STACKS", "0") == "1"
+
+# Serve Prometheus-style metrics on http://127.0.0.1:<port>/metrics (0 = off)
+METRICS_PORT = int(os.getenv("KFC_METRICS_PORT", "0"))
+
+# Hold commands this many ms and apply near-simultaneous ones in timestamp order (0 = off)
+INPUT_DELAY_MS = int(os.getenv("KFC_INPUT_DELAY_MS", "0"))
+
+# Client: show our own legal moves at once instead of after the server round trip
+PREDICT_MOVES = os.getenv("KFC_PREDICT_MOVES", "1") == "1"
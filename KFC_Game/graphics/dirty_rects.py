@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from ..shared.img import Img
+
+Rect = Tuple[int, int, int, int]  # x, y, w, h
+
+
+@dataclass
+class DrawItem:
+    """One dynamic layer element (a piece sprite, a cursor, ...) in board pixels."""
+    key: Hashable
+    rect: Rect
+    signature: Any                    # anything that changes when the pixels change
+    draw: Callable[[Img], None]       # paints the item onto the board view
+
+
+def _intersects(a: Rect, b: Rect) -> bool:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def _clip(r: Rect, W: int, H: int) -> Optional[Rect]:
+    x, y, w, h = r
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(W, x + w), min(H, y + h)
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2 - x1, y2 - y1
+
+
+class DirtyRectCompositor:
+    """
+    Persistent BGR frame = cached static composite (background + board) plus
+    dynamic items, repainted only where something changed.
+
+    Each render() diffs the items against the previous frame, restores the
+    static composite under every changed rectangle and redraws every item
+    touching a restored area, so the result equals a full redraw.
+    """
+
+    def __init__(self, background: np.ndarray, board: np.ndarray):
+        bg = background[..., :3] if background.shape[2] == 4 else background
+        self._static = np.ascontiguousarray(bg).copy()
+        H, W = self._static.shape[:2]
+        h_b, w_b = board.shape[:2]
+        self.board_origin = ((W - w_b) // 2, (H - h_b) // 2)
+        x_off, y_off = self.board_origin
+        self._static[y_off:y_off + h_b, x_off:x_off + w_b] = board[..., :3]
+
+        self.frame = self._static.copy()
+        # dynamic items are drawn through a view, so they clip to the board
+        self.board_view = Img()
+        self.board_view.img = self.frame[y_off:y_off + h_b, x_off:x_off + w_b]
+
+        self._prev: Dict[Hashable, Tuple[Rect, Any]] = {}
+        self._pending: List[Rect] = []
+        self.last_dirty: List[Rect] = []
+
+    # ──────────────────────────────────────────────────────────────
+    def _to_screen(self, r: Rect) -> Optional[Rect]:
+        x_off, y_off = self.board_origin
+        h_b, w_b = self.board_view.img.shape[:2]
+        board_r = _clip(r, w_b, h_b)
+        if board_r is None:
+            return None
+        x, y, w, h = board_r
+        return x + x_off, y + y_off, w, h
+
+    def mark_dirty(self, rect: Optional[Rect]) -> None:
+        """Schedule a screen-space rectangle (e.g. an overlay box) for repaint."""
+        if rect is None:
+            return
+        H, W = self.frame.shape[:2]
+        r = _clip(rect, W, H)
+        if r is not None:
+            self._pending.append(r)
+
+    def invalidate(self) -> None:
+        """Force a full repaint on the next render()."""
+        H, W = self.frame.shape[:2]
+        self._pending.append((0, 0, W, H))
+
+    # ──────────────────────────────────────────────────────────────
+    def render(self, items: List[DrawItem]) -> np.ndarray:
+        dirty: List[Rect] = self._pending
+        self._pending = []
+
+        cur = {it.key: it for it in items}
+        for key, (rect, sig) in self._prev.items():
+            it = cur.get(key)
+            if it is None or it.rect != rect or it.signature != sig:
+                dirty.append(self._to_screen(rect))
+        for key, it in cur.items():
+            prev = self._prev.get(key)
+            if prev is None or prev != (it.rect, it.signature):
+                dirty.append(self._to_screen(it.rect))
+        dirty = [r for r in dirty if r is not None]
+
+        # grow the repaint region until every item touching it is included
+        screen = [self._to_screen(it.rect) for it in items]
+        redraw = [False] * len(items)
+        grown = True
+        while grown and dirty:
+            grown = False
+            for i, r in enumerate(screen):
+                if not redraw[i] and r is not None and any(_intersects(r, d) for d in dirty):
+                    redraw[i] = True
+                    dirty.append(r)
+                    grown = True
+
+        for x, y, w, h in dirty:
+            self.frame[y:y + h, x:x + w] = self._static[y:y + h, x:x + w]
+        for it, again in zip(items, redraw):
+            if again:
+                it.draw(self.board_view)
+
+        self._prev = {it.key: (it.rect, it.signature) for it in items}
+        self.last_dirty = dirty
+        return self.frame
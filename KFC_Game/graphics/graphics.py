@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional
 import copy
 import logging
+import threading
 
 from ..shared.img import Img
 from ..shared.command import Command
@@ -16,42 +17,92 @@ class Graphics:
                  cell_size: tuple[int, int],
                  img_loader,
                  loop: bool = True,
-                 fps: float = 6.0):
+                 fps: float = 6.0,
+                 lazy: bool = False,
+                 sprite_pool=None):
 
         # injectable image loader for tests (defaults to Img().read)
         self._img_loader = img_loader
+        # optional SpritePool that shares identical frames between Graphics
+        self._sprite_pool = sprite_pool
+        self._sprites_folder = pathlib.Path(sprites_folder)
+        self._cell_size = cell_size
+        self._load_lock = threading.Lock()
+        self._frame_paths: list[pathlib.Path] | None = None
 
-        self.frames: list[Img] = self._load_sprites(sprites_folder, cell_size)
+        # lazy graphics decode their sprites on the first get_img()/frames access
+        self._frames: list[Img] | None = None
+        if not lazy:
+            self._frames = self._load_sprites(self._sprites_folder, cell_size)
         self.loop, self.fps = loop, fps
         self.start_ms = 0
         self.cur_frame = 0
         self.frame_duration_ms = 1000 / fps
-        logger.debug(f"[LOAD] Graphics from: {sprites_folder}")
+        logger.debug(f"[LOAD] Graphics from: {sprites_folder} (lazy={lazy})")
 
     def copy(self):
         # shallow copy is enough: frames list is immutable PNGs
         return copy.copy(self)
 
+    @property
+    def frames(self) -> list[Img]:
+        if self._frames is None:
+            self.ensure_loaded()
+        return self._frames
+
+    @frames.setter
+    def frames(self, value: list[Img]):
+        self._frames = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._frames is not None
+
+    def ensure_loaded(self) -> None:
+        """Decode the sprites now (idempotent, safe to call from a prefetch thread)."""
+        if self._frames is not None:
+            return
+        with self._load_lock:
+            if self._frames is None:
+                self._frames = self._load_sprites(self._sprites_folder, self._cell_size)
+
+    def _sprite_paths(self, folder) -> list[pathlib.Path]:
+        if self._frame_paths is None:
+            self._frame_paths = sorted(folder.glob("*.png"))
+        return self._frame_paths
+
     def _load_sprites(self, folder, cell_size):
         frames = []
-        for p in sorted(folder.glob("*.png")):
-            frames.append(self._img_loader(p, cell_size, keep_aspect=False))
+        for p in self._sprite_paths(folder):
+            if self._sprite_pool is not None:
+                frames.append(self._sprite_pool.load(self._img_loader, p, cell_size, keep_aspect=False))
+            else:
+                frames.append(self._img_loader(p, cell_size, keep_aspect=False))
         if not frames:
             raise ValueError(f"No frames found in {folder}")
 
         return frames
 
+    def _frame_count(self) -> int:
+        # avoid decoding just to advance the animation clock
+        if self._frames is not None:
+            return len(self._frames)
+        return len(self._sprite_paths(self._sprites_folder))
+
     def reset(self, cmd: Command):
         self.start_ms = cmd.timestamp
         self.cur_frame = 0
 
     def update(self, now_ms: int):
+        n_frames = self._frame_count()
+        if n_frames == 0:
+            return
         elapsed = now_ms - self.start_ms
         frames_passed = int(elapsed / self.frame_duration_ms)
         if self.loop:
-            self.cur_frame = frames_passed % len(self.frames)
+            self.cur_frame = frames_passed % n_frames
         else:
-            self.cur_frame = min(frames_passed, len(self.frames) - 1)
+            self.cur_frame = min(frames_passed, n_frames - 1)
 
     def get_img(self) -> Img:
         if not self.frames:
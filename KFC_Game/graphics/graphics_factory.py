@@ -1,5 +1,8 @@
 import pathlib
+import threading
+import logging
 from .graphics import Graphics
+from .sprite_pool import SpritePool, DedupReport
 from ..shared.img import Img
 from ..utils.mock_img import MockImg
 
@@ -22,20 +25,71 @@ class MockImgFactory(ImgFactory):
         return MockImg().read(path, size, keep_aspect)
 
 
+logger = logging.getLogger(__name__)
+
+# States ordered by how likely a game is to need them; prefetch warms them first.
+PREFETCH_ORDER = ("idle", "move", "idle_after_first_move", "long_rest",
+                  "jump", "short_rest", "check_last_row")
+
+
 class GraphicsFactory:
 
-    def __init__(self, img_factory):
+    def __init__(self, img_factory, lazy: bool = False, sprite_pool: SpritePool | None = None):
         # callable path, cell_size, keep_aspect -> Img
         self._img_factory = img_factory
+        self._lazy = lazy
+        # identical frames (same file, or same decoded pixels) share one buffer
+        self._sprite_pool = sprite_pool if sprite_pool is not None else SpritePool()
+        self._created: list[tuple[str, Graphics]] = []  # (state name, graphics)
 
     def load(self,
              sprites_dir: pathlib.Path,
              cfg: dict,
              cell_size: tuple[int, int]) -> Graphics:
-        return Graphics(
+        gfx = Graphics(
             sprites_folder=sprites_dir,
             cell_size=cell_size,
             img_loader=self._img_factory,
             loop=cfg.get("is_loop", True),
-            fps=cfg.get("frames_per_sec", 6.0)
+            fps=cfg.get("frames_per_sec", 6.0),
+            lazy=self._lazy,
+            sprite_pool=self._sprite_pool,
         )
+        if self._lazy:
+            # sprites_dir is <piece>/states/<state>/sprites
+            self._created.append((pathlib.Path(sprites_dir).parent.name, gfx))
+        return gfx
+
+    def dedup_report(self) -> DedupReport:
+        """Memory saved so far by sharing identical sprite frames."""
+        return self._sprite_pool.report()
+
+    def _prefetch_queue(self) -> list[Graphics]:
+        def _rank(item):
+            name = item[0]
+            return PREFETCH_ORDER.index(name) if name in PREFETCH_ORDER else len(PREFETCH_ORDER)
+        return [gfx for _, gfx in sorted(self._created, key=_rank)]
+
+    def prefetch(self, background: bool = True) -> threading.Thread | None:
+        """Warm every lazily created Graphics, most likely states first.
+
+        With *background* the sprites are decoded on a daemon thread and the
+        thread is returned; otherwise they are decoded before returning.
+        """
+        pending = self._prefetch_queue()
+        self._created = []
+
+        def _warm():
+            for gfx in pending:
+                try:
+                    gfx.ensure_loaded()
+                except Exception as e:
+                    logger.warning("Sprite prefetch failed: %s", e)
+            logger.debug("Sprite prefetch done: %s", self.dedup_report())
+
+        if not background:
+            _warm()
+            return None
+        t = threading.Thread(target=_warm, name="sprite-prefetch", daemon=True)
+        t.start()
+        return t
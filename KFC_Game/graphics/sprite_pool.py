@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import pathlib
+import threading
+from dataclasses import dataclass
+
+from ..shared.img import Img
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DedupReport:
+    frames: int = 0        # frames requested by Graphics objects
+    decoded: int = 0       # frames actually read from disk
+    unique: int = 0        # distinct decoded buffers kept in memory
+    bytes_total: int = 0   # bytes the frames would use without sharing
+    bytes_kept: int = 0    # bytes actually held by the pool
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_total - self.bytes_kept
+
+    def __str__(self) -> str:
+        return (f"sprites: {self.frames} frames, {self.decoded} decoded, {self.unique} unique; "
+                f"{self.bytes_kept / 1024:.1f} KiB kept, {self.bytes_saved / 1024:.1f} KiB saved")
+
+
+class SpritePool:
+    """
+    Share decoded sprite frames between Graphics objects.
+
+    Frames are looked up by (path, size) first, so the eight pawns of one
+    colour decode their sprites once.  Freshly decoded frames are then
+    interned by a hash of their pixels, so byte-identical art (idle vs.
+    idle_after_first_move, rest states reusing idle art, ...) ends up in a
+    single buffer.  Pooled frames are shared and must be treated read-only.
+    """
+
+    def __init__(self):
+        self._by_path: dict[tuple, Img] = {}
+        self._by_content: dict[tuple, Img] = {}
+        self._lock = threading.Lock()
+        self._report = DedupReport()
+
+    @staticmethod
+    def content_key(img: Img) -> tuple | None:
+        arr = getattr(img, "img", None)
+        if arr is None:
+            return None
+        digest = hashlib.blake2b(arr.tobytes(), digest_size=16).digest()
+        return type(img), arr.shape, str(arr.dtype), digest
+
+    def load(self, img_loader, path: pathlib.Path, size, keep_aspect: bool = False) -> Img:
+        path_key = (str(path), tuple(size) if size is not None else None, keep_aspect)
+        with self._lock:
+            cached = self._by_path.get(path_key)
+            if cached is not None:
+                self._count(cached, shared=True)
+                return cached
+
+        img = img_loader(path, size, keep_aspect=keep_aspect)
+
+        with self._lock:
+            self._report.decoded += 1
+            key = self.content_key(img)
+            shared = key is not None and key in self._by_content
+            if shared:
+                img = self._by_content[key]
+            elif key is not None:
+                self._by_content[key] = img
+            self._by_path[path_key] = img
+            self._count(img, shared=shared)
+            return img
+
+    def _count(self, img: Img, shared: bool) -> None:
+        nbytes = getattr(getattr(img, "img", None), "nbytes", 0)
+        self._report.frames += 1
+        self._report.bytes_total += nbytes
+        if not shared:
+            self._report.unique += 1
+            self._report.bytes_kept += nbytes
+
+    def report(self) -> DedupReport:
+        with self._lock:
+            return DedupReport(**vars(self._report))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_path.clear()
+            self._by_content.clear()
+            self._report = DedupReport()
@@ -3,20 +3,25 @@ from pathlib import Path
 from .server.game_factory import create_game
 from .graphics.graphics_factory import ImgFactory, MockImgFactory
 from .client.display import NullDisplay, Cv2Display
-from .client.render_loop import ClientRenderLoop
+from .client.render_thread import ClientRenderThread
 from .client.renderer import ClientRenderer
 from .client.ui_state_sync import BoardMirror, subscribe_state_sync, subscribe_render
-from .config.settings import PIECES_DIR, WS_HOST, WS_PORT, WS_URI
+from .config.settings import (PIECES_DIR, WS_HOST, WS_PORT, WS_URI, SIM_THREAD, BATCH_EVENTS,
+                              JOURNAL_DIR, PROFILE_TICKS, TICK_BUDGET_MS, SLOW_TICK_STACKS,
+                              METRICS_PORT, INPUT_DELAY_MS, PREDICT_MOVES)
 from .config.input_maps import P1_MAP, P2_MAP
 
 async def run_local():
-    game = create_game(PIECES_DIR, ImgFactory())
+    game = create_game(PIECES_DIR, ImgFactory(), prefetch_sprites=True)
     game.run()
 
-async def run_server(host=None, port=None):
+async def run_server(host=None, port=None, sim_thread=SIM_THREAD):
     from .server.ws_server import serve_and_tick
     game = create_game(PIECES_DIR, ImgFactory())
-    
+    if JOURNAL_DIR:
+        from .server.journal import open_journal
+        open_journal(game, JOURNAL_DIR)
+
     # Use provided arguments or fall back to config/environment
     server_host = host or WS_HOST
     server_port = port or WS_PORT
@@ -24,15 +29,52 @@ async def run_server(host=None, port=None):
     print(f"Starting KFC Game Server on {server_host}:{server_port}")
     print(f"Clients can connect to: ws://{server_host}:{server_port}")
     
-    await serve_and_tick(game, host=server_host, port=server_port)
+    await serve_and_tick(game, host=server_host, port=server_port, threaded=sim_thread,
+                         batch_events=BATCH_EVENTS, profile=PROFILE_TICKS,
+                         tick_budget_ms=TICK_BUDGET_MS, slow_tick_stacks=SLOW_TICK_STACKS,
+                         metrics_port=METRICS_PORT, input_delay_ms=INPUT_DELAY_MS)
+
+def run_replay(log_path, events_out=None, hz=60.0, seek_ms=None):
+    """Replay a recorded game headlessly; print the final state and timing stats.
+
+    With *seek_ms* only the state at that game time is computed, from the
+    nearest keyframe (keyframes.json beside a journal; built on first use and
+    rebuilt when the journal or *hz* no longer match it).
+    """
+    import json
+    from pathlib import Path
+    from .network.protocol import event_to_json
+    from .server.replay import load_records, replay
+
+    records = load_records(log_path)
+    if seek_ms is None:
+        result = replay(records, hz=hz)
+    else:
+        from .server.keyframes import KEYFRAMES_FILE, KeyframeIndex, build_keyframes, seek
+        kf_path = Path(log_path) / KEYFRAMES_FILE
+        index = KeyframeIndex.load(kf_path) if kf_path.exists() else None
+        if index is None or not index.matches(records, hz):
+            index = build_keyframes(records, hz=hz)
+            if Path(log_path).is_dir():
+                index.save(kf_path)
+        result = seek(records, index, seek_ms, collect_events=bool(events_out))
+    if events_out:
+        with open(events_out, "w", encoding="utf-8") as f:
+            for evt in result.events:
+                f.write(event_to_json(evt) + "\n")
+    print(json.dumps({"final": result.final, "stats": result.stats}, indent=2, default=str))
+    return result
 
 async def run_client(host=None, port=None):
     from .client.ws_client import WSClient
     from .client.event_bridge import EventBridge
+    from .client.input_handler import ToWSQueue
+    from .client.prediction import MovePredictor, rules_from_pieces
     from .input.keyboard_input import KeyboardProducer, KeyboardProcessor
 
     img_factory = ImgFactory()
-    game = create_game(PIECES_DIR, img_factory)
+    # the client draws from snapshots; its own pieces' sprites are rarely needed
+    game = create_game(PIECES_DIR, img_factory, lazy_sprites=True)
     
     logging.debug("Game created successfully with all pieces")
     
@@ -46,15 +88,6 @@ async def run_client(host=None, port=None):
     
     ws = await WSClient(ws_uri).connect(player=player)
 
-    class _ToWSQueue:
-        def __init__(self, ws_client, loop):
-            self.ws = ws_client
-            self.loop = loop
-
-        def put(self, cmd):
-            # Schedule the coroutine to run in the main event loop from another thread
-            future = asyncio.run_coroutine_threadsafe(self.ws.send_command(cmd), self.loop)
-
     player_num = 1 if player == "W" else 2
     keymap = P1_MAP if player_num == 1 else P2_MAP
     kp = KeyboardProcessor(8, 8, keymap)
@@ -64,17 +97,21 @@ async def run_client(host=None, port=None):
     mirror = BoardMirror()
     subscribe_state_sync(game.bus, mirror)
     
-    kb = KeyboardProducer(game, _ToWSQueue(ws, asyncio.get_event_loop()), kp, player=player_num, board_mirror=mirror)
+    # our own legal moves start moving at once; the server's results confirm or roll them back
+    predictor = MovePredictor(rules_from_pieces(game.pieces), color=player) if PREDICT_MOVES else None
+    kb = KeyboardProducer(game, ToWSQueue(ws, asyncio.get_event_loop(), predictor), kp, player=player_num,
+                          board_mirror=mirror)
     kb.start()
     
     renderer = ClientRenderer(game.board, PIECES_DIR, ImgFactory())
-    subscribe_render(game.bus, renderer)
+    subscribe_render(game.bus, renderer, predictor)
 
     headless = os.getenv("KFC_HEADLESS", "0") == "1"
-    display = NullDisplay() if headless else Cv2Display("Kung Fu Chess")
+    # the render thread creates and owns the window; the asyncio loop only does I/O
+    display_factory = NullDisplay if headless else (lambda: Cv2Display("Kung Fu Chess"))
 
-    render_loop = ClientRenderLoop(renderer, hz=60.0, display=display)
-    render_loop.start()
+    render_thread = ClientRenderThread(renderer, hz=60.0, display_factory=display_factory)
+    render_thread.start()
 
     try:
         while True:
@@ -82,13 +119,13 @@ async def run_client(host=None, port=None):
     except KeyboardInterrupt:
         pass
     finally:
-        await render_loop.stop()
-        display.close()
+        render_thread.stop()
+        logging.info("render stats: %s", render_thread.stats())
 
 async def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='KFC Game - Kung Fu Chess')
-    parser.add_argument('--mode', choices=['local', 'server', 'client'], 
+    parser.add_argument('--mode', choices=['local', 'server', 'client', 'replay'], 
                        default=os.getenv("KFC_MODE", "local").lower(),
                        help='Game mode (default: local, or from KFC_MODE env var)')
     parser.add_argument('--host', type=str, 
@@ -100,6 +137,16 @@ async def main():
     parser.add_argument('--player', choices=['W', 'B'], 
                        default=os.getenv("PLAYER", "W"),
                        help='Player color for client mode (default: W, or from PLAYER env var)')
+    parser.add_argument('--sim-thread', action='store_true', default=SIM_THREAD,
+                       help='Server mode: run the simulation on its own thread (or KFC_SIM_THREAD=1)')
+    parser.add_argument('--log', type=str, default=None,
+                       help='Replay mode: recorded game (journal directory/file or commands .jsonl)')
+    parser.add_argument('--events-out', type=str, default=None,
+                       help='Replay mode: write the event stream here as JSON lines')
+    parser.add_argument('--hz', type=float, default=60.0,
+                       help='Replay mode: simulation tick rate (default: 60)')
+    parser.add_argument('--seek', type=int, default=None, metavar='MS',
+                       help='Replay mode: only show the game as it was at this game time')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose logging')
     
@@ -118,9 +165,13 @@ async def main():
     if args.mode == "local":  
         await run_local()
     elif args.mode == "server": 
-        await run_server(host=args.host, port=args.port)
+        await run_server(host=args.host, port=args.port, sim_thread=args.sim_thread)
     elif args.mode == "client": 
         await run_client(host=args.host, port=args.port)
+    elif args.mode == "replay":
+        if not args.log:
+            raise SystemExit("--mode replay needs --log")
+        run_replay(args.log, events_out=args.events_out, hz=args.hz, seek_ms=args.seek)
     else: 
         raise SystemExit(f"Unknown mode: {args.mode}")
 
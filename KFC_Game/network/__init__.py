@@ -1,10 +1,13 @@
 # Network layer for KFC Game
 
-from .protocol import command_to_json, command_from_json, event_to_json, event_from_json
+from .protocol import (command_to_json, command_from_json, event_to_json, event_from_json,
+                       batch_to_json, events_from_json, coalesce_events)
+from .batching import TickBatcher
 from .transport import TransportClient
 from .loopback import LoopbackServer
 
 __all__ = [
     'command_to_json', 'command_from_json', 'event_to_json', 'event_from_json',
-    'TransportClient', 'LoopbackServer'
+    'batch_to_json', 'events_from_json', 'coalesce_events',
+    'TickBatcher', 'TransportClient', 'LoopbackServer'
 ]
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+from typing import Callable, List
+
+from ..shared.event import Event
+
+
+class TickBatcher:
+    """
+    Collects events published during one tick and hands them over in one go.
+
+    The first add() of a batch schedules a flush on *loop*; a tick runs to
+    completion before the loop gets to it (directly on the loop, or via the
+    single callback that delivers a simulation-thread batch), so everything
+    one tick publishes ends up in the same flush.  add() is thread-safe.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_flush: Callable[[List[Event]], None]):
+        self._loop = loop
+        self._on_flush = on_flush
+        self._events: List[Event] = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def add(self, evt: Event) -> None:
+        with self._lock:
+            self._events.append(evt)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._loop.call_soon_threadsafe(self.flush)
+
+    def flush(self) -> None:
+        with self._lock:
+            events, self._events = self._events, []
+            self._scheduled = False
+        if events:
+            self._on_flush(events)
@@ -3,6 +3,8 @@ from typing import AsyncIterator, Callable, Dict, List
 from ..shared.command import Command
 from ..shared.event import Event, EventType
 from ..shared.bus import EventBus
+from .batching import TickBatcher
+from .protocol import coalesce_events
 from .transport import TransportClient
 
 
@@ -12,9 +14,13 @@ class LoopbackServer:
     - clients call client.send_command(cmd)
     - server forwards cmd into game's user_input_queue
     - server broadcasts any Event published on EventBus to all clients
+      (with batch_events: one coalesced batch per tick, like WSHub)
     """
-    def __init__(self, *, bus: EventBus, put_into_game_queue: Callable[[Command], None]):
+    def __init__(self, *, bus: EventBus, put_into_game_queue: Callable[[Command], None],
+                 batch_events: bool = False):
         self._bus = bus
+        self._batch_events = batch_events
+        self._batcher = None
         self._put_cmd = put_into_game_queue
         self._incoming_cmds: "asyncio.Queue[Command]" = asyncio.Queue()
         self._client_streams: List["asyncio.Queue[Event]"] = []
@@ -27,6 +33,8 @@ class LoopbackServer:
             return
         # 1) forward commands from clients -> game queue
         self._tasks.append(asyncio.create_task(self._drain_commands()))
+        if self._batch_events:
+            self._batcher = TickBatcher(asyncio.get_running_loop(), self._fan_out_batch)
         # 2) subscribe to all EventTypes and fan‑out to clients
         for et in EventType:
             self._bus.subscribe(et, self._on_event)  # publish→queues
@@ -38,10 +46,19 @@ class LoopbackServer:
             self._put_cmd(cmd)
 
     def _on_event(self, evt: Event):
+        if self._batcher is not None:
+            self._batcher.add(evt)
+            return
+        self._fan_out(evt)
+
+    def _fan_out_batch(self, events: List[Event]):
+        self._fan_out(coalesce_events(events))
+
+    def _fan_out(self, item):
         for q in self._client_streams:
             # put_nowait to avoid blocking game loop on slow clients
             try:
-                q.put_nowait(evt)
+                q.put_nowait(item)
             except asyncio.QueueFull:
                 pass
 
@@ -58,7 +75,12 @@ class LoopbackServer:
         async def events(self) -> AsyncIterator[Event]:
             # unified async generator of events
             while True:
-                yield await self._ev_q.get()
+                item = await self._ev_q.get()
+                if isinstance(item, list):  # one tick's batch
+                    for evt in item:
+                        yield evt
+                else:
+                    yield item
 
         def __aiter__(self) -> AsyncIterator[Event]:
             return self.events()
@@ -1,4 +1,5 @@
 import json
+from typing import Iterable, List
 from ..shared.command import Command
 from ..shared.event import Event, EventType
 
@@ -18,13 +19,38 @@ def command_from_json(s: str) -> Command:
     params = [tuple(p) if isinstance(p, list) else p for p in d.get("params", [])]
     return Command(d["timestamp"], d["piece_id"], d["type"], params, d.get("cmd_id"))
 
-def event_to_json(evt: Event) -> str:
-    return json.dumps({
+def _event_to_dict(evt: Event) -> dict:
+    d = {
         "type": evt.type.value,
         "payload": evt.payload,
         "timestamp": evt.timestamp,
-    })
+    }
+    if evt.seq is not None:
+        d["seq"] = evt.seq
+    return d
+
+def _event_from_dict(d: dict) -> Event:
+    return Event(EventType(d["type"]), d.get("payload", {}), d["timestamp"], d.get("seq"))
+
+def event_to_json(evt: Event) -> str:
+    return json.dumps(_event_to_dict(evt))
 
 def event_from_json(s: str) -> Event:
+    return _event_from_dict(json.loads(s))
+
+def batch_to_json(events: Iterable[Event]) -> str:
+    """Several events in one message (one frame / one send per client)."""
+    return json.dumps({"kind": "batch", "events": [_event_to_dict(e) for e in events]})
+
+def events_from_json(s: str) -> List[Event]:
+    """Decode a message that is either a single event or a batch."""
     d = json.loads(s)
-    return Event(EventType(d["type"]), d.get("payload", {}), d["timestamp"])
+    if d.get("kind") == "batch":
+        return [_event_from_dict(e) for e in d.get("events", [])]
+    return [_event_from_dict(d)]
+
+def coalesce_events(events: Iterable[Event]) -> List[Event]:
+    """Drop all but the latest STATE_SNAPSHOT; it supersedes the earlier ones."""
+    events = list(events)
+    last_snap = max((i for i, e in enumerate(events) if e.type == EventType.STATE_SNAPSHOT), default=None)
+    return [e for i, e in enumerate(events) if e.type != EventType.STATE_SNAPSHOT or i == last_snap]
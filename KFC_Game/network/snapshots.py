@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import Optional
+
+
+def _pieces_by_id(snapshot: dict) -> dict:
+    return {p["id"]: p for p in snapshot.get("pieces", [])}
+
+
+def _same(a, b) -> bool:
+    # cells travel as tuples on the server and as lists after JSON
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def make_delta(base: dict, current: dict) -> dict:
+    """STATE_DELTA payload turning snapshot *base* into *current*."""
+    old = _pieces_by_id(base)
+    new = _pieces_by_id(current)
+    changed = [p for pid, p in new.items()
+               # moving pieces change within one version, always resend them
+               if pid not in old or not _same(old[pid], p) or "motion" in p or "motion" in old[pid]]
+    return {
+        "base": base.get("version"),
+        "version": current.get("version"),
+        "time_ms": current.get("time_ms"),
+        "cursors": current.get("cursors", []),
+        "changed": changed,
+        "removed": [pid for pid in old if pid not in new],
+    }
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    """Rebuild the full snapshot from *base* and a STATE_DELTA payload."""
+    removed = set(delta.get("removed", []))
+    changed = _pieces_by_id({"pieces": delta.get("changed", [])})
+    pieces = [changed.pop(p["id"], p) for p in base.get("pieces", []) if p["id"] not in removed]
+    pieces.extend(changed.values())
+    return {
+        "version": delta.get("version"),
+        "time_ms": delta.get("time_ms"),
+        "pieces": pieces,
+        "cursors": delta.get("cursors", []),
+    }
+
+
+class SnapshotHistory:
+    """
+    Recent snapshots by state_version (bounded), so a client that reports
+    the version it holds can be answered with "not modified" or a delta
+    instead of a full snapshot.
+    """
+
+    def __init__(self, maxlen: int = 32):
+        self.maxlen = maxlen
+        self._by_version: "OrderedDict[int, dict]" = OrderedDict()
+
+    def record(self, snapshot: dict) -> None:
+        version = snapshot.get("version")
+        if version is None:
+            return
+        # keep the first content recorded for a version: pieces finishing a
+        # move change within one, and only the first copy still lists them
+        # as moving, which make_delta always resends
+        if version in self._by_version:
+            return
+        self._by_version[version] = snapshot
+        while len(self._by_version) > self.maxlen:
+            self._by_version.popitem(last=False)
+
+    def get(self, version) -> Optional[dict]:
+        return self._by_version.get(version)
+
+    def __len__(self) -> int:
+        return len(self._by_version)
@@ -0,0 +1,55 @@
+# KFC_Game/server/event_log.py
+from __future__ import annotations
+import dataclasses
+import threading
+import uuid
+from collections import deque
+from typing import List, Optional
+
+from ..shared.event import Event
+
+
+class EventLog:
+    """
+    Bounded ring buffer of the events the server sent, numbered by seq.
+
+    A client that reconnects reports the last seq it saw (and the log_id,
+    which changes with every server start); since() returns exactly the
+    events it missed, or None when they are no longer all in the buffer.
+    Events addressed to one player (command results) are only replayed to
+    that player.
+    """
+
+    def __init__(self, maxlen: int = 1024):
+        self.log_id = uuid.uuid4().hex[:12]
+        self._entries: deque[tuple[int, Optional[str], Event]] = deque(maxlen=maxlen)
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    def append(self, evt: Event, player: Optional[str] = None) -> Event:
+        """Number *evt* and keep it; returns the event carrying its seq."""
+        with self._lock:
+            evt = dataclasses.replace(evt, seq=self._next_seq)
+            self._next_seq += 1
+            self._entries.append((evt.seq, player, evt))
+        return evt
+
+    def since(self, last_seq: int, player: Optional[str] = None,
+              log_id: Optional[str] = None) -> Optional[List[Event]]:
+        with self._lock:
+            if log_id is not None and log_id != self.log_id:
+                return None  # numbered by a previous server run
+            if last_seq > self.last_seq:
+                return None
+            oldest = self._entries[0][0] if self._entries else self._next_seq
+            if last_seq < oldest - 1:
+                return None  # gap no longer covered by the buffer
+            return [e for seq, target, e in self._entries
+                    if seq > last_seq and (target is None or target == player)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
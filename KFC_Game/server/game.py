@@ -6,11 +6,14 @@ import cv2
 
 from ..shared.board import Board
 from ..shared.command import Command
+from ..shared.latency import stamp_ms
 from ..graphics.overlay_manager import render_overlay
 from ..shared.event import EventType
 from ..shared.publisher import PublisherMixin
 from ..graphics.canvas import board_img
+from ..graphics.dirty_rects import DirtyRectCompositor, DrawItem
 from ..shared.piece import Piece
+from ..shared.profiling import PhaseProfiler, TickWatchdog
 from ..shared.bus import EventBus, event_bus as default_event_bus
 
 from ..input.keyboard_input import KeyboardProcessor, KeyboardProducer
@@ -22,6 +25,19 @@ logger = logging.getLogger(__name__)
 class InvalidBoard(Exception): ...
 
 
+def _states_by_name(start) -> Dict[str, "State"]:
+    """Every state of one piece's state machine, reached through its transitions."""
+    seen: Dict[str, object] = {}
+    todo = [start]
+    while todo:
+        st = todo.pop()
+        if st.name in seen:
+            continue
+        seen[st.name] = st
+        todo.extend(st.transitions.values())
+    return seen
+
+
 class Game(PublisherMixin):
     def __init__(self, pieces: List[Piece], board: Board, event_bus: EventBus | None = None, *, validate_setup: bool = True,):
         bus = event_bus or default_event_bus
@@ -47,17 +63,177 @@ class Game(PublisherMixin):
         self.last_cursor1 = (0, 0)
         self.last_cursor2 = (0, 0)
         self._window_ready = False
+        self._compositor: Optional[DirtyRectCompositor] = None
         self._did_reset = False
         self.state_version = 0
         self._snapshot_dirty = True
+        self._virtual_now_ms: Optional[int] = None
+        self.journal = None  # optional CommandJournal: records every applied command
+        self.profiler: Optional[PhaseProfiler] = None  # per-phase tick timings when enabled
+        self.watchdog: Optional[TickWatchdog] = None   # slow-tick log; needs the profiler
+        self.jitter = None  # optional JitterBuffer: applies commands in timestamp order
         if validate_setup:
             self._validate_initial_setup()
 
     # ──────────────────────────────────────────────────────────────
     def game_time_ms(self) -> int:
+        if self._virtual_now_ms is not None:
+            return self._virtual_now_ms
         delta_ms = (time.monotonic_ns() - self.START_NS) // 1_000_000
         return int(delta_ms * self._time_factor)
 
+    def set_virtual_time(self, now_ms: int) -> None:
+        """Drive game time explicitly (replay/recovery) instead of from the wall clock."""
+        self._virtual_now_ms = int(now_ms)
+
+    def resume_real_time(self) -> None:
+        """Go back to the wall clock, continuing from the current virtual time."""
+        if self._virtual_now_ms is None:
+            return
+        now_ms, self._virtual_now_ms = self._virtual_now_ms, None
+        factor = self._time_factor or 1
+        self.START_NS = time.monotonic_ns() - int(now_ms / factor * 1_000_000)
+
+    def enable_profiling(self, window: int = 1024) -> PhaseProfiler:
+        """Time every phase of each tick from now on (see PhaseProfiler)."""
+        if self.profiler is None:
+            self.profiler = PhaseProfiler(window=window)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        self.profiler = None
+
+    def enable_watchdog(self, budget_ms: float = 1000 / 60, *, maxlen: int = 100,
+                        sample_stack: bool = False) -> TickWatchdog:
+        """Log ticks longer than *budget_ms* with their phase breakdown (enables profiling)."""
+        self.enable_profiling()
+        if self.watchdog is not None:
+            self.watchdog.close()
+        self.watchdog = TickWatchdog(budget_ms, maxlen=maxlen, sample_stack=sample_stack)
+        return self.watchdog
+
+    def set_input_delay(self, delay_ms: int) -> None:
+        """
+        Hold commands up to *delay_ms* and apply near-simultaneous ones in
+        timestamp order (see JitterBuffer); 0 applies them on arrival again.
+        """
+        from .jitter_buffer import JitterBuffer
+
+        if delay_ms <= 0:
+            pending = self.jitter.pop_ready(float("inf")) if self.jitter is not None else []
+            self.jitter = None
+            for cmd in pending:
+                self.user_input_queue.put(cmd)
+        elif self.jitter is None:
+            self.jitter = JitterBuffer(delay_ms)
+        else:
+            self.jitter.delay_ms = delay_ms
+
+    def slow_ticks(self) -> List[dict]:
+        return self.watchdog.slow_ticks() if self.watchdog is not None else []
+
+    def profile_stats(self) -> Optional[dict]:
+        """p50/p99/max per tick phase, or None while profiling is off."""
+        return self.profiler.stats() if self.profiler is not None else None
+
+    # ──────────────────────────────────────────────────────────────
+    def checkpoint_state(self) -> dict:
+        """
+        Compact, JSON-friendly copy of everything needed to resume the game:
+        each live piece's state and timing, pending deferred commands, the
+        version counter, and the score/move-history globals.
+        """
+        from ..shared import score_handler, move_history
+
+        pieces = []
+        for p in self.pieces:
+            start, end = p.state.physics.span()
+            pieces.append({
+                "id": p.id,
+                "state": p.state.name,
+                "start": list(start),
+                "end": list(end),
+                "start_ms": int(p.state.physics.get_start_ms()),
+                "last_cmd_ts": getattr(p, "_last_cmd_ts", None),
+            })
+        deferred = {
+            pid: {"timestamp": c.timestamp, "piece_id": c.piece_id, "type": c.type,
+                  "params": [list(x) if isinstance(x, tuple) else x for x in c.params]}
+            for pid, c in self._deferred_after_cooldown.items()
+        }
+        return {
+            "time_ms": self.game_time_ms(),
+            "state_version": self.state_version,
+            "pieces": pieces,
+            "deferred": deferred,
+            "scores": {"white": score_handler.white_score, "black": score_handler.black_score},
+            "history": {"white": [list(m) for m in move_history.white_move_history],
+                        "black": [list(m) for m in move_history.black_move_history]},
+        }
+
+    def restore_state(self, ckpt: dict) -> None:
+        """Put a freshly created game into the state captured by checkpoint_state()."""
+        from ..shared import score_handler, move_history
+
+        def _cell(x):
+            return tuple(x) if isinstance(x, list) else x
+
+        keep = {e["id"]: e for e in ckpt["pieces"]}
+        self.pieces = [p for p in self.pieces if p.id in keep]
+        self.piece_by_id = {p.id: p for p in self.pieces}
+        for p in self.pieces:
+            e = keep[p.id]
+            states = _states_by_name(p.state)
+            st = states[e["state"]]
+            start, end = _cell(e["start"]), _cell(e["end"])
+            params = [start, end] if start != end else [start]
+            st.reset(Command(e["start_ms"], p.id, e["state"], params))
+            p.state = st
+            if e.get("last_cmd_ts") is not None:
+                p._last_cmd_ts = e["last_cmd_ts"]
+
+        self._deferred_after_cooldown = {
+            pid: Command(c["timestamp"], c["piece_id"], c["type"], [_cell(x) for x in c["params"]])
+            for pid, c in ckpt.get("deferred", {}).items()
+        }
+        self.state_version = ckpt.get("state_version", 0)
+        score_handler.white_score = ckpt.get("scores", {}).get("white", 0)
+        score_handler.black_score = ckpt.get("scores", {}).get("black", 0)
+        move_history.white_move_history[:] = [tuple(m) for m in ckpt.get("history", {}).get("white", [])]
+        move_history.black_move_history[:] = [tuple(m) for m in ckpt.get("history", {}).get("black", [])]
+
+        self.set_virtual_time(ckpt.get("time_ms", 0))
+        self._did_reset = True  # pieces carry their own timing; don't reset them to idle
+        self._snapshot_dirty = True
+        self._update_cell2piece_map()
+
+    def next_wakeup_s(self) -> Optional[float]:
+        """
+        Wall-clock seconds until a tick could change anything without input:
+        0.0 while a piece is moving (collisions are checked along the path),
+        otherwise the time left until the earliest rest/jump cooldown ends
+        or held command is released from the jitter buffer, and None when
+        nothing is pending (or the game is over).  Lets a server ticker
+        sleep through idle periods and wake on the next command instead.
+        """
+        if not self._did_reset or self._snapshot_dirty:
+            return 0.0
+        if self._is_win():
+            return None
+        earliest = self.jitter.next_release_ms() if self.jitter is not None else None
+        for p in self.pieces:
+            physics = p.state.physics
+            if physics.motion() is not None:
+                return 0.0
+            deadline = physics.deadline_ms()
+            if deadline is not None and (earliest is None or deadline < earliest):
+                earliest = deadline
+        if earliest is None:
+            return None
+        if self._time_factor <= 0:
+            return None  # frozen clock: cooldowns never expire
+        return max(0.0, (earliest - self.game_time_ms()) / 1000.0 / self._time_factor)
+
     def clone_board(self) -> Board:
         return self.board.clone()
 
@@ -102,17 +278,27 @@ class Game(PublisherMixin):
             cursor_pos = self.kp2.get_cursor()
             cursors.append({"player": 2, "cell": cursor_pos})
         
+        pieces = []
+        for p in self.pieces:
+            entry = {
+                "id": p.id,
+                "cell": p.current_cell(),
+                "color": p.id[1],
+                "state": p.state.name,
+            }
+            # moving pieces carry their timing so clients can interpolate locally,
+            # resting/jumping ones when their cooldown ends
+            motion = p.state.physics.motion()
+            if motion is not None:
+                entry["motion"] = motion
+            elif p.state.physics.deadline_ms() is not None:
+                entry["until_ms"] = p.state.physics.deadline_ms()
+            pieces.append(entry)
+
         return {
             "version": self.state_version,
-            "pieces": [
-                {
-                    "id": p.id,
-                    "cell": p.current_cell(),
-                    "color": p.id[1],
-                    "state": p.state.name,
-                }
-                for p in self.pieces
-            ],
+            "time_ms": self.game_time_ms(),
+            "pieces": pieces,
             "cursors": cursors,
         }
 
@@ -150,16 +336,39 @@ class Game(PublisherMixin):
                 self.START_NS -= 1_000_000  # להזיז את ההתחלה אחורה ב־1ms
                 now = self.game_time_ms()
             prev_now = now
+            prof = self.profiler
+            wd = self.watchdog if prof is not None else None
+            if prof is not None:
+                prof.begin()
+            if wd is not None:
+                wd.tick_started()
+                queue_depth = self.user_input_queue.qsize()
+                tick_cmds: List[str] = []
 
             self._update_cell2piece_map()
+            if prof is not None:
+                prof.mark("map")
             # 1) drain and apply ALL pending commands first
-            while not self.user_input_queue.empty():
-                cmd: Command = self.user_input_queue.get()
+            #    (through the jitter buffer, if any: only those due, in timestamp order)
+            if self.jitter is not None:
+                while not self.user_input_queue.empty():
+                    self.jitter.push(self.user_input_queue.get(), now)
+            for cmd in self._commands_due(now):
+                if cmd.trace is not None:
+                    cmd.trace["dequeued"] = stamp_ms()
                 self._process_input(cmd)
+                if self.journal is not None:
+                    self.journal.record(cmd, now)
+                if wd is not None:
+                    tick_cmds.append(str(cmd))
+            if prof is not None:
+                prof.mark("input")
 
             # 2) advance piece animations / physics for current tick
             for p in self.pieces:
                 p.update(now)
+            if prof is not None:
+                prof.mark("update")
 
             for pid, pending_cmd in list(self._deferred_after_cooldown.items()):
                 p = self.piece_by_id.get(pid)
@@ -169,8 +378,10 @@ class Game(PublisherMixin):
 
                 if p.state.name.startswith("idle"):
                     before = p.current_cell()
+                    prev_state = p.state
                     p.on_command(pending_cmd, self.pos)
                     setattr(p, "_last_cmd_ts", pending_cmd.timestamp)
+                    self._stamp_applied(pending_cmd, refused=p.state is prev_state)
                     after = p.current_cell()
 
                     from_cell = pending_cmd.params[0] if pending_cmd.params else before
@@ -188,22 +399,46 @@ class Game(PublisherMixin):
                             player="white" if pending_cmd.piece_id[1] == "W" else "black",
                             capture=False,
                             timestamp_ms=pending_cmd.timestamp,
+                            cmd_id=pending_cmd.cmd_id,
                         )
                     del self._deferred_after_cooldown[pid]
+            if prof is not None:
+                prof.mark("deferred")
 
             # 3) rebuild cell→piece map *after* moves and updates
             self._update_cell2piece_map()
+            if prof is not None:
+                prof.mark("map")
 
             # 4) resolve collisions based on the fresh board state
             self._resolve_collisions()
+            if prof is not None:
+                prof.mark("collisions")
 
             if self._snapshot_dirty:
                 self._publish_snapshot()
+            if prof is not None:
+                prof.mark("snapshot")
+
+            if self.journal is not None:
+                self.journal.maybe_checkpoint(self, now)
+                if prof is not None:
+                    prof.mark("journal")
 
             # 5) render (optional)
             if is_with_graphics:
                 self._draw()
+                if prof is not None:
+                    prof.mark("draw")
                 self._show()
+                if prof is not None:
+                    prof.mark("show")
+
+            if prof is not None:
+                tick_ms = prof.end()
+                if wd is not None:
+                    wd.tick_finished(tick_ms, prof.last, game_time_ms=now, pieces=len(self.pieces),
+                                     queue_depth=queue_depth, commands=tick_cmds)
 
             # stop early for tests
             if num_iterations is not None:
@@ -211,6 +446,13 @@ class Game(PublisherMixin):
                 if it_counter >= num_iterations:
                     return
 
+    def _commands_due(self, now: int):
+        if self.jitter is not None:
+            yield from self.jitter.pop_ready(now)
+            return
+        while not self.user_input_queue.empty():
+            yield self.user_input_queue.get()
+
     def run(self, num_iterations=None, is_with_graphics=True):
         self.start_user_input_thread()
         start_ms = self.game_time_ms()
@@ -234,9 +476,26 @@ class Game(PublisherMixin):
 
     # ──────────────────────────────────────────────────────────────
     def _draw(self):
-        self.curr_board = self.clone_board()
+        # Static background + board are composited once; each tick only the
+        # rectangles of pieces/cursors that moved or changed frame are redrawn.
+        if self._compositor is None:
+            self._compositor = DirtyRectCompositor(board_img.img, self.board.img.img)
+            self.curr_board = Board(self.board.cell_H_pix, self.board.cell_W_pix,
+                                    self.board.W_cells, self.board.H_cells,
+                                    self._compositor.board_view)
+
+        now_ms = self.game_time_ms()
+        items = []
         for p in self.pieces:
-            p.draw_on_board(self.curr_board, now_ms=self.game_time_ms())
+            x, y = p.state.physics.get_pos_pix()
+            sprite = p.state.graphics.get_img()
+            h, w = sprite.img.shape[:2]
+            items.append(DrawItem(
+                key=p.id,
+                rect=(x, y, w, h),
+                signature=(id(sprite), p.state.name),
+                draw=lambda _view, p=p: p.draw_on_board(self.curr_board, now_ms=now_ms),
+            ))
 
         # overlay both players' cursors, but only log on change
         if self.kp1 and self.kp2:
@@ -251,7 +510,13 @@ class Game(PublisherMixin):
                 y2 = y1 + self.board.cell_H_pix - 1
                 x2 = x1 + self.board.cell_W_pix - 1
                 color = (0, 255, 0) if player == 1 else (255, 0, 0)
-                self.curr_board.img.draw_rect(x1, y1, x2, y2, color)
+                # thickness-2 outline spills one pixel past the cell on each side
+                items.append(DrawItem(
+                    key=("cursor", player),
+                    rect=(x1 - 2, y1 - 2, x2 - x1 + 5, y2 - y1 + 5),
+                    signature=color,
+                    draw=lambda view, box=(x1, y1, x2, y2), color=color: view.draw_rect(*box, color),
+                ))
 
                 # only print if moved
                 prev = getattr(self, last)
@@ -259,24 +524,15 @@ class Game(PublisherMixin):
                     logger.debug("Marker P%s moved to (%s, %s)", player, r, c)
                     setattr(self, last, (r, c))
 
-    def _show(self):
-        bg = board_img.img.copy()
-
-        board_np = self.curr_board.img.img
+        self._compositor.render(items)
 
-        if board_np.shape[2] == 4:
-            # strip alpha if exists (canvas is BGR)
-            board_np = board_np[..., :3]
-
-        h_bg, w_bg = bg.shape[:2]
-        h_b, w_b = board_np.shape[:2]
-        x_off = (w_bg - w_b) // 2
-        y_off = (h_bg - h_b) // 2
-
-        bg[y_off:y_off + h_b, x_off:x_off + w_b] = board_np
+    def _show(self):
+        frame = self._compositor.frame
 
         from types import SimpleNamespace
-        render_overlay(now_ms=self.game_time_ms(), board=SimpleNamespace(img=bg))
+        overlay_rect = render_overlay(now_ms=self.game_time_ms(), board=SimpleNamespace(img=frame))
+        # the overlay is painted straight onto the frame; repaint under it next tick
+        self._compositor.mark_dirty(overlay_rect)
         if not self._window_ready:
             try:
                 cv2.namedWindow("Game", cv2.WINDOW_NORMAL)
@@ -286,7 +542,7 @@ class Game(PublisherMixin):
             self._window_ready = True
 
         try:
-            cv2.imshow("Game", bg)
+            cv2.imshow("Game", frame)
             cv2.waitKey(1)
         except Exception as e:
             logger.debug("imshow skipped (headless?): %s", e)
@@ -295,6 +551,15 @@ class Game(PublisherMixin):
     def _side_of(self, piece_id: str) -> str:
         return piece_id[1]
 
+    @staticmethod
+    def _stamp_applied(cmd: Command, refused: bool) -> None:
+        if cmd.trace is None:
+            return
+        cmd.trace["applied"] = stamp_ms()
+        if refused and cmd.type == "move":
+            # the piece's rules turned the move down; the hub tells the sender why
+            cmd.trace["refused"] = cmd.trace["applied"]
+
     def _process_input(self, cmd: Command):
         """
         Apply the command to the addressed piece and (if it actually changes squares)
@@ -317,8 +582,10 @@ class Game(PublisherMixin):
 
         # Track position before/after to safely infer from/to when params are partial
         before = mover.current_cell()
+        prev_state = mover.state
         mover.on_command(cmd, self.pos)
         setattr(mover, "_last_cmd_ts", cmd.timestamp)
+        self._stamp_applied(cmd, refused=mover.state is prev_state)
         after = mover.current_cell()
 
         # Derive from/to safely:
@@ -342,6 +609,7 @@ class Game(PublisherMixin):
                 player="white" if cmd.piece_id[1] == "W" else "black",
                 capture=False,
                 timestamp_ms=cmd.timestamp,  # relative game-time for history UI/tests
+                cmd_id=cmd.cmd_id,  # lets the hub report the command's end-to-end latency
             )
 
         # Optional UX cue: play a non-capture move sound regardless
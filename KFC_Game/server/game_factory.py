@@ -13,12 +13,17 @@ from ..graphics.graphics_factory import GraphicsFactory
 CELL_PX = 64
 
 
-def create_game(pieces_root: str | pathlib.Path, img_factory) -> Game:
+def create_game(pieces_root: str | pathlib.Path, img_factory, *, lazy_sprites: bool = False,
+                prefetch_sprites: bool = False) -> Game:
     """Build a *Game* from the on-disk asset hierarchy rooted at *pieces_root*.
 
     This reads *board.csv* located inside *pieces_root*, creates a blank board
     (or loads board.png if present), instantiates every piece via PieceFactory
     and returns a ready-to-run *Game* instance.
+
+    With *lazy_sprites* piece sprites are decoded on first use instead of
+    up front; *prefetch_sprites* (which implies it) also starts a background
+    thread that warms them, idle and move states first.
     """
     root = pathlib.Path(pieces_root)
     if not root.is_absolute():
@@ -42,7 +47,7 @@ def create_game(pieces_root: str | pathlib.Path, img_factory) -> Game:
 
     board = Board(CELL_PX, CELL_PX, 8, 8, board_img)
 
-    gfx_factory = GraphicsFactory(img_factory)
+    gfx_factory = GraphicsFactory(img_factory, lazy=lazy_sprites or prefetch_sprites)
     pf = PieceFactory(board, pieces_root, graphics_factory=gfx_factory)
 
     pieces = []
@@ -52,6 +57,9 @@ def create_game(pieces_root: str | pathlib.Path, img_factory) -> Game:
                 if code:
                     pieces.append(pf.create_piece(code, (r, c)))
 
+    if prefetch_sprites:
+        gfx_factory.prefetch(background=True)
+
     event_bus = EventBus()
     subscribe_to_events(event_bus)
     subscribe_to_events_capture(event_bus)
@@ -0,0 +1,85 @@
+# KFC_Game/server/jitter_buffer.py
+from __future__ import annotations
+import heapq
+import itertools
+from typing import List, Optional, Tuple
+
+from ..shared.command import Command
+from ..shared.stats import RollingStats
+
+
+class JitterBuffer:
+    """
+    Holds incoming commands briefly so near-simultaneous ones are applied in
+    the order of their (server-synchronised) timestamps rather than their
+    arrival order.
+
+    A command is released at its timestamp + *delay_ms*, clamped to
+    [arrival, arrival + delay_ms]: a command from a slow link that is
+    already late goes out at once, one stamped in the future never waits
+    longer than *delay_ms*.  The timestamp itself is clamped the same way,
+    to [arrival - delay_ms, arrival], since it is both the ordering key and
+    the time the piece's move starts: a skewed or bogus client clock can
+    neither jump the queue nor backdate or postdate a move beyond the
+    delay.  Everything released in the same tick is applied in timestamp
+    order.  A larger delay is fairer to slow links and costs
+    everyone that much latency; 0 disables the buffer's effect.
+    """
+
+    def __init__(self, delay_ms: int = 30, *, window: int = 1024):
+        self.delay_ms = delay_ms
+        self._heap: List[Tuple[int, int, int, Command]] = []  # (release_ms, timestamp, arrival seq, cmd)
+        self._seq = itertools.count()
+        self._arrived: dict = {}  # arrival seq -> arrival ms, while held
+        self.pushed = 0
+        self.released = 0
+        self.reordered = 0  # released ahead of a command that arrived before it
+        self.late = 0       # arrived after its own release time (no wait at all)
+        self.clamped = 0    # timestamp pulled into [arrival - delay_ms, arrival]
+        self.held_ms = RollingStats(window)
+
+    def push(self, cmd: Command, arrival_ms: int) -> None:
+        ts = min(max(cmd.timestamp, arrival_ms - self.delay_ms), arrival_ms)
+        if ts != cmd.timestamp:
+            cmd.timestamp = ts
+            self.clamped += 1
+        release = ts + self.delay_ms
+        if release == arrival_ms and self.delay_ms:
+            self.late += 1
+        seq = next(self._seq)
+        self._arrived[seq] = arrival_ms
+        heapq.heappush(self._heap, (release, cmd.timestamp, seq, cmd))
+        self.pushed += 1
+
+    def pop_ready(self, now_ms: int) -> List[Command]:
+        """Commands due by *now_ms*, in timestamp order."""
+        due = []
+        while self._heap and self._heap[0][0] <= now_ms:
+            due.append(heapq.heappop(self._heap))
+        due.sort(key=lambda e: (e[1], e[2]))
+        out = []
+        for _, _, seq, cmd in due:
+            if min(self._arrived) != seq:  # something that arrived earlier is still to come
+                self.reordered += 1
+            self.held_ms.add(now_ms - self._arrived.pop(seq))
+            out.append(cmd)
+        self.released += len(out)
+        return out
+
+    def next_release_ms(self) -> Optional[int]:
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def stats(self) -> dict:
+        return {
+            "delay_ms": self.delay_ms,
+            "depth": len(self._heap),
+            "pushed": self.pushed,
+            "released": self.released,
+            "reordered": self.reordered,
+            "late": self.late,
+            "clamped": self.clamped,
+            "held_ms": self.held_ms.summary(),
+        }
@@ -0,0 +1,244 @@
+# KFC_Game/server/journal.py
+from __future__ import annotations
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ..shared.command import Command
+
+logger = logging.getLogger(__name__)
+
+# record = header + payload; payload is the compact JSON of the command
+_HEADER = struct.Struct("<IIQq")  # payload length, crc32(payload), seq, applied game time (ms)
+
+JOURNAL_FILE = "commands.journal"
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    seq: int
+    applied_ms: int
+    cmd: Command
+    end: int = 0  # byte offset just past the record in the journal file (0 when not read from one)
+
+
+def _encode(cmd: Command) -> bytes:
+    return json.dumps({
+        "timestamp": cmd.timestamp,
+        "piece_id": cmd.piece_id,
+        "type": cmd.type,
+        "params": [list(p) if isinstance(p, tuple) else p for p in cmd.params],
+        "cmd_id": cmd.cmd_id,
+    }, separators=(",", ":")).encode()
+
+
+def _decode(payload: bytes) -> Command:
+    d = json.loads(payload)
+    params = [tuple(p) if isinstance(p, list) else p for p in d.get("params", [])]
+    return Command(d["timestamp"], d["piece_id"], d["type"], params, d.get("cmd_id"))
+
+
+def read_journal(path: str | Path) -> Iterator[JournalRecord]:
+    """Records in order; stops quietly at a torn or corrupt tail (crash mid-write)."""
+    path = Path(path)
+    if not path.exists():
+        return
+    last_seq = 0
+    with path.open("rb") as f:
+        while True:
+            head = f.read(_HEADER.size)
+            if not head:
+                return
+            if len(head) == _HEADER.size:
+                length, crc, seq, applied_ms = _HEADER.unpack(head)
+                payload = f.read(length)
+                if len(payload) == length and zlib.crc32(payload) == crc:
+                    last_seq = seq
+                    yield JournalRecord(seq, applied_ms, _decode(payload), f.tell())
+                    continue
+            logger.warning("journal %s: dropping corrupt tail after seq %s", path, last_seq)
+            return
+
+
+def write_checkpoint(path: str | Path, state: dict, seq: int) -> None:
+    """Atomically replace the checkpoint (write to a temp file, then rename)."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"seq": seq, "state": state}, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str | Path) -> Optional[dict]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CommandJournal:
+    """
+    Append-only journal of applied commands plus periodic state checkpoints.
+
+    record() and maybe_checkpoint() are called from the tick and only put
+    work on a queue; a writer thread appends, flushes (fsync with *fsync*)
+    and writes checkpoints, so disk latency never reaches the game loop.
+    Checkpoints travel through the same queue, so the journal sequence
+    number stored with one always matches the records written before it.
+    """
+
+    def __init__(self, directory: str | Path, *, checkpoint_every_s: float = 10.0,
+                 fsync: bool = False, start_seq: int = 0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / JOURNAL_FILE
+        self.checkpoint_path = self.directory / CHECKPOINT_FILE
+        self.checkpoint_every_ms = int(checkpoint_every_s * 1000)
+        self.fsync = fsync
+        self.seq = start_seq
+        self._last_checkpoint_ms: Optional[int] = None
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = self.path.open("ab")
+        self.records_written = 0
+        self.checkpoints_written = 0
+        self._writer = threading.Thread(target=self._run, daemon=True, name="command-journal")
+        self._writer.start()
+
+    # ── tick side (never blocks) ─────────────────────────────────
+    def record(self, cmd: Command, applied_ms: int) -> None:
+        self.seq += 1
+        payload = _encode(cmd)
+        self._q.put(("cmd", _HEADER.pack(len(payload), zlib.crc32(payload), self.seq, applied_ms) + payload))
+
+    def maybe_checkpoint(self, game, now_ms: int) -> None:
+        if self._last_checkpoint_ms is None:
+            self._last_checkpoint_ms = now_ms
+        if now_ms - self._last_checkpoint_ms < self.checkpoint_every_ms:
+            return
+        self.checkpoint(game)
+
+    def checkpoint(self, game) -> None:
+        self._last_checkpoint_ms = game.game_time_ms()
+        self._q.put(("ckpt", game.checkpoint_state(), self.seq))
+
+    # ── writer thread ─────────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            items = [self._q.get()]
+            while True:  # take everything queued so far as one batch
+                try:
+                    items.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            try:
+                for item in items:
+                    if item is None:
+                        stop = True
+                    elif item[0] == "cmd":
+                        self._file.write(item[1])
+                        self.records_written += 1
+                    elif item[0] == "ckpt":
+                        self._sync()
+                        write_checkpoint(self.checkpoint_path, item[1], item[2])
+                        self.checkpoints_written += 1
+                    elif item[0] == "flush":
+                        self._sync()
+                        item[1].set()
+                self._sync()
+            except Exception:
+                logger.exception("journal write failed")
+            if stop:
+                self._file.close()
+                return
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    # ── lifecycle ─────────────────────────────────────────────────
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is on disk (tests, shutdown)."""
+        done = threading.Event()
+        self._q.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._q.put(None)
+        self._writer.join(timeout)
+
+
+def recover(game, directory: str | Path, *, step_ms: float = 1000 / 60) -> dict:
+    """
+    Resume *game* (freshly created) from the checkpoint and journal in
+    *directory*: restore the checkpoint, re-apply the journal tail at the
+    recorded game times under a virtual clock, then continue on the wall
+    clock from the last applied time.  Returns what was done.
+    """
+    t0 = time.perf_counter()
+    directory = Path(directory)
+    ckpt = load_checkpoint(directory / CHECKPOINT_FILE)
+    base_seq = 0
+    if ckpt is not None:
+        game.restore_state(ckpt["state"])
+        base_seq = ckpt["seq"]
+    else:
+        game.set_virtual_time(0)
+
+    from .replay import VirtualClockDriver  # replay builds on this module
+
+    drv = VirtualClockDriver(game, step_ms=step_ms)
+    last_seq = base_seq
+    replayed = 0
+    valid_bytes = 0
+    for rec in read_journal(directory / JOURNAL_FILE):
+        last_seq = max(last_seq, rec.seq)
+        valid_bytes = rec.end
+        if rec.seq <= base_seq:
+            continue
+        # tick up to the recorded time so physics/collisions see the same gaps
+        drv.apply(rec.cmd, rec.applied_ms)
+        replayed += 1
+
+    resumed_at = game.game_time_ms()
+    game.resume_real_time()
+    return {
+        "checkpoint_seq": base_seq if ckpt is not None else None,
+        "replayed": replayed,
+        "last_seq": last_seq,
+        "valid_bytes": valid_bytes,  # the journal's intact prefix; anything after it is a torn tail
+        "resumed_at_ms": resumed_at,
+        "elapsed_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+
+
+def open_journal(game, directory: str | Path, *, checkpoint_every_s: float = 10.0,
+                 fsync: bool = False) -> CommandJournal:
+    """Recover *game* from *directory* if it holds a previous run, then journal into it."""
+    info = recover(game, directory)
+    if info["last_seq"] or info["checkpoint_seq"] is not None:
+        logger.info("recovered game from %s: %s", directory, info)
+    path = Path(directory) / JOURNAL_FILE
+    if path.exists() and path.stat().st_size > info["valid_bytes"]:
+        # cut the torn tail off, or the records appended after it would be
+        # unreadable to the next recovery
+        os.truncate(path, info["valid_bytes"])
+    journal = CommandJournal(directory, checkpoint_every_s=checkpoint_every_s,
+                             fsync=fsync, start_seq=info["last_seq"])
+    game.journal = journal
+    if game._did_reset:
+        journal.checkpoint(game)  # later recoveries start here, not at the old tail
+    return journal
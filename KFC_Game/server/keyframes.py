@@ -0,0 +1,112 @@
+# KFC_Game/server/keyframes.py
+"""
+Keyframe index for seeking in recorded games.
+
+build_keyframes() replays a recorded game once and keeps a compact state
+(Game.checkpoint_state) every *interval_ms* of game time, together with
+how many commands had been applied by then.  seek() restores the nearest
+keyframe at or before the wanted time and simulates only the gap, so the
+cost of a seek is bounded by the interval, not by the length of the game.
+"""
+from __future__ import annotations
+import bisect
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from ..config.settings import PIECES_DIR
+from ..graphics.graphics_factory import MockImgFactory
+from .game_factory import create_game
+from .journal import JournalRecord
+from .replay import ReplayResult, replay
+
+KEYFRAMES_FILE = "keyframes.json"
+
+
+@dataclass
+class Keyframe:
+    time_ms: int
+    clock_ms: float    # unrounded virtual clock, so the seek ticks on the recorded grid
+    next_record: int   # commands applied before this keyframe
+    state: dict
+
+
+@dataclass
+class KeyframeIndex:
+    interval_ms: int
+    hz: float
+    keyframes: List[Keyframe] = field(default_factory=list)
+    records: Optional[int] = None   # length of the recording it was built from
+    last_seq: Optional[int] = None  # and the seq of its last record
+
+    def matches(self, records: Sequence[JournalRecord], hz: float) -> bool:
+        """Whether this index was built from *records* at *hz* (else it is stale)."""
+        last_seq = records[-1].seq if records else 0
+        return self.hz == hz and self.records == len(records) and self.last_seq == last_seq
+
+    def nearest(self, t_ms: int) -> Optional[Keyframe]:
+        """Latest keyframe at or before *t_ms* (None: seek from the start)."""
+        i = bisect.bisect_right([k.time_ms for k in self.keyframes], t_ms)
+        return self.keyframes[i - 1] if i else None
+
+    def save(self, path: str | pathlib.Path) -> None:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            path = path / KEYFRAMES_FILE
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({
+                "interval_ms": self.interval_ms,
+                "hz": self.hz,
+                "records": self.records,
+                "last_seq": self.last_seq,
+                "keyframes": [vars(k) for k in self.keyframes],
+            }, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "KeyframeIndex":
+        path = pathlib.Path(path)
+        if path.is_dir():
+            path = path / KEYFRAMES_FILE
+        with path.open(encoding="utf-8") as f:
+            d = json.load(f)
+        return cls(d["interval_ms"], d["hz"], [Keyframe(**k) for k in d["keyframes"]],
+                   d.get("records"), d.get("last_seq"))
+
+
+def build_keyframes(records: Sequence[JournalRecord], *, interval_ms: int = 10_000,
+                    hz: float = 60.0, pieces_dir: str | pathlib.Path = PIECES_DIR) -> KeyframeIndex:
+    """Replay *records* once, keeping a keyframe on the first tick of every interval."""
+    index = KeyframeIndex(interval_ms, hz, records=len(records),
+                          last_seq=records[-1].seq if records else 0)
+    next_due = [interval_ms]
+
+    def _on_tick(drv):
+        now = drv.now_ms
+        if now < next_due[0]:
+            return
+        index.keyframes.append(Keyframe(now, drv.clock_ms, drv.commands, drv.game.checkpoint_state()))
+        next_due[0] = (now // interval_ms + 1) * interval_ms
+
+    replay(records, hz=hz, pieces_dir=pieces_dir, collect_events=False, on_tick=_on_tick)
+    return index
+
+
+def seek(records: Sequence[JournalRecord], index: KeyframeIndex, t_ms: int, *,
+         pieces_dir: str | pathlib.Path = PIECES_DIR, collect_events: bool = False) -> ReplayResult:
+    """The game as it was at *t_ms*: nearest keyframe, then only the gap is simulated."""
+    kf = index.nearest(t_ms)
+    if kf is None:
+        return replay(records, hz=index.hz, pieces_dir=pieces_dir, until_ms=t_ms,
+                      collect_events=collect_events)
+
+    game = create_game(pieces_dir, MockImgFactory())
+    game.restore_state(kf.state)
+    result = replay(records[kf.next_record:], hz=index.hz, until_ms=t_ms, game=game,
+                    start_ms=kf.clock_ms, collect_events=collect_events)
+    result.stats["keyframe_ms"] = kf.time_ms
+    result.stats["commands"] += kf.next_record
+    return result
@@ -8,7 +8,9 @@ from pathlib import Path
 # Import components
 from .game_factory import create_game
 from ..graphics.graphics_factory import ImgFactory
-from ..config.settings import PIECES_DIR, WS_HOST, WS_PORT
+from ..config.settings import (PIECES_DIR, WS_HOST, WS_PORT, SIM_THREAD, BATCH_EVENTS,
+                               JOURNAL_DIR, PROFILE_TICKS, TICK_BUDGET_MS, SLOW_TICK_STACKS,
+                               METRICS_PORT, INPUT_DELAY_MS)
 
 logger = logging.getLogger(__name__)
 
@@ -16,25 +18,33 @@ DEFAULT_HOST = WS_HOST or "localhost"
 DEFAULT_PORT = WS_PORT or 8765
 
 
-async def run_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+async def run_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, sim_thread: bool = SIM_THREAD):
     """
     Run the game server.
     
     Args:
         host: Server host address
         port: Server port number
+        sim_thread: Tick the game on a dedicated thread instead of the I/O loop
     """
     logger.info(f"Starting KFC server on {host}:{port}")
     
     try:
         # Create game instance for server - this will properly subscribe to all events including move_history
         game = create_game(PIECES_DIR, ImgFactory())
-        
+        if JOURNAL_DIR:
+            # resume from the previous run's checkpoint + journal, then keep journaling
+            from .journal import open_journal
+            open_journal(game, JOURNAL_DIR)
+
         # Import server-specific modules
         from .ws_server import serve_and_tick
         
         # Start server with game loop
-        await serve_and_tick(game, host=host, port=port)
+        await serve_and_tick(game, host=host, port=port, threaded=sim_thread,
+                             batch_events=BATCH_EVENTS, profile=PROFILE_TICKS,
+                             tick_budget_ms=TICK_BUDGET_MS, slow_tick_stacks=SLOW_TICK_STACKS,
+                             metrics_port=METRICS_PORT, input_delay_ms=INPUT_DELAY_MS)
         
     except Exception as e:
         logger.error(f"Server error: {e}")
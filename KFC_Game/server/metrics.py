@@ -0,0 +1,170 @@
+# KFC_Game/server/metrics.py
+"""
+Server metrics: counters kept by WSHub, and a small local HTTP endpoint
+that renders them (with the game's tick timings) in the Prometheus text
+format at /metrics, or as JSON at /metrics.json.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, List
+
+from ..shared.stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+_QUANTILES = (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99"))
+
+
+class HubMetrics:
+    """Plain counters; the hub only touches them from the asyncio loop."""
+
+    def __init__(self, window: int = 1024):
+        self.messages: Dict[str, int] = defaultdict(int)  # kind -> messages sent (per client)
+        self.bytes: Dict[str, int] = defaultdict(int)     # kind -> bytes sent
+        self.commands: Dict[str, int] = defaultdict(int)  # "accepted" / "rejected"
+        self.rejections: Dict[str, int] = defaultdict(int)  # reason -> count
+        self.snapshot_encode_ms = RollingStats(window)
+
+    def sent(self, kind: str, data: str) -> None:
+        self.messages[kind] += 1
+        self.bytes[kind] += len(data)  # protocol JSON is ASCII: chars == bytes
+
+    def command(self, accepted: bool, reason: str | None = None) -> None:
+        if accepted:
+            self.commands["accepted"] += 1
+        else:
+            self.commands["rejected"] += 1
+            self.rejections[reason or "invalid"] += 1
+
+
+def collect(hub, game) -> dict:
+    """Everything the endpoint reports, as one JSON-friendly dict."""
+    m = hub.metrics
+    scheduler = getattr(hub, "scheduler", None)
+    watchdog = getattr(game, "watchdog", None)
+    return {
+        "tick": game.profile_stats(),
+        "tick_rate_hz": scheduler.achieved_hz if scheduler is not None else None,
+        "input_queue_depth": game.user_input_queue.qsize(),
+        "clients": len(hub._clients),
+        "client_send_queue": hub.send_queue_depths(),
+        "messages_sent": dict(m.messages),
+        "bytes_sent": dict(m.bytes),
+        "snapshot_encode_ms": m.snapshot_encode_ms.summary(),
+        "commands": dict(m.commands),
+        "rejections": dict(m.rejections),
+        "snapshot_replies": dict(hub.snapshot_replies),
+        "snapshots": {"sent": hub.snapshots_sent, "skipped": hub.snapshots_skipped},
+        "command_latency_ms": hub.latency.summary(),
+        "slow_ticks": watchdog.stats() if watchdog is not None else None,
+        "jitter_buffer": game.jitter.stats() if getattr(game, "jitter", None) is not None else None,
+        "state_version": game.state_version,
+    }
+
+
+def _label(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _summary(lines: List[str], name: str, s: dict, labels: str = "") -> None:
+    sep = "," if labels else ""
+    for q, key in _QUANTILES:
+        lines.append(f'{name}{{{labels}{sep}quantile="{q}"}} {s[key]:.6g}')
+    lab = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{lab} {s['mean'] * s['count']:.6g}")
+    lines.append(f"{name}_count{lab} {s['count']}")
+    lines.append(f"{name}_max{lab} {s['max']:.6g}")
+
+
+def render_prometheus(hub, game) -> str:
+    d = collect(hub, game)
+    out: List[str] = []
+
+    def gauge(name, value, help_):
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} gauge")
+        out.append(f"{name} {value}")
+
+    def counter(name, values: dict, label: str, help_):
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} counter")
+        for k, v in sorted(values.items()):
+            out.append(f'{name}{{{label}="{_label(k)}"}} {v}')
+
+    if d["tick"] is not None:
+        out.append("# HELP kfc_tick_duration_ms Server tick wall time (rolling window).")
+        out.append("# TYPE kfc_tick_duration_ms summary")
+        _summary(out, "kfc_tick_duration_ms", d["tick"]["tick"])
+        out.append("# HELP kfc_tick_phase_ms Wall time of each tick phase (rolling window).")
+        out.append("# TYPE kfc_tick_phase_ms summary")
+        for phase, s in d["tick"]["phases"].items():
+            _summary(out, "kfc_tick_phase_ms", s, f'phase="{phase}"')
+    if d["tick_rate_hz"] is not None:
+        gauge("kfc_tick_rate_hz", f"{d['tick_rate_hz']:.6g}", "Achieved server tick rate.")
+    gauge("kfc_input_queue_depth", d["input_queue_depth"], "Commands waiting for the next tick.")
+    gauge("kfc_clients_connected", d["clients"], "Connected WebSocket clients.")
+    gauge("kfc_state_version", d["state_version"], "Current game state version.")
+    counter("kfc_messages_sent_total", d["messages_sent"], "type", "Messages sent to clients by type.")
+    counter("kfc_bytes_sent_total", d["bytes_sent"], "type", "Bytes sent to clients by type.")
+    out.append("# HELP kfc_snapshot_encode_ms Time to serialise a snapshot message.")
+    out.append("# TYPE kfc_snapshot_encode_ms summary")
+    _summary(out, "kfc_snapshot_encode_ms", d["snapshot_encode_ms"])
+    counter("kfc_commands_total", d["commands"], "status", "Commands accepted or rejected by the hub.")
+    counter("kfc_commands_rejected_total", d["rejections"], "reason", "Rejected commands by reason.")
+    if d["command_latency_ms"]:
+        out.append("# HELP kfc_command_latency_ms Command latency on the server by stage "
+                   "(queue, apply, broadcast, server total).")
+        out.append("# TYPE kfc_command_latency_ms summary")
+        for stage, s in sorted(d["command_latency_ms"].items()):
+            _summary(out, "kfc_command_latency_ms", s, f'stage="{stage}"')
+    counter("kfc_snapshot_replies_total", d["snapshot_replies"], "kind", "Answers to snapshot requests.")
+    out.append("# HELP kfc_client_send_queue_depth Messages queued but not yet written, per client.")
+    out.append("# TYPE kfc_client_send_queue_depth gauge")
+    for client, depth in sorted(d["client_send_queue"].items()):
+        out.append(f'kfc_client_send_queue_depth{{client="{_label(client)}"}} {depth}')
+    if d["slow_ticks"] is not None:
+        gauge("kfc_slow_ticks_total", d["slow_ticks"]["overruns"], "Ticks over the tick budget.")
+    jb = d["jitter_buffer"]
+    if jb is not None:
+        gauge("kfc_jitter_delay_ms", jb["delay_ms"], "Input jitter buffer delay.")
+        gauge("kfc_jitter_depth", jb["depth"], "Commands held in the jitter buffer.")
+        counter("kfc_jitter_commands_total", {k: jb[k] for k in ("released", "reordered", "late", "clamped")},
+                "outcome", "Commands through the jitter buffer: released, reordered, arrived late, "
+                "timestamp clamped.")
+        out.append("# HELP kfc_jitter_held_ms Time commands spent in the jitter buffer.")
+        out.append("# TYPE kfc_jitter_held_ms summary")
+        _summary(out, "kfc_jitter_held_ms", jb["held_ms"])
+    return "\n".join(out) + "\n"
+
+
+async def serve_metrics(hub, game, host: str = "127.0.0.1", port: int = 9100) -> asyncio.AbstractServer:
+    """Start the HTTP endpoint; close the returned server to stop it."""
+
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            parts = request.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+            if path == "/metrics":
+                status, ctype, body = "200 OK", "text/plain; version=0.0.4", render_prometheus(hub, game)
+            elif path == "/metrics.json":
+                status, ctype, body = "200 OK", "application/json", json.dumps(collect(hub, game))
+            elif path == "/slow_ticks":
+                status, ctype, body = "200 OK", "application/json", json.dumps(game.slow_ticks())
+            else:
+                status, ctype, body = "404 Not Found", "text/plain", "not found\n"
+            data = body.encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except Exception:
+            logger.exception("metrics request failed")
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, host, port)
@@ -0,0 +1,180 @@
+# KFC_Game/server/replay.py
+"""
+Headless replay of recorded games.
+
+A recorded game is the command journal a server writes (KFC_JOURNAL_DIR,
+see journal.py) or a JSON-lines file of commands, optionally carrying the
+game time each was applied at.  The game is rebuilt from board.csv and
+every command is fed at its recorded time under a virtual clock, ticking
+in fixed steps between them, as fast as the CPU allows.
+"""
+from __future__ import annotations
+import json
+import pathlib
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+
+from ..config.settings import PIECES_DIR
+from ..graphics.graphics_factory import MockImgFactory
+from ..network.protocol import command_from_json
+from ..shared import score_handler, move_history
+from ..shared.command import Command
+from ..shared.event import Event, EventType
+from ..shared.stats import RollingStats
+from .game_factory import create_game
+from .journal import JOURNAL_FILE, JournalRecord, read_journal
+
+
+class VirtualClockDriver:
+    """Ticks a game under a virtual clock: fixed steps, commands at exact times."""
+
+    def __init__(self, game, *, step_ms: float = 1000 / 60, tick_stats: RollingStats | None = None,
+                 start_ms: float | None = None, on_tick: Callable[["VirtualClockDriver"], None] | None = None):
+        self.game = game
+        self.step_ms = step_ms
+        self.ticks = 0
+        self.commands = 0
+        self.tick_ms = tick_stats or RollingStats(window=4096)
+        self.on_tick = on_tick
+        # the unrounded clock: keyframes carry it so a seek ticks on the same grid
+        self._now = float(game.game_time_ms() if start_ms is None else start_ms)
+        game.set_virtual_time(int(self._now))
+
+    @property
+    def now_ms(self) -> int:
+        return self.game.game_time_ms()
+
+    @property
+    def clock_ms(self) -> float:
+        return self._now
+
+    def tick(self) -> None:
+        t0 = time.perf_counter()
+        self.game._run_game_loop(num_iterations=1, is_with_graphics=False)
+        self.tick_ms.add((time.perf_counter() - t0) * 1000.0)
+        self.ticks += 1
+        if self.on_tick is not None:
+            self.on_tick(self)
+
+    def advance_to(self, t_ms: float) -> None:
+        """Tick every step_ms up to (not including) *t_ms*, then sit at *t_ms*."""
+        while self._now + self.step_ms < t_ms:
+            self._now += self.step_ms
+            self.game.set_virtual_time(int(self._now))
+            self.tick()
+        self._now = max(self._now, float(t_ms))
+        self.game.set_virtual_time(int(self._now))
+
+    def apply(self, cmd: Command, at_ms: int) -> None:
+        self.advance_to(at_ms)
+        self.game.user_input_queue.put(cmd)
+        self.commands += 1
+        self.tick()
+
+    def settle(self, limit_ms: float) -> None:
+        """Keep ticking until nothing is moving or cooling down (or *limit_ms*)."""
+        while self._now < limit_ms and not self.game._is_win():
+            if self.game.next_wakeup_s() is None:
+                return
+            self._now += self.step_ms
+            self.game.set_virtual_time(int(self._now))
+            self.tick()
+
+
+def load_records(path: str | pathlib.Path) -> List[JournalRecord]:
+    """
+    Commands of a recorded game: a journal directory or file, or JSON lines
+    (protocol command JSON, optionally with "applied_ms"; else timestamp).
+    """
+    path = pathlib.Path(path)
+    if path.is_dir():
+        path = path / JOURNAL_FILE
+    if path.suffix in (".jsonl", ".json"):
+        records = []
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                cmd = command_from_json(line)
+                applied = json.loads(line).get("applied_ms", cmd.timestamp)
+                records.append(JournalRecord(len(records) + 1, int(applied), cmd))
+        return records
+    return list(read_journal(path))
+
+
+@dataclass
+class ReplayResult:
+    final: dict                      # Game.snapshot() once the game has settled
+    events: List[Event] = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+
+def replay(records: Iterable[JournalRecord], *, pieces_dir: str | pathlib.Path = PIECES_DIR,
+           hz: float = 60.0, until_ms: Optional[int] = None, settle_ms: int = 30_000,
+           collect_events: bool = True, on_event: Callable[[Event], None] | None = None,
+           on_tick: Callable[[VirtualClockDriver], None] | None = None,
+           game=None, start_ms: float | None = None) -> ReplayResult:
+    """
+    Rebuild the game and run *records* through it.  With *until_ms* the
+    replay stops at that game time (later commands are not applied);
+    otherwise it runs past the last command until the board settles.
+    A *game* already restored mid-way (see keyframes.py) continues from
+    its own time, or from *start_ms*.
+    """
+    if game is None:
+        score_handler.reset_scores()
+        move_history.clear_move_histories()
+        game = create_game(pieces_dir, MockImgFactory())
+        game.set_virtual_time(0)
+
+    events: List[Event] = []
+    sinks = []
+    if collect_events:
+        sinks.append(events.append)
+    if on_event is not None:
+        sinks.append(on_event)
+
+    def _sink(evt):
+        for s in sinks:
+            s(evt)
+
+    for et in EventType:
+        game.bus.subscribe(et, _sink)
+
+    t0 = time.perf_counter()
+    drv = VirtualClockDriver(game, step_ms=1000.0 / hz, start_ms=start_ms, on_tick=on_tick)
+    try:
+        if not game._did_reset:
+            drv.tick()
+        for rec in records:
+            if until_ms is not None and rec.applied_ms > until_ms:
+                break
+            drv.apply(rec.cmd, rec.applied_ms)
+        if until_ms is not None:
+            drv.advance_to(until_ms)
+            drv.tick()
+        else:
+            drv.settle(drv.now_ms + settle_ms)
+    finally:
+        for et in EventType:
+            game.bus.unsubscribe(et, _sink)
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+
+    sim_ms = game.game_time_ms()
+    return ReplayResult(
+        final=game.snapshot(),
+        events=events,
+        stats={
+            "commands": drv.commands,
+            "ticks": drv.ticks,
+            "sim_ms": sim_ms,
+            "wall_ms": wall_ms,
+            "speedup": sim_ms / wall_ms if wall_ms else 0.0,
+            "ticks_per_s": drv.ticks / (wall_ms / 1000.0) if wall_ms else 0.0,
+            "tick_ms": drv.tick_ms.summary(),
+            "scores": {"white": score_handler.white_score, "black": score_handler.black_score},
+            "state_version": game.state_version,
+            "winner_decided": game._is_win(),
+        },
+    )
@@ -0,0 +1,112 @@
+# KFC_Game/server/sim_thread.py
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+from typing import List
+
+from ..shared.bus import EventBus
+from ..shared.event import Event, EventType
+from ..shared.scheduler import FixedRateScheduler
+from ..shared.stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationThread(threading.Thread):
+    """
+    Runs the game tick on a dedicated thread, off the asyncio I/O loop.
+
+    Commands come in through submit() (thread-safe; wakes an idle ticker).
+    Everything the game publishes during a tick is collected and handed to
+    the I/O loop as one batch per tick, where it is re-published on
+    *out_bus* – so hub subscribers run on the loop thread and a slow tick
+    never stalls WebSocket reads, acks or pings.  Readers of game state on
+    other threads (snapshots) must hold *lock*; ticks run under it.
+    """
+
+    def __init__(self, game, loop: asyncio.AbstractEventLoop, out_bus: EventBus, *,
+                 hz: float = 60.0, adaptive: bool = False, idle_sleep: bool = True,
+                 stats_window: int = 600):
+        super().__init__(daemon=True, name="game-sim")
+        self.game = game
+        self.lock = threading.RLock()
+        self.scheduler = FixedRateScheduler(hz, adaptive=adaptive, window=stats_window)
+        self.idle_sleep = idle_sleep
+        self._loop = loop
+        self._out_bus = out_bus
+        self._pending: List[Event] = []
+        self._wake = threading.Event()
+        self._stop_evt = threading.Event()
+        self.ticks = 0
+        self.batches = 0
+        self.events = 0
+        self.tick_ms = RollingStats(stats_window)
+        for et in EventType:
+            game.bus.subscribe(et, self._pending.append)
+
+    # ──────────────────────────────────────────────────────────────
+    def submit(self, cmd) -> None:
+        """Queue a command for the next tick; callable from any thread."""
+        self.game.user_input_queue.put(cmd)
+        self._wake.set()
+
+    def run(self):
+        try:
+            while not self._stop_evt.is_set():
+                t0 = time.perf_counter()
+                try:
+                    with self.lock:
+                        self.game._run_game_loop(num_iterations=1, is_with_graphics=False)
+                        timeout = self.game.next_wakeup_s() if self.idle_sleep else 0.0
+                except Exception:
+                    logger.exception("game tick failed")
+                    timeout = 0.0
+                self.ticks += 1
+                self.tick_ms.add((time.perf_counter() - t0) * 1000.0)
+                self._flush()
+
+                if timeout is None or timeout > self.scheduler.period:
+                    self._wake.clear()
+                    if self.game.user_input_queue.empty() and not self._stop_evt.is_set():
+                        self._wake.wait(timeout)
+                    self.scheduler.reset()
+                    continue
+                self.scheduler.wait_blocking(self._stop_evt)
+        finally:
+            for et in EventType:
+                self.game.bus.unsubscribe(et, self._pending.append)
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch = self._pending[:]
+        del self._pending[:]
+        self.batches += 1
+        self.events += len(batch)
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, batch)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _deliver(self, batch: List[Event]) -> None:
+        for evt in batch:
+            self._out_bus.publish(evt)
+
+    # ──────────────────────────────────────────────────────────────
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_evt.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "batches": self.batches,
+            "events": self.events,
+            "tick_ms": self.tick_ms.summary(),
+            "pacing": self.scheduler.stats(),
+        }
@@ -1,63 +1,244 @@
-import asyncio, websockets, json, logging, contextlib
+import asyncio, websockets, json, logging, contextlib, time
 
 from websockets.server import WebSocketServerProtocol
+from collections import OrderedDict
 from typing import Set
-from ..network.protocol import command_from_json, event_to_json
+from ..network.batching import TickBatcher
+from ..network.protocol import command_from_json, event_to_json, batch_to_json, coalesce_events
+from ..network.snapshots import SnapshotHistory, make_delta
+from .event_log import EventLog
+from .metrics import HubMetrics
 from ..shared.event import EventType, Event
 from ..shared.bus import EventBus
 from ..shared.command import Command
+from ..shared.latency import LatencyTracker, server_stages, stamp_ms
+from ..shared.scheduler import FixedRateScheduler
 
 
 class WSHub:
-    def __init__(self, bus: EventBus, put_cmd, loop: asyncio.AbstractEventLoop, game):
+    # events after which clients get a fresh (cursor-merged) snapshot
+    IMPORTANT_TYPES = {EventType.PIECE_MOVED, EventType.CAPTURE}
+    TRACE_LIMIT = 1024  # commands awaiting their PIECE_MOVED
+
+    def __init__(self, bus: EventBus, put_cmd, loop: asyncio.AbstractEventLoop, game, game_lock=None,
+                 *, batch_events: bool = False, history_size: int = 32, event_log_size: int = 1024):
         self._bus = bus
         self._clients: Set[WebSocketServerProtocol] = set()
         self._put_cmd = put_cmd
         self._loop = loop
         self._game = game
+        self._game_lock = game_lock or contextlib.nullcontext()  # held while reading game state
         self._players = {}  # ws -> "W"/"B"
         self._player_cursors = {}  # player -> (row, col)
+        self._sent_version = {}  # ws -> state_version of the last snapshot it got
+        self.snapshots_sent = 0
+        self.snapshots_skipped = 0  # already had that state_version
+        self._snapshot_pending = False
+        self._history = SnapshotHistory(history_size)  # for conditional get_snapshot
+        self.snapshot_replies = {"not_modified": 0, "delta": 0, "full": 0}
+        self._log = EventLog(event_log_size)  # sequenced events, replayed on rejoin
+        self.rejoins = {"replayed": 0, "snapshot": 0}
+        self.metrics = HubMetrics()  # per-type traffic, commands, snapshot encode time
+        self._inflight = {}  # ws -> sends scheduled but not yet written
+        self._traces = OrderedDict()  # cmd_id -> (ws, stamps) until its PIECE_MOVED goes out
+        self.latency = LatencyTracker()  # server-side command latency per stage
+        # with batch_events, everything one tick publishes goes out as one message per client
+        self._batcher = TickBatcher(loop, self._send_batch) if batch_events else None
         for et in EventType:
             self._bus.subscribe(et, self._on_event)
 
+    def _send(self, ws, data: str, kind: str) -> None:
+        self.metrics.sent(kind, data)
+        self._inflight[ws] = self._inflight.get(ws, 0) + 1
+        fut = asyncio.run_coroutine_threadsafe(ws.send(data), self._loop)
+
+        def _done(f):
+            if ws in self._inflight:
+                self._inflight[ws] -= 1
+            f.exception()
+
+        fut.add_done_callback(_done)
+
+    async def _send_now(self, ws, data: str, kind: str) -> None:
+        self.metrics.sent(kind, data)
+        await ws.send(data)
+
+    def _broadcast(self, data: str, kind: str) -> None:
+        for ws in list(self._clients):
+            self._send(ws, data, kind)
+
+    def _encode_snapshot(self, encode, arg) -> str:
+        t0 = time.perf_counter()
+        data = encode(arg)
+        self.metrics.snapshot_encode_ms.add((time.perf_counter() - t0) * 1000.0)
+        return data
+
+    def send_queue_depths(self) -> dict:
+        """Per connected client ("player@host:port"): messages not yet written."""
+        out = {}
+        for ws in list(self._clients):
+            addr = getattr(ws, "remote_address", None) or ("?", 0)
+            out[f"{self._players.get(ws, '?')}@{addr[0]}:{addr[1]}"] = self._inflight.get(ws, 0)
+        return out
+
+    def _needs_version(self, ws, version) -> bool:
+        """True if *ws* has not been sent a snapshot of *version* yet (and record it)."""
+        if version is not None and version <= self._sent_version.get(ws, -1):
+            self.snapshots_skipped += 1
+            return False
+        if version is not None:
+            self._sent_version[ws] = version
+        self.snapshots_sent += 1
+        return True
+
+    def _send_snapshot(self, snap_evt: Event) -> None:
+        self._history.record(snap_evt.payload)
+        snap_evt = self._log.append(snap_evt)
+        version = snap_evt.payload.get("version")
+        data = None
+        for ws in list(self._clients):
+            if self._needs_version(ws, version):
+                data = data or self._encode_snapshot(event_to_json, snap_evt)
+                self._send(ws, data, snap_evt.type.value)
+
     def _on_event(self, evt):
-        data = event_to_json(evt)
+        if self._batcher is not None:
+            self._batcher.add(evt)
+            return
+        if evt.type == EventType.STATE_SNAPSHOT:
+            self._send_snapshot(Event(evt.type, self._with_cursors(dict(evt.payload)), evt.timestamp))
+            return
+        self._broadcast(event_to_json(self._log.append(evt)), evt.type.value)
+        for ws, results in self._command_results([evt]).items():
+            for res in results:
+                self._send(ws, event_to_json(res), res.type.value)
+        if evt.type in self.IMPORTANT_TYPES and not self._snapshot_pending:
+            # after the tick: normally the game's own end-of-tick snapshot has
+            # gone out by then and this one is skipped as a duplicate version
+            self._snapshot_pending = True
+            self._loop.call_soon_threadsafe(self._send_pending_snapshot)
+
+    def _send_pending_snapshot(self) -> None:
+        self._snapshot_pending = False
+        self._send_snapshot(Event(EventType.STATE_SNAPSHOT, self._snapshot(), self._game.game_time_ms()))
+
+    def _send_batch(self, events):
+        if any(e.type in self.IMPORTANT_TYPES for e in events):
+            events.append(Event(EventType.STATE_SNAPSHOT, self._snapshot(), self._game.game_time_ms()))
+        events = [self._log.append(e) for e in coalesce_events(events)]
+        snap = next((e for e in events if e.type == EventType.STATE_SNAPSHOT), None)
+        if snap is not None:
+            snap = Event(snap.type, self._with_cursors(dict(snap.payload)), snap.timestamp, snap.seq)
+            self._history.record(snap.payload)
+            events = [snap if e.type == EventType.STATE_SNAPSHOT else e for e in events]
+        others = [e for e in events if e is not snap]
+        results = self._command_results(events)
+        with_snap = without_snap = None
         for ws in list(self._clients):
-            fut = asyncio.run_coroutine_threadsafe(ws.send(data), self._loop)
-            fut.add_done_callback(lambda f: f.exception())
-        important_types = {EventType.PIECE_MOVED, EventType.CAPTURE}
-        if hasattr(EventType, "PROMOTION"):
-            important_types.add(EventType.PROMOTION)
-        if hasattr(EventType, "STATE_SNAPSHOT") and evt.type in important_types:
-            snap_evt = Event(EventType.STATE_SNAPSHOT, self._snapshot(), self._game.game_time_ms())
-            snap = event_to_json(snap_evt)
-            for ws in list(self._clients):
-                fut = asyncio.run_coroutine_threadsafe(ws.send(snap), self._loop)
-                fut.add_done_callback(lambda f: f.exception())
+            own = results.get(ws)
+            if snap is not None and self._needs_version(ws, snap.payload.get("version")):
+                if own:
+                    self._send(ws, self._encode_snapshot(batch_to_json, events + own), "batch")
+                    continue
+                with_snap = with_snap or self._encode_snapshot(batch_to_json, events)
+                self._send(ws, with_snap, "batch")
+            elif own:
+                self._send(ws, batch_to_json(others + own), "batch")
+            elif others:
+                without_snap = without_snap or batch_to_json(others)
+                self._send(ws, without_snap, "batch")
 
-    async def handler(self, ws):
+    def _command_results(self, events) -> dict:
+        """
+        For each PIECE_MOVED of a command this hub received, stamp the
+        broadcast and build the "applied" COMMAND_RESULT for its sender,
+        echoing every stamp.  A move the piece's rules refused gets a
+        "rejected" result instead, so a predicting client can roll it back.
+        Returns ws -> [result events] (logged).
+        """
+        out = {}
+        for e in events:
+            if e.type != EventType.PIECE_MOVED:
+                continue
+            entry = self._traces.pop(e.payload.get("cmd_id"), None)
+            if entry is None:
+                continue
+            ws, stamps = entry
+            stamps["broadcast"] = stamp_ms()
+            self.latency.add_all(server_stages(stamps))
+            payload = {"cmd_id": e.payload["cmd_id"], "status": "applied", "stamps": dict(stamps)}
+            if "refused" in stamps:
+                payload.update(status="rejected", reason="illegal move")
+            res = Event(EventType.COMMAND_RESULT, payload, e.timestamp)
+            out.setdefault(ws, []).append(self._log.append(res, player=self._players.get(ws)))
+        return out
+
+    def _trace(self, ws, cmd: Command, received: float) -> None:
+        cmd.trace = {"received": received}
+        if cmd.cmd_id is None:
+            return
+        self._traces[cmd.cmd_id] = (ws, cmd.trace)
+        while len(self._traces) > self.TRACE_LIMIT:
+            self._traces.popitem(last=False)  # never applied (rejected by the rules, or a no-op)
+
+    async def _welcome(self, ws, jo: dict) -> None:
+        self._players[ws] = jo.get("player", "W")
+        t = self._game.game_time_ms()
+        await self._send_now(ws, event_to_json(Event(EventType.ASSIGN_PLAYER,
+                                  {"player": self._players[ws], "log_id": self._log.log_id}, t)),
+                             EventType.ASSIGN_PLAYER.value)
+        if await self._replay_missed(ws, jo):
+            self.rejoins["replayed"] += 1
+            return
+        if jo.get("last_seq") is not None:
+            self.rejoins["snapshot"] += 1
         self._clients.add(ws)
+        await self._send_requested_snapshot(ws, jo.get("version"))
+
+    async def _replay_missed(self, ws, jo: dict) -> bool:
+        """
+        Send a rejoining client exactly the events it missed, if the log
+        still covers them.  The client only joins the broadcast set once a
+        re-check finds nothing new, so live events cannot overtake the replay.
+        """
+        seq = jo.get("last_seq")
+        if seq is None:
+            return False
+        while True:
+            missed = self._log.since(seq, self._players[ws], jo.get("log_id"))
+            if missed is None:
+                return False
+            if not missed:
+                self._clients.add(ws)
+                return True
+            await self._send_now(ws, batch_to_json(missed), "batch")
+            seq = missed[-1].seq
+
+    async def handler(self, ws):
         try:
-            # Handshake: join + snapshot
+            # Handshake: join + snapshot (or replay of the events missed since last_seq)
             try:
                 first = await ws.recv()
                 jo = json.loads(first)
                 if jo.get("kind") == "join":
-                    self._players[ws] = jo.get("player", "W")
-                    t = self._game.game_time_ms()
-                    if hasattr(EventType, "ASSIGN_PLAYER"):
-                        await ws.send(event_to_json(Event(EventType.ASSIGN_PLAYER, {"player": self._players[ws]}, t)))
-                    if hasattr(EventType, "STATE_SNAPSHOT"):
-                        await ws.send(event_to_json(Event(EventType.STATE_SNAPSHOT, self._snapshot(), t)))
+                    await self._welcome(ws, jo)
             except Exception:
                 logging.exception("join/snapshot failed; continuing without welcome events")
+            self._clients.add(ws)
 
             async for msg in ws:
+                received = stamp_ms()
+                t1 = self._game.game_time_ms()
                 try:
                     d = json.loads(msg)
                     if isinstance(d, dict) and d.get("kind") == "get_snapshot":
-                        t = self._game.game_time_ms()
-                        await ws.send(event_to_json(Event(EventType.STATE_SNAPSHOT, self._snapshot(), t)))
+                        await self._send_requested_snapshot(ws, d.get("version"))
+                        continue
+                    if isinstance(d, dict) and d.get("kind") == "time_sync":
+                        # clock probe: echo the client's t0 with our receive/send game times
+                        t2 = self._game.game_time_ms()
+                        reply = Event(EventType.TIME_SYNC, {"t0": d.get("t0"), "t1": t1, "t2": t2}, t2)
+                        await self._send_now(ws, event_to_json(reply), reply.type.value)
                         continue
                 except Exception:
                     pass
@@ -88,11 +269,15 @@ class WSHub:
                         reason = "invalid command"
 
                     t = self._game.game_time_ms()
+                    self.metrics.command(ok, reason)
                     if ok:
+                        self._trace(ws, cmd, received)
                         if hasattr(EventType, "COMMAND_RESULT"):
                             ack = Event(EventType.COMMAND_RESULT,
-                                        {"cmd_id": getattr(cmd, "cmd_id", None), "status": "accepted"}, t)
-                            await ws.send(event_to_json(ack))
+                                        {"cmd_id": getattr(cmd, "cmd_id", None), "status": "accepted",
+                                         "stamps": {"received": received}}, t)
+                            await self._send_now(ws, event_to_json(self._log.append(ack, player=self._players.get(ws))),
+                                                 ack.type.value)
                         self._put_cmd(cmd)
                     else:
                         if hasattr(EventType, "COMMAND_RESULT"):
@@ -102,18 +287,54 @@ class WSHub:
                                  "reason": reason or "invalid"},
                                 t,
                             )
-                            await ws.send(event_to_json(nack))
+                            await self._send_now(ws, event_to_json(self._log.append(nack, player=self._players.get(ws))),
+                                                 nack.type.value)
 
                 except Exception:
                     logging.exception("failed to process client message")
         finally:
             self._clients.discard(ws)
             self._players.pop(ws, None)
+            self._sent_version.pop(ws, None)
+            self._inflight.pop(ws, None)
+            for cmd_id in [k for k, (w, _) in self._traces.items() if w is ws]:
+                del self._traces[cmd_id]
+
+    async def _send_requested_snapshot(self, ws, known_version=None) -> None:
+        """
+        Answer an explicit request (join, get_snapshot).  A client reporting
+        the version it holds gets "not modified" if that is current, a delta
+        if the version is still in the history, and a full snapshot otherwise.
+        """
+        snap = self._snapshot()
+        version = snap.get("version")
+        base = self._history.get(known_version) if known_version is not None else None
+        self._history.record(snap)
+        t = self._game.game_time_ms()
+        if version is not None:
+            self._sent_version[ws] = max(version, self._sent_version.get(ws, -1))
+
+        if version is not None and known_version == version:
+            self.snapshot_replies["not_modified"] += 1
+            reply = Event(EventType.SNAPSHOT_NOT_MODIFIED, {"version": version}, t)
+        elif base is not None:
+            self.snapshot_replies["delta"] += 1
+            reply = Event(EventType.STATE_DELTA, make_delta(base, snap), t)
+        else:
+            self.snapshot_replies["full"] += 1
+            self.snapshots_sent += 1
+            reply = Event(EventType.STATE_SNAPSHOT, snap, t)
+            await self._send_now(ws, self._encode_snapshot(event_to_json, reply), reply.type.value)
+            return
+        await self._send_now(ws, event_to_json(reply), reply.type.value)
 
     def _snapshot(self) -> dict:
         # Get the base snapshot from the game
-        snapshot = self._game.snapshot()
-        
+        with self._game_lock:
+            snapshot = self._game.snapshot()
+        return self._with_cursors(snapshot)
+
+    def _with_cursors(self, snapshot: dict) -> dict:
         # Add client cursors to the snapshot
         cursors = []
         for player_color, cursor_pos in self._player_cursors.items():
@@ -127,41 +348,120 @@ class WSHub:
         return snapshot
 
 
-async def serve(game, host="127.0.0.1", port=8765):
+async def serve(game, host="127.0.0.1", port=8765, *, batch_events: bool = False):
     loop = asyncio.get_running_loop()
-    hub = WSHub(game.bus, game.user_input_queue.put, loop, game)
+    hub = WSHub(game.bus, game.user_input_queue.put, loop, game, batch_events=batch_events)
     async with websockets.serve(hub.handler, host, port):
         await asyncio.Future()
 
 async def _game_ticker(game, hz: float = 60.0):
     """Run the game loop on the server side without graphics."""
-    dt = 1.0 / hz
+    scheduler = FixedRateScheduler(hz)
     while True:
         try:
             game._run_game_loop(num_iterations=1, is_with_graphics=False)
         except Exception:
             logging.exception("game tick failed")
-        await asyncio.sleep(dt)
+        await scheduler.wait()
+
+def _enable_profile_dump(loop, game) -> None:
+    prof = game.enable_profiling()
+
+    def _dump():
+        logging.info("tick phase timings:\n%s", prof.dump())
+        if game.watchdog is not None:
+            logging.info("slow ticks %s: %s", game.watchdog.stats(), game.slow_ticks())
+
+    with contextlib.suppress(NotImplementedError, AttributeError, RuntimeError):
+        import signal
+        loop.add_signal_handler(signal.SIGUSR1, _dump)  # not on Windows
 
-async def serve_and_tick(game, host="127.0.0.1", port=8765, *, hz: float = 60.0):
+
+@contextlib.asynccontextmanager
+async def _metrics_endpoint(hub, game, port: int):
+    if not port:
+        yield None
+        return
+    from .metrics import serve_metrics
+    server = await serve_metrics(hub, game, "127.0.0.1", port)
+    logging.info("metrics on http://127.0.0.1:%s/metrics", port)
+    try:
+        yield server
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def serve_and_tick(game, host="127.0.0.1", port=8765, *, hz: float = 60.0,
+                         adaptive: bool = False, idle_sleep: bool = True, threaded: bool = False,
+                         batch_events: bool = False, profile: bool = False,
+                         tick_budget_ms: float = 0.0, slow_tick_stacks: bool = False,
+                         metrics_port: int = 0, input_delay_ms: int = 0):
     """
     Start WS hub and run the game loop ticker concurrently.
+    Ticks are paced against absolute deadlines (see FixedRateScheduler); with
+    *adaptive* the tick rate backs off under sustained overload.  With
+    *idle_sleep* the ticker sleeps while nothing can change on its own
+    (Game.next_wakeup_s) and is woken immediately by an incoming command.
+    With *threaded* the simulation runs on its own thread (SimulationThread)
+    and its events reach the hub in one batch per tick.  With *batch_events*
+    each client gets one message per tick, holding only the latest snapshot.
+    With *profile* every tick phase is timed (Game.enable_profiling); SIGUSR1
+    logs the current table.  A *tick_budget_ms* keeps a log of the ticks that
+    overran it (Game.enable_watchdog), with stacks if *slow_tick_stacks*.
+    A *metrics_port* serves /metrics (Prometheus text) on 127.0.0.1; it turns
+    on tick profiling for the tick-duration summaries.  *input_delay_ms*
+    sets this game's jitter buffer (Game.set_input_delay).
     """
     loop = asyncio.get_running_loop()
-    hub = WSHub(game.bus, game.user_input_queue.put, loop, game)
-    sleep_dt = 0.0 if not hz or hz <= 0 else 1.0 / hz
+    if input_delay_ms:
+        game.set_input_delay(input_delay_ms)
+    if tick_budget_ms:
+        game.enable_watchdog(tick_budget_ms, sample_stack=slow_tick_stacks)
+    if profile or tick_budget_ms or metrics_port:
+        _enable_profile_dump(loop, game)
+    if threaded:
+        from .sim_thread import SimulationThread
+        io_bus = EventBus()
+        sim = SimulationThread(game, loop, io_bus, hz=hz, adaptive=adaptive, idle_sleep=idle_sleep)
+        hub = WSHub(io_bus, sim.submit, loop, game, game_lock=sim.lock, batch_events=batch_events)
+        hub.scheduler = sim.scheduler
+        async with websockets.serve(hub.handler, host, port), _metrics_endpoint(hub, game, metrics_port):
+            sim.start()
+            try:
+                await asyncio.Future()
+            finally:
+                sim.stop()
+                logging.info("simulation thread stats: %s", sim.stats())
+        return
+
+    wake = asyncio.Event()
+
+    def _put_cmd(cmd):
+        game.user_input_queue.put(cmd)
+        wake.set()
+
+    hub = WSHub(game.bus, _put_cmd, loop, game, batch_events=batch_events)
+    scheduler = FixedRateScheduler(hz, adaptive=adaptive)
+    hub.scheduler = scheduler
     async def _ticker():
         try:
             while True:
                 game._run_game_loop(num_iterations=1, is_with_graphics=False)
-                if sleep_dt > 0:
-                    await asyncio.sleep(sleep_dt)
-                else:
-                    await asyncio.sleep(0)
+                if idle_sleep:
+                    timeout = game.next_wakeup_s()
+                    if timeout is None or timeout > scheduler.period:
+                        wake.clear()
+                        if game.user_input_queue.empty():
+                            with contextlib.suppress(asyncio.TimeoutError):
+                                await asyncio.wait_for(wake.wait(), timeout)
+                        scheduler.reset()
+                        continue
+                await scheduler.wait()
         except asyncio.CancelledError:
-            pass
+            logging.info("server tick stats: %s", scheduler.stats())
 
-    async with websockets.serve(hub.handler, host, port):
+    async with websockets.serve(hub.handler, host, port), _metrics_endpoint(hub, game, metrics_port):
         ticker_task = asyncio.create_task(_ticker())
         try:
             await asyncio.Future()
@@ -8,6 +8,8 @@ class Command:
     type: str               # "move" | "jump" | …
     params: List            # payload (e.g. ["e2", "e4"])
     cmd_id: Optional[str] = None
+    # server-side latency stamps (received/dequeued/applied), set by WSHub; never sent
+    trace: Optional[Dict[str, float]] = field(default=None, compare=False, repr=False)
 
     def __str__(self) -> str:
         return f"Command(timestamp={self.timestamp}, piece_id={self.piece_id}, type={self.type}, params={self.params})"
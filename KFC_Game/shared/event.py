@@ -1,6 +1,6 @@
 from enum import Enum
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class EventType(str, Enum):
@@ -27,9 +27,12 @@ class EventType(str, Enum):
     TIMER_TICK     = "timer_tick"
 
     STATE_SNAPSHOT = "state_snapshot"
+    STATE_DELTA = "state_delta"                        # reply to a get_snapshot with a known, recent version
+    SNAPSHOT_NOT_MODIFIED = "snapshot_not_modified"    # reply when the client is already current
     ASSIGN_PLAYER = "assign_player"
     ILLEGAL_COMMAND = "illegal_command"
     COMMAND_RESULT = "command_result"
+    TIME_SYNC = "time_sync"                            # reply to a client clock probe (t0, t1, t2)
 
 
 @dataclass(frozen=True)
@@ -38,3 +41,4 @@ class Event:
     type: EventType
     payload: Dict[str, Any]
     timestamp: int  # milliseconds since game start or epoch
+    seq: Optional[int] = None  # position in the server's event log (set on the wire only)
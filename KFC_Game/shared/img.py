@@ -6,6 +6,11 @@ import numpy as np
 class Img:
     def __init__(self):
         self.img = None
+        # blit cache, prepared once per source array (see _prepare_blit)
+        self._blit_src = None
+        self._blit_opaque = True
+        self._blit_premul = None
+        self._blit_inv_alpha = None
 
     def read(self, path: str | pathlib.Path,
              size: tuple[int, int] | None = None,
@@ -54,6 +59,7 @@ class Img:
 
             print(f"[DEBUG] Resized {path} to {self.img.shape}")
 
+        self._prepare_blit()
         return self
 
     def copy(self):
@@ -61,37 +67,75 @@ class Img:
         new_img.img = self.img.copy()
         return new_img
 
+    def _prepare_blit(self):
+        """
+        Precompute what draw_on needs so per-frame blits are one integer op.
+
+        For BGRA sources with real transparency we keep the colour
+        premultiplied by alpha (round(c*a/255), uint8) and the inverse alpha
+        (255-a) as one uint8 channel: 4 bytes per pixel next to the sprite.
+        Fully opaque sources are flagged so they are pasted with a plain copy.
+        """
+        src = self.img
+        self._blit_src = src
+        self._blit_premul = self._blit_inv_alpha = None
+        self._blit_opaque = src is None or src.ndim != 3 or src.shape[2] != 4
+        if self._blit_opaque:
+            return
+        alpha = src[..., 3:4]
+        if alpha.min() == 255:
+            self._blit_opaque = True
+            return
+        premul = src[..., :3] * alpha.astype(np.uint16)
+        premul += 128
+        premul += premul >> 8
+        premul >>= 8  # round(c*a/255), exact for 0..65025
+        self._blit_premul = premul.astype(np.uint8)
+        self._blit_inv_alpha = 255 - src[..., 3]
+
     def draw_on(self, other_img, x, y):
         if self.img is None or other_img.img is None:
             raise ValueError("Both images must be loaded before drawing.")
 
-        # Convert to match other_img's channel count BEFORE slicing
-        if self.img.shape[2] != other_img.img.shape[2]:
-            if self.img.shape[2] == 3 and other_img.img.shape[2] == 4:
-                self.img = cv2.cvtColor(self.img, cv2.COLOR_BGR2BGRA)
-            elif self.img.shape[2] == 4 and other_img.img.shape[2] == 3:
-                self.img = cv2.cvtColor(self.img, cv2.COLOR_BGRA2BGR)
-
-        h, w = self.img.shape[:2]
+        src = self.img
+        h, w = src.shape[:2]
         H, W = other_img.img.shape[:2]
 
         if h == 0 or w == 0:
-            print(f"[WARN] Skipping draw: source image has 0 size: {self.img.shape}")
+            print(f"[WARN] Skipping draw: source image has 0 size: {src.shape}")
             return
 
         if y < 0 or x < 0 or y + h > H or x + w > W:
             print(f"[WARN] Skipping draw at ({x},{y}): roi size {(h, w)} exceeds board {(H, W)}")
             return
 
+        if getattr(self, "_blit_src", None) is not src:
+            self._prepare_blit()
+
         roi = other_img.img[y:y + h, x:x + w]
+        src_c = src.shape[2] if src.ndim == 3 else 1
+        dst_c = roi.shape[2] if roi.ndim == 3 else 1
+
+        # Opaque sources, and BGRA sources pasted on a BGR canvas (alpha is
+        # dropped, as before), are a straight colour copy; the canvas alpha
+        # is never written, as with blending.  The source array is never
+        # converted in place, so shared sprites stay untouched.
+        if self._blit_opaque or dst_c < 4:
+            if dst_c == src_c == 3:
+                roi[...] = src
+            else:
+                roi[..., :3] = src[..., :3]
+            return
 
-        if self.img.shape[2] == 4:
-            b, g, r, a = cv2.split(self.img)
-            mask = a / 255.0
-            for c in range(3):
-                roi[..., c] = (1 - mask) * roi[..., c] + mask * self.img[..., c]
-        else:
-            other_img.img[y:y + h, x:x + w] = self.img
+        # out = round(dst*(255-a)/255) + premul; the alpha is expanded to 3
+        # channels per blit (broadcasting a size-1 axis is ~2x slower)
+        inv_alpha = cv2.merge((self._blit_inv_alpha,) * 3)
+        blended = np.multiply(roi[..., :3], inv_alpha, dtype=np.uint16)
+        blended += 128
+        blended += blended >> 8
+        blended >>= 8
+        blended += self._blit_premul
+        roi[..., :3] = blended
 
     def put_text(self, txt, x, y, font_size, color=(255, 255, 255, 255), thickness=1):
         if self.img is None:
@@ -99,6 +143,7 @@ class Img:
         cv2.putText(self.img, txt, (x, y),
                     cv2.FONT_HERSHEY_SIMPLEX, font_size,
                     color, thickness, cv2.LINE_AA)
+        self._blit_src = None  # pixels changed in place
 
     def show(self):
         if self.img is None:
@@ -112,3 +157,4 @@ class Img:
 
     def draw_rect(self, x1, y1, x2, y2, color):
         cv2.rectangle(self.img, (x1, y1), (x2, y2), color, 2)
+        self._blit_src = None  # pixels changed in place
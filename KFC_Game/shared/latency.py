@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+from .stats import RollingStats
+
+
+def stamp_ms() -> float:
+    """Monotonic milliseconds for latency stamps; only differences are meaningful."""
+    return time.perf_counter() * 1000.0
+
+
+def server_stages(stamps: Dict[str, float]) -> Dict[str, float]:
+    """
+    Per-stage durations from the stamps a command collects on the server:
+    received (WSHub) → dequeued (tick drains the queue) → applied (state
+    transition; later for a command deferred until its piece is idle) →
+    broadcast (its PIECE_MOVED goes out).
+    """
+    out = {}
+    for stage, a, b in (("queue", "received", "dequeued"), ("apply", "dequeued", "applied"),
+                        ("broadcast", "applied", "broadcast"), ("server", "received", "broadcast")):
+        if a in stamps and b in stamps:
+            out[stage] = stamps[b] - stamps[a]
+    return out
+
+
+class LatencyTracker:
+    """Rolling percentiles per latency stage."""
+
+    def __init__(self, window: int = 1024):
+        self._window = window
+        self.stages: Dict[str, RollingStats] = {}
+
+    def add(self, stage: str, ms: float) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RollingStats(self._window)
+        stats.add(ms)
+
+    def add_all(self, stages: Dict[str, float]) -> None:
+        for stage, ms in stages.items():
+            self.add(stage, ms)
+
+    def summary(self, stage: Optional[str] = None) -> dict:
+        if stage is not None:
+            return self.stages[stage].summary() if stage in self.stages else RollingStats(1).summary()
+        return {name: s.summary() for name, s in self.stages.items()}
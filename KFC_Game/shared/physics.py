@@ -51,6 +51,10 @@ class BasePhysics(ABC):  # Interface/base class
     def get_start_ms(self) -> int:
         return self._start_ms
 
+    def span(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """(start_cell, end_cell) this state was reset with."""
+        return self._start_cell, self._end_cell
+
     def can_be_captured(self) -> bool: return True
 
     def can_capture(self) -> bool:     return True
@@ -60,6 +64,14 @@ class BasePhysics(ABC):  # Interface/base class
     def is_need_clear_path(self) -> bool:
         return self.do_i_need_clear_path
 
+    def motion(self) -> Optional[dict]:
+        """Timing needed to replay this state's movement remotely (None when static)."""
+        return None
+
+    def deadline_ms(self) -> Optional[int]:
+        """Game time at which update() emits "done" on its own (None if it never does)."""
+        return None
+
 
 class IdlePhysics(BasePhysics):
 
@@ -100,16 +112,46 @@ class MovePhysics(BasePhysics):
         self._movement_vector = self._movement_vector / self._movement_vector_length
         self._duration_s = self._movement_vector_length / self._speed_m_s
 
+    @property
+    def speed_m_s(self) -> float:
+        return self._speed_m_s
+
+    @staticmethod
+    def interpolate(board: Board, start_cell, end_cell, speed_m_s: float,
+                    elapsed_ms: float) -> Tuple[np.ndarray, bool]:
+        """Position in metres *elapsed_ms* into a move, and whether it has arrived.
+
+        Shared by the server tick and by clients replaying a move from a snapshot.
+        """
+        start_pos = np.array(board.cell_to_m(start_cell))
+        vector = np.array(board.cell_to_m(end_cell)) - start_pos
+        length = math.hypot(*vector)
+        if length == 0:
+            return start_pos, True
+        seconds_passed = elapsed_ms / 1000
+        pos = start_pos + vector / length * seconds_passed * speed_m_s
+        return pos, seconds_passed >= length / speed_m_s
+
     def update(self, now_ms: int):
-        seconds_passed = (now_ms - self._start_ms) / 1000
-        self._curr_pos_m = np.array(
-            self.board.cell_to_m(self._start_cell)) + self._movement_vector * seconds_passed * self._speed_m_s
+        self._curr_pos_m, arrived = self.interpolate(
+            self.board, self._start_cell, self._end_cell, self._speed_m_s, now_ms - self._start_ms)
 
-        if seconds_passed >= self._duration_s:
+        if arrived:
             return Command(now_ms, None, "done", [self._end_cell])
 
         return None
 
+    def deadline_ms(self) -> int:
+        return int(self._start_ms + self._duration_s * 1000)
+
+    def motion(self) -> dict:
+        return {
+            "from": list(self._start_cell),
+            "to": list(self._end_cell),
+            "start_ms": int(self._start_ms),
+            "speed_m_s": float(self._speed_m_s),
+        }
+
     def get_pos_m(self):
         return self._curr_pos_m
 
@@ -134,6 +176,9 @@ class StaticTemporaryPhysics(BasePhysics):
 
         return None
 
+    def deadline_ms(self) -> int:
+        return int(self._start_ms + self.duration_s * 1000)
+
 
 class JumpPhysics(StaticTemporaryPhysics):
     def reset(self, cmd: Command):
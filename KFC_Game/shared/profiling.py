@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+# phases of Game._run_game_loop, in tick order
+TICK_PHASES = ("map", "input", "update", "deferred", "collisions", "snapshot", "journal", "draw", "show")
+
+
+class PhaseProfiler:
+    """
+    Per-phase wall time of a loop iteration, aggregated into rolling windows.
+
+    The loop calls begin() once per iteration and mark(phase) at the end of
+    each phase; a phase marked twice in one iteration (the map is rebuilt
+    before and after updates) is summed.  end() records the totals, so every
+    window holds one sample per tick.  Owners keep the profiler optional and
+    test for None, which is the whole cost when profiling is off.
+    """
+
+    def __init__(self, phases: Iterable[str] = TICK_PHASES, *, window: int = 1024,
+                 clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._window = window
+        self.phases: Dict[str, RollingStats] = {name: RollingStats(window) for name in phases}
+        self.tick_ms = RollingStats(window)
+        self.last: Dict[str, float] = {}  # per-phase ms of the last completed tick
+        self._cur: Dict[str, float] = {}
+        self._t0 = 0.0
+        self._t = 0.0
+
+    def begin(self) -> None:
+        self._t0 = self._t = self._clock()
+        self._cur = {}
+
+    def mark(self, phase: str) -> None:
+        t = self._clock()
+        self._cur[phase] = self._cur.get(phase, 0.0) + (t - self._t) * 1000.0
+        self._t = t
+
+    def end(self) -> float:
+        """Close the tick; returns its total ms."""
+        total = (self._clock() - self._t0) * 1000.0
+        for phase, ms in self._cur.items():
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = RollingStats(self._window)
+            stats.add(ms)
+        self.tick_ms.add(total)
+        self.last = self._cur
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "tick": self.tick_ms.summary(),
+            "phases": {name: s.summary() for name, s in self.phases.items() if s.count},
+        }
+
+    def dump(self) -> str:
+        """Human-readable table of the current windows (for logs / on-demand dumps)."""
+        rows = [("tick", self.tick_ms.summary())]
+        rows += [(name, s.summary()) for name, s in self.phases.items() if s.count]
+        lines = [f"{'phase':<12}{'count':>8}{'mean':>9}{'p50':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, s in rows:
+            lines.append(f"{name:<12}{s['count']:>8}{s['mean']:>9.3f}{s['p50']:>9.3f}"
+                         f"{s['p99']:>9.3f}{s['max']:>9.3f}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.tick_ms.reset()
+        for s in self.phases.values():
+            s.reset()
+
+
+class TickWatchdog:
+    """
+    Keeps a bounded log of ticks that overran *budget_ms*.
+
+    The loop calls tick_started() and, with the phase breakdown of a
+    PhaseProfiler, tick_finished(); each overrun is logged with the phase
+    that took longest plus whatever context the loop passes (piece count,
+    queue depth, commands applied).  With *sample_stack* a monitor thread
+    captures the ticking thread's Python stack once a tick is still running
+    past its budget, i.e. while the stall is happening.
+    """
+
+    def __init__(self, budget_ms: float, *, maxlen: int = 100, sample_stack: bool = False,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.budget_ms = budget_ms
+        self.sample_stack = sample_stack
+        self._clock = clock
+        self._log: Deque[dict] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.overruns = 0
+        # current tick, shared with the monitor thread
+        self._tick_id = 0
+        self._tick_start: Optional[float] = None
+        self._tick_thread: Optional[int] = None
+        self._stack: Optional[Tuple[int, List[str]]] = None
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        if sample_stack:
+            self._monitor = threading.Thread(target=self._watch, daemon=True, name="tick-watchdog")
+            self._monitor.start()
+
+    def tick_started(self) -> None:
+        self._tick_thread = threading.get_ident()
+        self._tick_id += 1
+        self._tick_start = self._clock()
+
+    def tick_finished(self, tick_ms: float, phases: Dict[str, float], **context) -> Optional[dict]:
+        """Record the tick if it overran; returns the slow-tick entry (or None)."""
+        self._tick_start = None
+        self.ticks += 1
+        if tick_ms <= self.budget_ms:
+            return None
+        self.overruns += 1
+        stack = self._stack
+        entry = {
+            "wall_time": time.time(),
+            "tick_ms": tick_ms,
+            "budget_ms": self.budget_ms,
+            "phase": max(phases, key=phases.get) if phases else None,
+            "phases": dict(phases),
+            **context,
+            "stack": stack[1] if stack is not None and stack[0] == self._tick_id else None,
+        }
+        with self._lock:
+            self._log.append(entry)
+        logger.warning("slow tick: %.1f ms (budget %.1f ms), mostly %s",
+                       tick_ms, self.budget_ms, entry["phase"])
+        return entry
+
+    def slow_ticks(self) -> List[dict]:
+        with self._lock:
+            return list(self._log)
+
+    def stats(self) -> dict:
+        return {"budget_ms": self.budget_ms, "ticks": self.ticks, "overruns": self.overruns,
+                "logged": len(self._log)}
+
+    def _watch(self) -> None:
+        poll = max(self.budget_ms / 4000.0, 0.001)
+        while not self._stop.wait(poll):
+            start, tick_id, tid = self._tick_start, self._tick_id, self._tick_thread
+            if start is None or (self._stack is not None and self._stack[0] == tick_id):
+                continue
+            if (self._clock() - start) * 1000.0 < self.budget_ms:
+                continue
+            frame = sys._current_frames().get(tid)
+            if frame is not None:
+                self._stack = (tick_id, traceback.format_stack(frame))
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=1.0)
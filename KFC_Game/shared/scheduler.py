@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+
+class FixedRateScheduler:
+    """
+    Fixed-rate pacing against absolute deadlines.
+
+    Call wait() (async) or wait_blocking() once per iteration, after the work.
+    Deadlines advance by exactly one period, so the cost of each iteration
+    does not accumulate as drift.  When an iteration overruns:
+
+    * catch_up=True  – following iterations run back-to-back until the
+      schedule is met again (at most *max_catch_up* periods behind; beyond
+      that the missed slots are dropped and the schedule re-anchored).
+    * catch_up=False – missed slots are dropped straight away (rendering).
+
+    With *adaptive* the rate steps down (×0.8, not below *min_hz*) after
+    *overload_ticks* consecutive overruns, and back up towards the target
+    after *recover_ticks* consecutive on-time iterations.
+    """
+
+    def __init__(self, hz: float, *, catch_up: bool = True, max_catch_up: int = 5,
+                 adaptive: bool = False, min_hz: Optional[float] = None,
+                 overload_ticks: int = 30, recover_ticks: int = 240,
+                 window: int = 600, clock: Callable[[], float] = time.perf_counter):
+        self.target_hz = hz
+        self.hz = hz
+        self.catch_up = catch_up
+        self.max_catch_up = max_catch_up
+        self.adaptive = adaptive
+        self.min_hz = min_hz if min_hz is not None else hz / 4
+        self.overload_ticks = overload_ticks
+        self.recover_ticks = recover_ticks
+        self._clock = clock
+
+        self._deadline: Optional[float] = None
+        self._overrun_streak = 0
+        self._ontime_streak = 0
+        self._wakes: deque[float] = deque(maxlen=window)
+
+        self.ticks = 0
+        self.overruns = 0       # iterations that finished after their deadline
+        self.dropped = 0        # deadlines skipped without running an iteration
+        self.jitter_ms = RollingStats(window)   # wake-up lateness vs. deadline
+        self.overrun_ms = RollingStats(window)  # how late overrunning iterations were
+
+    @property
+    def period(self) -> float:
+        return 1.0 / self.hz if self.hz and self.hz > 0 else 0.0
+
+    # ──────────────────────────────────────────────────────────────
+    def next_delay(self) -> float:
+        """Seconds to sleep until the next deadline; records overruns and adapts the rate."""
+        now = self._clock()
+        period = self.period
+        self.ticks += 1
+        if period <= 0:
+            return 0.0
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += period
+
+        lag = now - self._deadline
+        if lag <= 0:
+            self._overrun_streak = 0
+            self._ontime_streak += 1
+            self._adapt()
+            return -lag
+
+        self.overruns += 1
+        self.overrun_ms.add(lag * 1000.0)
+        self._overrun_streak += 1
+        self._ontime_streak = 0
+        missed = int(lag // period)
+        if not self.catch_up:
+            skip = missed + 1
+        else:
+            skip = max(0, missed - self.max_catch_up)
+        if skip:
+            # give up on the slots we cannot make, keep the phase of the schedule
+            self.dropped += skip
+            self._deadline += skip * period
+        self._adapt()
+        return max(0.0, self._deadline - now)
+
+    def _on_wake(self) -> None:
+        now = self._clock()
+        self._wakes.append(now)
+        if self._deadline is not None:
+            self.jitter_ms.add(max(0.0, now - self._deadline) * 1000.0)
+
+    def _adapt(self) -> None:
+        if not self.adaptive:
+            return
+        if self._overrun_streak >= self.overload_ticks and self.hz > self.min_hz:
+            self.hz = max(self.min_hz, self.hz * 0.8)
+            self._overrun_streak = 0
+            self._deadline = self._clock()
+            logger.info("scheduler overloaded: lowering rate to %.1f Hz", self.hz)
+        elif self._ontime_streak >= self.recover_ticks and self.hz < self.target_hz:
+            self.hz = min(self.target_hz, self.hz * 1.25)
+            self._ontime_streak = 0
+            logger.info("scheduler recovered: raising rate to %.1f Hz", self.hz)
+
+    def reset(self) -> None:
+        """Re-anchor the schedule, e.g. after deliberately sleeping through idle time."""
+        self._deadline = None
+        self._overrun_streak = 0
+
+    # ──────────────────────────────────────────────────────────────
+    async def wait(self) -> None:
+        await asyncio.sleep(self.next_delay())
+        self._on_wake()
+
+    def wait_blocking(self, stop_event: Optional[threading.Event] = None) -> None:
+        delay = self.next_delay()
+        if stop_event is not None:
+            stop_event.wait(delay)
+        elif delay > 0:
+            time.sleep(delay)
+        self._on_wake()
+
+    # ──────────────────────────────────────────────────────────────
+    @property
+    def achieved_hz(self) -> float:
+        """Iterations per second over the recent window."""
+        if len(self._wakes) < 2:
+            return 0.0
+        span = self._wakes[-1] - self._wakes[0]
+        return (len(self._wakes) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "target_hz": self.target_hz,
+            "hz": self.hz,
+            "achieved_hz": self.achieved_hz,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "dropped": self.dropped,
+            "jitter_ms": self.jitter_ms.summary(),
+            "overrun_ms": self.overrun_ms.summary(),
+        }
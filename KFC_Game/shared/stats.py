@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Dict
+
+
+class RollingStats:
+    """
+    Bounded window of samples (e.g. durations in ms) with percentile queries.
+
+    add() is O(1) and safe to call from any thread; percentiles sort a copy
+    of the window, so query them from dumps/endpoints, not per frame.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    @staticmethod
+    def _nearest_rank(data: list, q: float) -> float:
+        if not data:
+            return 0.0
+        k = min(len(data) - 1, max(0, int(round(q / 100.0 * (len(data) - 1)))))
+        return data[k]
+
+    def percentile(self, q: float) -> float:
+        """q in [0, 100] over the current window (nearest-rank); 0.0 when empty."""
+        with self._lock:
+            data = sorted(self._samples)
+        return self._nearest_rank(data, q)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            data = sorted(self._samples)
+            count, total, peak = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self._nearest_rank(data, 50),
+            "p90": self._nearest_rank(data, 90),
+            "p99": self._nearest_rank(data, 99),
+            "max": peak,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
@@ -0,0 +1,61 @@
+import pathlib
+
+from ..client.renderer import ClientRenderer
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..shared.command import Command
+from ..utils.mock_img import MockImg
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_snapshot_carries_motion_for_moving_piece():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    pw = game.pos[(6, 0)][0]
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)]))
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+    snap = game.snapshot()
+    entry = next(p for p in snap["pieces"] if p["id"] == pw.id)
+    assert entry["state"] == "move"
+    assert entry["motion"]["from"] == [6, 0] and entry["motion"]["to"] == [4, 0]
+    assert entry["motion"]["speed_m_s"] > 0
+    assert "time_ms" in snap
+    assert all("motion" not in p for p in snap["pieces"] if p["id"] != pw.id)
+
+
+def test_renderer_interpolates_between_snapshots():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    clock = FakeClock()
+    r = ClientRenderer(game.board, PIECES_DIR, MockImgFactory(), clock=clock)
+    payload = {
+        "version": 1,
+        "time_ms": 1000,
+        "pieces": [{"id": "PW_(6, 0)", "cell": (6, 0), "state": "move",
+                    "motion": {"from": [6, 0], "to": [4, 0], "start_ms": 1000, "speed_m_s": 1.0}}],
+    }
+    r.render_snapshot(payload)
+    x0, y0 = MockImg.traj[-1]
+
+    clock.t += 0.5
+    MockImg.reset()
+    r.frame()
+    assert MockImg.traj[-1] == (x0, y0 - 32)  # half a cell towards row 4
+
+    clock.t += 5.0
+    MockImg.reset()
+    r.frame()
+    assert MockImg.traj[-1] == (x0, y0 - 128)  # clamped on the destination
+
+    MockImg.reset()
+    r.frame()
+    assert MockImg.traj == []  # arrived: no more redraws until the next snapshot
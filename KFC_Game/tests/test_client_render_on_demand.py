@@ -0,0 +1,87 @@
+import asyncio
+import pathlib
+
+import pytest
+
+from ..client.render_loop import ClientRenderLoop
+from ..client.renderer import ClientRenderer
+from ..client.ui_state_sync import subscribe_render
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..shared.bus import EventBus
+from ..shared.event import Event, EventType
+from ..utils.mock_img import MockImg
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+class FakeCursor:
+    def __init__(self):
+        self.cell = (0, 0)
+
+    def get_cursor(self):
+        return self.cell
+
+
+def _snapshot(version, row):
+    return {"version": version, "pieces": [{"id": "PW_(6, 0)", "cell": (row, 0)}]}
+
+
+def test_snapshot_burst_is_drawn_once_on_next_frame():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    bus = EventBus()
+    kp = FakeCursor()
+    r = ClientRenderer(game.board, PIECES_DIR, MockImgFactory(), keyboard_processor=kp)
+    subscribe_render(bus, r)
+    MockImg.reset()
+
+    assert not r.needs_frame()
+    for v, row in enumerate((6, 5, 4), start=1):
+        bus.publish(Event(EventType.STATE_SNAPSHOT, _snapshot(v, row), timestamp=0))
+    assert MockImg.traj == []  # nothing rendered on the event path
+    assert r.needs_frame()
+
+    r.frame()
+    piece_draws = [xy for xy in MockImg.traj if xy[1] > 284]  # skip the board blit
+    assert len(piece_draws) == 1
+    assert not r.needs_frame()
+
+    kp.cell = (1, 1)  # cursor moves -> one redraw
+    assert r.needs_frame()
+    r.frame()
+    assert not r.needs_frame()
+
+
+class CountingRenderer:
+    def __init__(self):
+        self.dirty = False
+        self.frames = 0
+
+    def submit_snapshot(self, payload):
+        self.dirty = True
+
+    def needs_frame(self):
+        return self.dirty
+
+    def frame(self):
+        self.frames += 1
+        self.dirty = False
+        return None
+
+
+@pytest.mark.asyncio
+async def test_render_loop_skips_ticks_without_changes():
+    bus = EventBus()
+    r = CountingRenderer()
+    subscribe_render(bus, r)
+    loop = ClientRenderLoop(r, hz=200.0)
+    loop.start()
+
+    await asyncio.sleep(0.03)
+    for v in range(5):
+        bus.publish(Event(EventType.STATE_SNAPSHOT, {"version": v, "pieces": []}, timestamp=0))
+    await asyncio.sleep(0.03)
+    await loop.stop()
+
+    assert r.frames == 1
+    assert loop.skipped >= 3
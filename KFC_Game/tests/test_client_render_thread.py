@@ -0,0 +1,71 @@
+import threading
+import time
+
+from ..client.render_thread import ClientRenderThread
+
+
+class FakeRenderer:
+    def __init__(self, work_s: float = 0.0):
+        self.work_s = work_s
+        self.dirty = True
+        self.frames = 0
+        self.coalesced = 0
+
+    def needs_frame(self):
+        return self.dirty
+
+    def frame(self):
+        self.frames += 1
+        time.sleep(self.work_s)
+        return object()
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.presented = 0
+        self.polls = 0
+        self.closed = False
+
+    def present(self, img):
+        self.presented += 1
+
+    def poll(self):
+        self.polls += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_render_thread_owns_display_and_presents_off_caller_thread():
+    displays = []
+
+    def factory():
+        displays.append(FakeDisplay())
+        return displays[-1]
+
+    r = FakeRenderer()
+    t = ClientRenderThread(r, hz=200.0, display_factory=factory)
+    t.start()
+    time.sleep(0.05)
+    r.dirty = False
+    time.sleep(0.03)
+    t.stop()
+
+    d = displays[0]
+    assert d.owner != threading.get_ident()
+    assert d.presented == r.frames == t.frames >= 3
+    assert d.polls >= 1 and t.skipped >= 1
+    assert d.closed
+    assert t.stats()["frame_ms"]["count"] == t.frames
+
+
+def test_render_thread_counts_dropped_frames_on_overrun():
+    r = FakeRenderer(work_s=0.025)  # 25 ms of work at 100 Hz
+    t = ClientRenderThread(r, hz=100.0)
+    t.start()
+    time.sleep(0.15)
+    t.stop()
+
+    assert t.dropped >= t.frames - 1 > 0
+    assert t.stats()["frame_ms"]["max"] >= 20.0
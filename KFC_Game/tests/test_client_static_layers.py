@@ -0,0 +1,39 @@
+import pathlib
+
+import numpy as np
+
+from ..client.renderer import ClientRenderer
+from ..graphics.graphics_factory import ImgFactory, MockImgFactory
+from ..server.game_factory import create_game
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+class CountingImgFactory(ImgFactory):
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, *args, **kwargs):
+        self.paths.append(pathlib.Path(args[0]).name)
+        return super().__call__(*args, **kwargs)
+
+
+def test_static_layers_are_decoded_once_and_framebuffers_reused():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    loader = CountingImgFactory()
+    r = ClientRenderer(game.board, PIECES_DIR, loader)
+
+    r.render_snapshot({"version": 1, "pieces": [{"id": "PW_(6, 0)", "cell": (6, 0)}]})
+    buffers = {id(r.frame())}
+    with_piece = r.frame().copy()
+    for v in (2, 3, 4):
+        r.render_snapshot({"version": v, "pieces": []})
+        buffers.add(id(r.frame()))
+
+    assert loader.paths.count("table_bg_13in.png") == 1
+    assert loader.paths.count("board.png") == 1
+    assert len(buffers) == 2  # double-buffered, no per-snapshot allocation
+
+    # the framebuffer is reset from the static composite, no stale pieces
+    assert not np.array_equal(r.frame(), with_piece)
+    assert np.array_equal(r.frame(), r._static.img)
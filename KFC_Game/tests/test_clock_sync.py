@@ -0,0 +1,63 @@
+import asyncio
+import json
+import pathlib
+
+import pytest
+import websockets
+
+from ..client.clock_sync import ClockSync
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.ws_server import WSHub
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def test_offset_comes_from_the_least_delayed_probe():
+    sync = ClockSync(window=4)
+    assert not sync.synced and sync.offset_ms is None
+    server_ahead = 5000.0
+    # (send time, uplink ms, downlink ms); the queued probes are asymmetric
+    for t0, up, down in ((0, 40, 10), (100, 10, 10), (200, 5, 60)):
+        t1 = t0 + up + server_ahead
+        t2 = t1 + 1
+        sync.add_sample(t0, t1, t2, t0 + up + 1 + down)
+    assert sync.offset_ms == server_ahead
+    assert 20 <= sync.srtt <= 65
+
+    sync.reset()
+    assert not sync.synced
+
+
+async def _next(agen, typ):
+    while (evt := await asyncio.wait_for(agen.__anext__(), 2.0)).type != typ:
+        pass
+    return evt
+
+
+@pytest.mark.asyncio
+async def test_ws_client_estimates_offset_and_stamps_commands_in_server_time():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game.START_NS -= 7_000_000_000  # server game clock far from the client's
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    received = []
+    loop = asyncio.get_running_loop()
+    hub = WSHub(game.bus, received.append, loop, game)
+    async with websockets.serve(hub.handler, "127.0.0.1", 8816):
+        c = await WSClient("ws://127.0.0.1:8816").connect(player="W")
+        agen = c.events()
+        await _next(agen, EventType.STATE_SNAPSHOT)  # welcome
+        await c._ws.send(json.dumps({"kind": "get_snapshot"}))  # answered after the probes
+        await _next(agen, EventType.STATE_SNAPSHOT)
+        assert c.clock.samples == 4
+
+        assert c.rtt_ms is not None and c.rtt_ms < 50
+        assert abs(c.server_time_ms() - game.game_time_ms()) < 25
+
+        await c.send_command(Command(123, "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+        await _next(agen, EventType.COMMAND_RESULT)
+        assert abs(received[0].timestamp - game.game_time_ms()) < 50
+        await c._ws.close()
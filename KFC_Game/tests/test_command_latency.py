@@ -0,0 +1,57 @@
+import asyncio
+import pathlib
+
+import pytest
+import websockets
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.ws_server import WSHub
+from ..shared.command import Command
+from ..shared.event import EventType
+from ..shared.latency import server_stages
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def test_server_stages_from_stamps():
+    stages = server_stages({"received": 10.0, "dequeued": 14.0, "applied": 14.5, "broadcast": 15.0})
+    assert stages == {"queue": 4.0, "apply": 0.5, "broadcast": 0.5, "server": 5.0}
+    assert server_stages({"received": 1.0}) == {}
+
+
+@pytest.mark.parametrize("batch, port", [(False, 8814), (True, 8815)])
+@pytest.mark.asyncio
+async def test_applied_result_echoes_stamps_and_both_sides_aggregate(batch, port):
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    loop = asyncio.get_running_loop()
+    hub = WSHub(game.bus, game.user_input_queue.put, loop, game, batch_events=batch)
+    async with websockets.serve(hub.handler, "127.0.0.1", port):
+        c = await WSClient(f"ws://127.0.0.1:{port}").connect(player="W")
+        agen = c.events()
+        cmd = Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)])
+        await c.send_command(cmd)
+
+        results = []
+        while len(results) < 2:
+            evt = await asyncio.wait_for(agen.__anext__(), 2.0)
+            if evt.type == EventType.COMMAND_RESULT:
+                results.append(evt)
+                if evt.payload["status"] == "accepted":
+                    await asyncio.sleep(0.01)  # time spent waiting in the queue
+                    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+        accepted, applied = results
+        assert accepted.payload["status"] == "accepted" and "received" in accepted.payload["stamps"]
+        assert applied.payload["cmd_id"] == cmd.cmd_id
+        st = applied.payload["stamps"]
+        assert st["received"] <= st["dequeued"] <= st["applied"] <= st["broadcast"]
+        assert st["dequeued"] - st["received"] >= 10
+
+        client = c.latency_stats()
+        assert {"rtt", "network", "queue", "apply", "broadcast", "server"} <= set(client)
+        assert client["rtt"]["max"] >= client["server"]["max"]
+        assert hub.latency.summary("queue")["count"] == 1
+        await c._ws.close()
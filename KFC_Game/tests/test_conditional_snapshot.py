@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import json
+import pathlib
+
+import pytest
+import websockets
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..network.protocol import event_from_json
+from ..network.snapshots import SnapshotHistory, apply_delta, make_delta
+from ..server.game_factory import create_game
+from ..server.ws_server import serve
+from ..shared.command import Command
+from ..shared.event import Event, EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _snap(version, pieces):
+    return {"version": version, "time_ms": version * 10, "cursors": [], "pieces": pieces}
+
+
+def test_delta_round_trip_and_bounded_history():
+    base = _snap(1, [{"id": "PW_a", "cell": (6, 0)}, {"id": "PB_b", "cell": (1, 0)},
+                     {"id": "RW_c", "cell": (7, 0)}])
+    cur = _snap(2, [{"id": "PW_a", "cell": (4, 0)}, {"id": "RW_c", "cell": (7, 0)},
+                    {"id": "QW_d", "cell": (5, 5)}])
+    delta = make_delta(base, cur)
+    assert [p["id"] for p in delta["changed"]] == ["PW_a", "QW_d"]
+    assert delta["removed"] == ["PB_b"]
+    assert apply_delta(base, delta) == cur
+
+    hist = SnapshotHistory(maxlen=3)
+    for v in range(5):
+        hist.record(_snap(v, []))
+    assert len(hist) == 3 and hist.get(1) is None and hist.get(4) is not None
+
+
+def test_history_keeps_the_first_copy_of_a_version():
+    moving = {"id": "PW_x", "cell": (6, 0), "state": "move",
+              "motion": {"from": [6, 0], "to": [5, 0], "start_ms": 40, "speed_m_s": 1.5}}
+    held = _snap(5, [moving, {"id": "PB_y", "cell": (1, 0), "state": "idle"}])
+    arrived = _snap(5, [{"id": "PW_x", "cell": (5, 0), "state": "long_rest"},
+                        {"id": "PB_y", "cell": (1, 0), "state": "idle"}])
+    cur = _snap(6, [arrived["pieces"][0], {"id": "PB_y", "cell": (2, 0), "state": "move"}])
+
+    hist = SnapshotHistory()
+    hist.record(held)
+    hist.record(arrived)  # re-sent under the same version after the move finished
+    assert hist.get(5) is held
+    assert apply_delta(held, make_delta(hist.get(5), cur)) == cur
+
+
+def test_ws_client_expands_deltas_into_snapshots():
+    c = WSClient("ws://127.0.0.1:1")
+    base = _snap(3, [{"id": "PW_a", "cell": [6, 0]}])
+    cur = _snap(4, [{"id": "PW_a", "cell": [5, 0]}])
+    assert c._track_snapshot(Event(EventType.STATE_SNAPSHOT, base, 30)).payload is base
+    out = c._track_snapshot(Event(EventType.STATE_DELTA, make_delta(base, cur), 40))
+    assert out.type == EventType.STATE_SNAPSHOT and out.payload == cur and c.version == 4
+    assert c._track_snapshot(Event(EventType.SNAPSHOT_NOT_MODIFIED, {"version": 4}, 41)) is None
+
+
+@pytest.mark.asyncio
+async def test_join_with_version_gets_not_modified_delta_or_keyframe():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._update_cell2piece_map()
+    srv = asyncio.create_task(serve(game, host="127.0.0.1", port=8809))
+    await asyncio.sleep(0.05)
+
+    async def join(version):
+        async with websockets.connect("ws://127.0.0.1:8809") as ws:
+            await ws.send(json.dumps({"kind": "join", "player": "W", "version": version}))
+            await ws.recv()  # assign_player
+            return event_from_json(await ws.recv())
+
+    try:
+        full = await join(None)
+        assert full.type == EventType.STATE_SNAPSHOT
+        v0 = full.payload["version"]
+
+        assert (await join(v0)).type == EventType.SNAPSHOT_NOT_MODIFIED
+
+        pw = game.pos[(6, 0)][0]
+        game._process_input(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (5, 0)]))
+        delta = await join(v0)
+        assert delta.type == EventType.STATE_DELTA
+        assert delta.payload["base"] == v0 and delta.payload["version"] == v0 + 1
+        assert len(delta.payload["changed"]) < len(full.payload["pieces"])
+        rebuilt = apply_delta(full.payload, delta.payload)
+        assert {p["id"] for p in rebuilt["pieces"]} == {p["id"] for p in full.payload["pieces"]}
+
+        assert (await join(-42)).type == EventType.STATE_SNAPSHOT  # unknown version: keyframe
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
@@ -0,0 +1,75 @@
+import pathlib
+
+import numpy as np
+
+from ..graphics.dirty_rects import DirtyRectCompositor, DrawItem
+from ..graphics.graphics_factory import ImgFactory
+from ..server.game_factory import create_game
+from ..shared.command import Command
+from ..shared.img import Img
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _sprite(value: int, size: int = 4) -> Img:
+    im = Img()
+    im.img = np.full((size, size, 3), value, dtype=np.uint8)
+    return im
+
+
+def _item(key, sprite: Img, x: int, y: int) -> DrawItem:
+    h, w = sprite.img.shape[:2]
+    return DrawItem(key, (x, y, w, h), id(sprite), lambda view: sprite.draw_on(view, x, y))
+
+
+def _full_redraw(bg, board, items):
+    return DirtyRectCompositor(bg, board).render(items).copy()
+
+
+def test_only_changed_rects_are_repainted_and_frame_matches_full_redraw():
+    bg = np.full((40, 60, 3), 10, dtype=np.uint8)
+    board = np.full((20, 20, 4), 50, dtype=np.uint8)
+    a, b = _sprite(200), _sprite(120)
+
+    comp = DirtyRectCompositor(bg, board)
+    comp.render([_item("a", a, 0, 0), _item("b", b, 10, 10)])
+    comp.render([_item("a", a, 0, 0), _item("b", b, 10, 10)])
+    assert comp.last_dirty == []
+
+    # move "b" so it overlaps "a": both old and new rects are repainted
+    items = [_item("a", a, 0, 0), _item("b", b, 2, 2)]
+    frame = comp.render(items)
+    assert 0 < sum(w * h for _, _, w, h in comp.last_dirty) < 40 * 60
+    assert np.array_equal(frame, _full_redraw(bg, board, items))
+
+
+def test_overlay_rect_is_restored_next_frame():
+    bg = np.zeros((40, 60, 3), dtype=np.uint8)
+    board = np.zeros((20, 20, 3), dtype=np.uint8)
+    comp = DirtyRectCompositor(bg, board)
+    comp.render([])
+
+    comp.frame[0:5, 0:5] = 255          # e.g. an announcement box
+    comp.mark_dirty((0, 0, 5, 5))
+    comp.render([])
+    assert not comp.frame.any()
+
+
+def test_game_draw_reuses_static_composite():
+    game = create_game(PIECES_DIR, ImgFactory())
+    game._time_factor = 0  # freeze idle animations so only the jump changes pixels
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game._draw()
+    first = game._compositor.frame.copy()
+
+    game._draw()
+    assert game._compositor.last_dirty == []
+    assert np.array_equal(game._compositor.frame, first)
+
+    game._update_cell2piece_map()
+    pw = game.pos[(6, 0)][0]
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "jump", [(6, 0)]))
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game._draw()
+    dirty_area = sum(w * h for _, _, w, h in game._compositor.last_dirty)
+    assert 0 < dirty_area <= 4 * 64 * 64
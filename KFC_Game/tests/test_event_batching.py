@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import json
+import pathlib
+
+import pytest
+import websockets
+
+from ..graphics.graphics_factory import MockImgFactory
+from ..network.loopback import LoopbackServer
+from ..network.protocol import batch_to_json, coalesce_events, command_to_json, events_from_json
+from ..server.game_factory import create_game
+from ..server.ws_server import serve
+from ..shared.command import Command
+from ..shared.event import Event, EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def test_coalesce_keeps_only_latest_snapshot_and_batch_round_trips():
+    events = [
+        Event(EventType.STATE_SNAPSHOT, {"version": 1}, 10),
+        Event(EventType.CAPTURE, {"captured": "PB"}, 11),
+        Event(EventType.SOUND_PLAY, {"sound": "capture"}, 11),
+        Event(EventType.STATE_SNAPSHOT, {"version": 2}, 12),
+    ]
+    out = coalesce_events(events)
+    assert [e.type for e in out] == [EventType.CAPTURE, EventType.SOUND_PLAY, EventType.STATE_SNAPSHOT]
+    assert out[-1].payload == {"version": 2}
+    assert events_from_json(batch_to_json(out)) == out
+
+
+@pytest.mark.asyncio
+async def test_loopback_delivers_one_batch_per_tick():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._update_cell2piece_map()
+    srv = LoopbackServer(bus=game.bus, put_into_game_queue=game.user_input_queue.put, batch_events=True)
+    srv.start()
+    c = srv.connect_client()
+
+    pw = game.pos[(6, 0)][0]
+    await c.send_command(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)]))
+    await asyncio.sleep(0)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    await asyncio.sleep(0)
+
+    batch = c._ev_q.get_nowait()
+    assert isinstance(batch, list) and c._ev_q.empty()
+    types = [e.type for e in batch]
+    assert EventType.PIECE_MOVED in types and types.count(EventType.STATE_SNAPSHOT) == 1
+
+    agen = c.events()
+    c._ev_q.put_nowait(batch)
+    assert (await agen.__anext__()).type == batch[0].type
+
+
+@pytest.mark.asyncio
+async def test_ws_hub_sends_one_frame_per_tick():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._update_cell2piece_map()
+    srv = asyncio.create_task(serve(game, host="127.0.0.1", port=8806, batch_events=True))
+    await asyncio.sleep(0.05)
+    try:
+        async with websockets.connect("ws://127.0.0.1:8806") as ws:
+            await ws.send(json.dumps({"kind": "join", "player": "W"}))
+            await ws.recv()  # assign_player
+            await ws.recv()  # welcome snapshot
+
+            pw = game.pos[(6, 0)][0]
+            await ws.send(command_to_json(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)])))
+            ack = events_from_json(await ws.recv())
+            assert ack[0].type == EventType.COMMAND_RESULT
+
+            game._run_game_loop(num_iterations=1, is_with_graphics=False)
+            frame = json.loads(await asyncio.wait_for(ws.recv(), timeout=1.0))
+            assert frame["kind"] == "batch"
+            types = [e["type"] for e in frame["events"]]
+            assert EventType.PIECE_MOVED.value in types
+            assert types.count(EventType.STATE_SNAPSHOT.value) == 1
+            with contextlib.suppress(asyncio.TimeoutError):
+                extra = await asyncio.wait_for(ws.recv(), timeout=0.1)
+                raise AssertionError(f"unexpected second frame for one tick: {extra}")
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
@@ -0,0 +1,80 @@
+import asyncio
+import pathlib
+
+import pytest
+import websockets
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.event_log import EventLog
+from ..server.game_factory import create_game
+from ..server.ws_server import WSHub
+from ..shared.command import Command
+from ..shared.event import Event, EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _evt(n):
+    return Event(EventType.SOUND_PLAY, {"n": n}, n)
+
+
+def test_event_log_returns_exactly_the_missed_events():
+    log = EventLog(maxlen=4)
+    for n in range(3):
+        log.append(_evt(n))
+    log.append(Event(EventType.COMMAND_RESULT, {"status": "accepted"}, 3), player="W")
+    assert log.last_seq == 4
+
+    assert [e.seq for e in log.since(1)] == [2, 3]           # other players' results are skipped
+    assert [e.seq for e in log.since(1, player="W")] == [2, 3, 4]
+    assert log.since(4) == []
+    assert log.since(9) is None                                # ahead of us: numbered elsewhere
+    assert log.since(1, log_id="someone-else") is None
+
+    log.append(_evt(5))
+    log.append(_evt(6))                                        # seq 1 and 2 fall out of the ring
+    assert log.since(1) is None
+    assert [e.seq for e in log.since(2)] == [3, 5, 6]
+
+
+async def _next(client, agen, typ, timeout=2.0):
+    while True:
+        evt = await asyncio.wait_for(agen.__anext__(), timeout=timeout)
+        if evt.type == typ:
+            return evt
+
+
+@pytest.mark.parametrize("log_size, port, replayed", [(1024, 8810, True), (2, 8811, False)])
+@pytest.mark.asyncio
+async def test_rejoin_replays_missed_events_or_falls_back_to_snapshot(log_size, port, replayed):
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    loop = asyncio.get_running_loop()
+    hub = WSHub(game.bus, game.user_input_queue.put, loop, game, event_log_size=log_size)
+    async with websockets.serve(hub.handler, "127.0.0.1", port):
+        c = await WSClient(f"ws://127.0.0.1:{port}").connect(player="W")
+        agen = c.events()
+        await _next(c, agen, EventType.STATE_SNAPSHOT)
+        game._process_input(Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+        await _next(c, agen, EventType.PIECE_MOVED)
+        seen = c._last_seq
+        assert seen is not None
+
+        await c._ws.close()
+        await asyncio.sleep(0.02)
+        # while we are away: a black move, its sound and snapshots
+        game._process_input(Command(game.game_time_ms(), "PB_(1, 0)", "move", [(1, 0), (2, 0)]))
+        game._run_game_loop(num_iterations=1, is_with_graphics=False)
+        await asyncio.sleep(0.02)
+
+        c._ws = None
+        moved = await _next(c, agen, EventType.PIECE_MOVED) if replayed else None
+        if replayed:
+            assert moved.payload["to"] == [2, 0] and moved.seq > seen
+            assert hub.rejoins == {"replayed": 1, "snapshot": 0}
+        else:
+            snap = await _next(c, agen, EventType.STATE_SNAPSHOT)
+            assert snap.payload["version"] == game.state_version
+            assert hub.rejoins == {"replayed": 0, "snapshot": 1}
+        await c._ws.close()
@@ -0,0 +1,72 @@
+import asyncio
+import contextlib
+import pathlib
+
+import pytest
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.ws_server import serve_and_tick
+from ..shared.command import Command
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def test_next_wakeup_follows_motion_and_cooldowns():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    assert game.next_wakeup_s() == 0.0  # not started yet
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    assert game.next_wakeup_s() is None  # everybody idle
+
+    pw = game.pos[(6, 0)][0]
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (5, 0)]))
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    assert pw.state.name == "move"
+    assert game.next_wakeup_s() == 0.0  # moving pieces need every tick
+
+    # a jump is a timed cooldown: the ticker may sleep until it expires
+    game2 = create_game(PIECES_DIR, MockImgFactory())
+    game2._run_game_loop(num_iterations=1, is_with_graphics=False)
+    pb = game2.pos[(1, 0)][0]
+    game2.user_input_queue.put(Command(game2.game_time_ms(), pb.id, "jump", [(1, 0)]))
+    game2._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game2._run_game_loop(num_iterations=1, is_with_graphics=False)
+    assert pb.state.name == "jump"
+    wait = game2.next_wakeup_s()
+    assert wait is not None and 0 < wait <= pb.state.physics.duration_s
+
+
+@pytest.mark.asyncio
+async def test_idle_server_sleeps_and_wakes_on_command():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    ticks = 0
+    run = game._run_game_loop
+
+    def counting(*args, **kwargs):
+        nonlocal ticks
+        ticks += 1
+        return run(*args, **kwargs)
+
+    game._run_game_loop = counting
+    srv = asyncio.create_task(serve_and_tick(game, host="127.0.0.1", port=8804, hz=60.0))
+    await asyncio.sleep(0.05)
+    try:
+        await asyncio.sleep(0.3)
+        idle_ticks = ticks
+        assert idle_ticks <= 3  # ~18 ticks at 60 Hz without idle sleep
+
+        c = await WSClient("ws://127.0.0.1:8804").connect(player="W")
+        pw = game.pos[(6, 0)][0]
+        await c.send_command(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (5, 0)]))
+        for _ in range(50):
+            if pw.state.name == "move":
+                break
+            await asyncio.sleep(0.005)
+        assert pw.state.name == "move"
+        await c._ws.close()
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
@@ -0,0 +1,62 @@
+import numpy as np
+
+from ..shared.img import Img
+
+
+def _img(arr: np.ndarray) -> Img:
+    im = Img()
+    im.img = arr
+    return im
+
+
+def test_alpha_blend_matches_float_reference():
+    rng = np.random.default_rng(0)
+    src_arr = rng.integers(0, 256, size=(8, 8, 4), dtype=np.uint8)
+    dst_arr = rng.integers(0, 256, size=(16, 16, 4), dtype=np.uint8)
+
+    a = src_arr[..., 3:4] / 255.0
+    expected = (1 - a) * dst_arr[2:10, 3:11, :3] + a * src_arr[..., :3]
+    dst_alpha = dst_arr[..., 3].copy()
+
+    src = _img(src_arr)
+    dst = _img(dst_arr)
+    src.draw_on(dst, 3, 2)
+
+    diff = np.abs(dst.img[2:10, 3:11, :3].astype(int) - np.rint(expected).astype(int))
+    assert diff.max() <= 1
+    assert np.array_equal(dst.img[..., 3], dst_alpha)
+    # uint8 premultiplied colour plus one inverse-alpha channel: 4 bytes per pixel
+    assert src._blit_premul.nbytes + src._blit_inv_alpha.nbytes == 8 * 8 * 4
+
+
+def test_draw_on_does_not_convert_shared_source():
+    sprite_arr = np.full((4, 4, 3), 77, dtype=np.uint8)
+    sprite = _img(sprite_arr)
+    dst = _img(np.zeros((8, 8, 4), dtype=np.uint8))
+
+    sprite.draw_on(dst, 0, 0)
+
+    assert sprite.img is sprite_arr and sprite.img.shape == (4, 4, 3)
+    assert (dst.img[:4, :4, :3] == 77).all()
+    assert (dst.img[:4, :4, 3] == 0).all()
+
+    opaque = _img(np.dstack([sprite_arr, np.full((4, 4), 255, dtype=np.uint8)]))
+    opaque.draw_on(dst, 4, 4)  # colour copied, canvas alpha kept like the blended path
+    assert (dst.img[4:, 4:, :3] == 77).all() and (dst.img[4:, 4:, 3] == 0).all()
+
+
+def test_blit_cache_follows_in_place_edits():
+    src = _img(np.zeros((4, 4, 4), dtype=np.uint8))  # fully transparent
+    dst = _img(np.zeros((4, 4, 3), dtype=np.uint8))
+    canvas = _img(np.zeros((4, 4, 4), dtype=np.uint8))
+
+    src.draw_on(canvas, 0, 0)
+    assert not canvas.img.any()
+
+    src.img[...] = 255
+    src.draw_rect(0, 0, 3, 3, (255, 255, 255, 255))  # any mutator invalidates the cache
+    src.draw_on(canvas, 0, 0)
+    assert (canvas.img[..., :3] == 255).all()
+
+    src.draw_on(dst, 0, 0)  # BGRA onto BGR keeps the opaque paste
+    assert (dst.img == 255).all()
@@ -0,0 +1,84 @@
+import pathlib
+
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.jitter_buffer import JitterBuffer
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _cmd(ts, pid="PW_(6, 0)"):
+    return Command(ts, pid, "move", [(6, 0), (5, 0)])
+
+
+def test_release_order_follows_timestamps_within_a_bounded_delay():
+    jb = JitterBuffer(delay_ms=30)
+    fast, slow = _cmd(100, "PB_(1, 0)"), _cmd(90, "PW_(6, 0)")
+    jb.push(fast, arrival_ms=120)
+    jb.push(slow, arrival_ms=125)  # stamped earlier, arrived later
+    assert jb.pop_ready(124) == []
+    assert jb.pop_ready(125) == [slow]
+    assert jb.pop_ready(130) == [fast]
+    assert jb.reordered == 1
+
+    jb.push(_cmd(0), arrival_ms=500)      # already past its deadline: no wait
+    jb.push(_cmd(9999), arrival_ms=500)   # stamped in the future: waits at most delay_ms
+    assert len(jb.pop_ready(500)) == 1 and jb.late == 2  # the slow link was late too
+    assert jb.next_release_ms() == 530
+    assert len(jb.pop_ready(530)) == 1
+    st = jb.stats()
+    assert st["released"] == 4 and st["depth"] == 0 and st["held_ms"]["max"] == 30
+
+
+def test_timestamps_are_clamped_to_the_delay_around_arrival():
+    jb = JitterBuffer(delay_ms=30)
+    early, future, ok = _cmd(0), _cmd(9999, "PB_(1, 0)"), _cmd(490, "PW_(6, 1)")
+    for cmd in (future, early, ok):
+        jb.push(cmd, arrival_ms=500)
+    assert (early.timestamp, future.timestamp, ok.timestamp) == (470, 500, 490)
+    # a far-future stamp no longer sorts after commands it arrived with and
+    # was meant to precede, nor starts its move in the future
+    assert jb.pop_ready(530) == [early, ok, future]
+    assert jb.stats()["clamped"] == 2
+
+
+def test_clamped_timestamp_is_the_move_start():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game.set_virtual_time(1000)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game.set_input_delay(30)
+    game.user_input_queue.put(Command(60_000, "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game.set_virtual_time(1030)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    pawn = next(p for p in game.snapshot()["pieces"] if p["id"] == "PW_(6, 0)")
+    assert pawn["motion"]["start_ms"] == 1000
+    assert game.jitter.stats()["clamped"] == 1
+
+
+def test_game_applies_buffered_commands_in_timestamp_order():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game.set_virtual_time(1000)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game.set_input_delay(30)
+    moved = []
+    game.bus.subscribe(EventType.PIECE_MOVED, lambda e: moved.append(e.payload["player"]))
+
+    game.user_input_queue.put(Command(1000, "PB_(1, 0)", "move", [(1, 0), (2, 0)]))
+    game.user_input_queue.put(Command(995, "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+    game.set_virtual_time(1010)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    assert moved == [] and len(game.jitter) == 2
+    assert game.next_wakeup_s() is not None
+
+    game.set_virtual_time(1030)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    assert moved == ["white", "black"]
+    assert game.jitter.stats()["reordered"] == 1
+
+    game.user_input_queue.put(Command(1030, "PW_(6, 1)", "move", [(6, 1), (5, 1)]))
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game.set_input_delay(0)  # turning it off hands held commands back to the queue
+    assert game.jitter is None and game.user_input_queue.qsize() == 1
@@ -0,0 +1,88 @@
+import pathlib
+import time
+
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.journal import CommandJournal, open_journal, read_journal, recover, JOURNAL_FILE
+from ..shared.command import Command
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _advance(game, until_ms, step_ms=50):
+    t = game.game_time_ms()
+    while t < until_ms:
+        t = min(t + step_ms, until_ms)
+        game.set_virtual_time(t)
+        game._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+
+def _cells(game):
+    return {p.id: p.current_cell() for p in game.pieces}
+
+
+def test_record_only_queues_and_torn_tail_is_ignored(tmp_path):
+    j = CommandJournal(tmp_path, checkpoint_every_s=3600)
+    t0 = time.perf_counter()
+    for i in range(200):
+        j.record(Command(i, "PW_(6, 0)", "move", [(6, 0), (5, 0)]), i)
+    assert (time.perf_counter() - t0) < 0.5
+    assert j.flush()
+    j.close()
+
+    path = tmp_path / JOURNAL_FILE
+    with path.open("ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")  # crash in the middle of a write
+    recs = list(read_journal(path))
+    assert [r.seq for r in recs] == list(range(1, 201))
+    assert recs[0].cmd.params == [(6, 0), (5, 0)]
+
+
+def test_checkpoint_plus_journal_tail_recovers_the_game(tmp_path):
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game.set_virtual_time(0)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    game.journal = CommandJournal(tmp_path, checkpoint_every_s=3600)
+
+    game.user_input_queue.put(Command(100, "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+    _advance(game, 6000)
+    game.journal.checkpoint(game)  # covers the first move
+
+    game.user_input_queue.put(Command(6100, "PB_(1, 0)", "move", [(1, 0), (2, 0)]))
+    _advance(game, 12000)
+    game.journal.flush()
+    game.journal.close()
+    expected, version = _cells(game), game.state_version
+    assert expected["PW_(6, 0)"] == (5, 0) and expected["PB_(1, 0)"] == (2, 0)
+
+    fresh = create_game(PIECES_DIR, MockImgFactory())
+    info = recover(fresh, tmp_path)
+    assert info["checkpoint_seq"] == 1 and info["replayed"] == 1 and info["last_seq"] == 2
+    _advance(fresh, fresh.game_time_ms() + 6000)  # let the replayed move land
+    assert _cells(fresh) == expected
+    assert fresh.state_version == version
+
+
+def test_torn_tail_is_cut_before_appending(tmp_path):
+    j = CommandJournal(tmp_path, checkpoint_every_s=3600)
+    j.record(Command(100, "PW_(6, 0)", "move", [(6, 0), (5, 0)]), 100)
+    j.flush()
+    j.close()
+    path = tmp_path / JOURNAL_FILE
+    intact = path.stat().st_size
+    with path.open("ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    game = create_game(PIECES_DIR, MockImgFactory())
+    journal = open_journal(game, tmp_path, checkpoint_every_s=3600)
+    assert path.stat().st_size == intact
+    game.user_input_queue.put(Command(game.game_time_ms(), "PB_(1, 0)", "move", [(1, 0), (2, 0)]))
+    _advance(game, game.game_time_ms() + 100)
+    journal.flush()
+    journal.close()
+    assert [r.seq for r in read_journal(path)] == [1, 2]
+
+    for _ in range(2):  # the appended record survives every later recovery
+        fresh = create_game(PIECES_DIR, MockImgFactory())
+        info = recover(fresh, tmp_path)
+        assert info["last_seq"] == 2 and info["valid_bytes"] == path.stat().st_size
@@ -0,0 +1,56 @@
+from ..main import run_replay
+from ..server.journal import CommandJournal, JournalRecord
+from ..server.keyframes import KEYFRAMES_FILE, KeyframeIndex, build_keyframes, seek
+from ..server.replay import replay
+from ..shared.command import Command
+
+RECORDS = [
+    JournalRecord(1, 100, Command(100, "PW_(6, 4)", "move", [(6, 4), (4, 4)])),
+    JournalRecord(2, 300, Command(300, "PB_(1, 3)", "move", [(1, 3), (3, 3)])),
+    JournalRecord(3, 5000, Command(5000, "PW_(6, 4)", "move", [(4, 4), (3, 3)])),
+    JournalRecord(4, 9000, Command(9000, "NB_(0, 1)", "move", [(0, 1), (2, 2)])),
+]
+
+
+def _pieces(result):
+    return sorted((p["id"], tuple(p["cell"]), p["state"]) for p in result.final["pieces"])
+
+
+def test_seek_matches_a_full_replay_and_only_simulates_the_gap(tmp_path):
+    index = build_keyframes(RECORDS, interval_ms=2000)
+    assert [k.time_ms // 2000 for k in index.keyframes][:5] == [1, 2, 3, 4, 5]
+    index.save(tmp_path)
+    index = KeyframeIndex.load(tmp_path)
+
+    for t in (1500, 5300, 9100, 13000):
+        full = replay(RECORDS, until_ms=t, collect_events=False)
+        fast = seek(RECORDS, index, t)
+        assert _pieces(fast) == _pieces(full), t
+        assert fast.stats["scores"] == full.stats["scores"]
+        assert fast.stats["state_version"] == full.stats["state_version"]
+        assert fast.stats["commands"] == full.stats["commands"]
+        # bounded by the interval (2000 ms at 60 Hz) plus one tick per command
+        assert fast.stats["ticks"] <= 2000 / (1000 / 60) + len(RECORDS) + 2
+
+
+def test_a_stale_keyframe_index_is_rebuilt(tmp_path):
+    def _journal(records, start_seq=0):
+        j = CommandJournal(tmp_path, checkpoint_every_s=3600, start_seq=start_seq)
+        for rec in records:
+            j.record(rec.cmd, rec.applied_ms)
+        j.flush()
+        j.close()
+
+    _journal(RECORDS[:2])
+    run_replay(tmp_path, seek_ms=9500)
+    index = KeyframeIndex.load(tmp_path / KEYFRAMES_FILE)
+    assert (index.records, index.last_seq, index.hz) == (2, 2, 60.0)
+
+    _journal(RECORDS[2:], start_seq=2)  # the game went on after the index was built
+    fast = run_replay(tmp_path, seek_ms=9500)
+    assert _pieces(fast) == _pieces(replay(RECORDS, until_ms=9500, collect_events=False))
+    assert fast.stats["commands"] == len(RECORDS)
+    assert KeyframeIndex.load(tmp_path / KEYFRAMES_FILE).records == len(RECORDS)
+
+    run_replay(tmp_path, hz=30.0, seek_ms=9500)
+    assert KeyframeIndex.load(tmp_path / KEYFRAMES_FILE).hz == 30.0
@@ -0,0 +1,72 @@
+import pathlib
+
+from ..shared.command import Command
+from ..graphics.graphics import Graphics
+from ..graphics.graphics_factory import GraphicsFactory, MockImgFactory
+from ..server.game_factory import create_game
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+SPRITES_DIR = PIECES_DIR / "PW" / "states" / "idle" / "sprites"
+
+
+class CountingImgFactory(MockImgFactory):
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, *args, **kwargs):
+        self.paths.append(pathlib.Path(args[0]))
+        return super().__call__(*args, **kwargs)
+
+
+def test_lazy_graphics_loads_on_first_get_img():
+    loader = CountingImgFactory()
+    gfx = Graphics(SPRITES_DIR, (32, 32), img_loader=loader, fps=10.0, lazy=True)
+    assert not gfx.is_loaded
+    assert loader.paths == []
+
+    # advancing the animation clock must not decode sprites
+    gfx.reset(Command(0, "PW", "idle", []))
+    gfx.update(250)
+    assert not gfx.is_loaded
+    assert gfx.cur_frame == 2
+
+    gfx.get_img()
+    assert gfx.is_loaded
+    assert len(loader.paths) == len(list(SPRITES_DIR.glob("*.png")))
+
+
+def test_create_game_does_not_decode_unvisited_states():
+    loader = CountingImgFactory()
+    game = create_game(PIECES_DIR, loader, lazy_sprites=True)
+    loaded_states = {p.parent.parent.name for p in loader.paths if p.parent.name == "sprites"}
+    assert loaded_states == set()
+
+    game._update_cell2piece_map()
+    pawn = game.pos[(6, 0)][0]
+    pawn.state.graphics.get_img()
+    loaded_states = {p.parent.parent.name for p in loader.paths if p.parent.name == "sprites"}
+    assert loaded_states == {"idle"}
+
+
+def test_create_game_decodes_up_front_by_default():
+    loader = CountingImgFactory()
+    create_game(PIECES_DIR, loader)
+    loaded_states = {p.parent.parent.name for p in loader.paths if p.parent.name == "sprites"}
+    assert {"idle", "move", "jump"} <= loaded_states
+
+
+def test_prefetch_warms_idle_then_move_first():
+    loader = CountingImgFactory()
+    gf = GraphicsFactory(loader, lazy=True)
+    for state in ("jump", "long_rest", "move", "idle"):
+        gf.load(PIECES_DIR / "PW" / "states" / state / "sprites", cfg={}, cell_size=(32, 32))
+
+    t = gf.prefetch(background=True)
+    t.join(timeout=5.0)
+
+    order = []
+    for p in loader.paths:
+        name = p.parent.parent.name
+        if not order or order[-1] != name:
+            order.append(name)
+    assert order == ["idle", "move", "long_rest", "jump"]
@@ -0,0 +1,62 @@
+import asyncio
+import contextlib
+import json
+import pathlib
+
+import pytest
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.ws_server import serve_and_tick
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.decode().partition("\r\n\r\n")
+    return head.split("\r\n")[0], body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_ticks_traffic_and_commands():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    srv = asyncio.create_task(serve_and_tick(game, host="127.0.0.1", port=8812, metrics_port=8813))
+    await asyncio.sleep(0.1)
+    try:
+        c = await WSClient("ws://127.0.0.1:8812").connect(player="W")
+        agen = c.events()
+        await c.send_command(Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+        await c.send_command(Command(game.game_time_ms(), "PB_(1, 0)", "move", [(1, 0), (2, 0)]))
+        while (await asyncio.wait_for(agen.__anext__(), 2.0)).type != EventType.PIECE_MOVED:
+            pass
+        await asyncio.sleep(0.1)
+
+        status, text = await _get(8813, "/metrics")
+        assert status.endswith("200 OK")
+        lines = text.splitlines()
+        assert "kfc_clients_connected 1" in lines
+        assert 'kfc_commands_total{status="accepted"} 1' in lines
+        assert 'kfc_commands_rejected_total{reason="wrong player"} 1' in lines
+        assert any(l.startswith('kfc_messages_sent_total{type="piece_moved"} ') for l in lines)
+        assert any(l.startswith('kfc_bytes_sent_total{type="state_snapshot"} ') for l in lines)
+        assert any(l.startswith("kfc_tick_duration_ms_count ") and int(l.split()[1]) > 0 for l in lines)
+        assert any(l.startswith('kfc_tick_phase_ms{phase="update",quantile="0.99"}') for l in lines)
+        assert any(l.startswith("kfc_snapshot_encode_ms_count ") for l in lines)
+        assert any(l.startswith("kfc_client_send_queue_depth{client=\"W@127.0.0.1:") for l in lines)
+
+        _, body = await _get(8813, "/metrics.json")
+        assert json.loads(body)["input_queue_depth"] == 0
+        assert (await _get(8813, "/nope"))[0].endswith("404 Not Found")
+        await c._ws.close()
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
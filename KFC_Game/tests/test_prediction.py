@@ -0,0 +1,143 @@
+import asyncio
+import pathlib
+
+import pytest
+import websockets
+
+from ..client.input_handler import ToWSQueue
+from ..client.prediction import MovePredictor, rules_from_pieces
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.ws_server import WSHub
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _entry(payload, pid):
+    return next(p for p in payload["pieces"] if p["id"] == pid)
+
+
+def test_predicted_move_is_shown_at_once_then_confirmed_or_rolled_back():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    now = [10.0]
+    shown = []
+    pred = MovePredictor(rules_from_pieces(game.pieces), shown.append, color="W", clock=lambda: now[0])
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    first = game.snapshot()
+    pred.on_snapshot(first)
+    assert pred.check("PW_(6, 0)", (3, 0)) == "illegal move"
+    assert pred.check("PB_(1, 0)", (2, 0)) == "wrong player"
+
+    # stamped by the clock sync, which need not match the snapshot estimate
+    cmd = Command(first["time_ms"] + 30, "PW_(6, 0)", "move", [(6, 0), (5, 0)])
+    now[0] += 0.05
+    assert pred.predict(cmd, start_ms=cmd.timestamp) and cmd.cmd_id is not None
+    motion = _entry(shown[-1], "PW_(6, 0)")["motion"]
+    assert motion["to"] == [5, 0] and motion["start_ms"] == cmd.timestamp
+    assert abs(shown[-1]["time_ms"] - (first["time_ms"] + 50)) < 1e-6
+    assert pred.check("PW_(6, 0)", (4, 0)) == "busy"
+
+    # the server applies it and starts the move at the same time: no jump
+    game.user_input_queue.put(cmd)
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    pred.on_result({"cmd_id": cmd.cmd_id, "status": "applied"})
+    pred.on_snapshot(game.snapshot())
+    assert pred.confirmed == 1 and not pred.pending
+    assert _entry(shown[-1], "PW_(6, 0)")["motion"] == motion
+
+    # refused: the piece snaps back and the server's reason is kept
+    rejected = Command(0, "PW_(6, 1)", "move", [(6, 1), (5, 1)])
+    assert pred.predict(rejected)
+    pred.on_result({"cmd_id": rejected.cmd_id, "status": "rejected", "reason": "illegal move"})
+    assert "motion" not in _entry(shown[-1], "PW_(6, 1)")
+    assert pred.last_rollback == ("PW_(6, 1)", "illegal move")
+
+    # never answered, and no snapshot comes either
+    assert pred.predict(Command(0, "PW_(6, 2)", "move", [(6, 2), (5, 2)]))
+    now[0] += 2.0
+    pred.tick()
+    assert "motion" not in _entry(shown[-1], "PW_(6, 2)")
+    assert pred.stats() == {"predicted": 3, "confirmed": 1, "pending": 0,
+                            "rollbacks": {"illegal move": 1, "timeout": 1}}
+
+
+def test_idle_is_worked_out_from_stale_entries():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    rules = rules_from_pieces(game.pieces)
+    now = [0.0]
+    pred = MovePredictor(rules, color="W", clock=lambda: now[0])
+    travel = rules["PW"].travel_ms((6, 0), (5, 0))
+    rest = rules["PW"].duration_ms["long_rest"]
+    # the last snapshot still shows the pawn moving; none follows when it
+    # arrives or when its rest ends
+    pred.on_snapshot({"version": 2, "time_ms": 1000, "cursors": [], "pieces": [
+        {"id": "PW_(6, 0)", "cell": (6, 0), "state": "move",
+         "motion": {"from": [6, 0], "to": [5, 0], "start_ms": 1000, "speed_m_s": rules["PW"].speed_m_s}},
+        {"id": "PW_(6, 1)", "cell": (6, 1), "state": "short_rest", "until_ms": 1500},
+    ]})
+    assert pred.check("PW_(6, 0)", (4, 0)) == "busy"
+    assert pred.check("PW_(6, 1)", (5, 1)) == "busy"
+    now[0] = (travel + rest + 1) / 1000.0
+    assert pred.check("PW_(6, 0)", (4, 0)) is None
+    assert pred.check("PW_(6, 0)", (3, 0)) == "illegal move"  # no double step after the first move
+    assert pred.check("PW_(6, 1)", (5, 1)) is None
+
+
+@pytest.mark.asyncio
+async def test_commands_are_stamped_before_predicting_and_time_out_on_a_timer():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    shown, sent = [], []
+
+    class _WS:
+        def stamp_command(self, cmd):
+            cmd.timestamp = 4242
+            return True
+
+        async def send_command(self, cmd, *, stamped=False):
+            sent.append((cmd, stamped))
+
+    pred = MovePredictor(rules_from_pieces(game.pieces), shown.append, timeout_ms=30)
+    pred.on_snapshot(game.snapshot())
+    queue = ToWSQueue(_WS(), asyncio.get_running_loop(), pred)
+    queue._predict_and_send(Command(0, "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+    await asyncio.sleep(0)
+    assert _entry(shown[-1], "PW_(6, 0)")["motion"]["start_ms"] == 4242
+    assert sent[0][0].timestamp == 4242 and sent[0][1]
+
+    await asyncio.sleep(0.1)  # the server never answers
+    assert pred.rollbacks["timeout"] == 1
+    assert "motion" not in _entry(shown[-1], "PW_(6, 0)")
+
+
+@pytest.mark.asyncio
+async def test_hub_reports_moves_the_rules_refuse():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    loop = asyncio.get_running_loop()
+    hub = WSHub(game.bus, game.user_input_queue.put, loop, game)
+    async with websockets.serve(hub.handler, "127.0.0.1", 8817):
+        c = await WSClient("ws://127.0.0.1:8817").connect(player="W")
+        agen = c.events()
+        illegal = Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (3, 0)])
+        legal = Command(game.game_time_ms(), "PW_(6, 1)", "move", [(6, 1), (5, 1)])
+        await c.send_command(illegal)
+        await c.send_command(legal)
+
+        final = {}
+        while len(final) < 2:
+            evt = await asyncio.wait_for(agen.__anext__(), 2.0)
+            if evt.type != EventType.COMMAND_RESULT:
+                continue
+            if evt.payload["status"] == "accepted":
+                game._run_game_loop(num_iterations=1, is_with_graphics=False)
+            else:
+                final[evt.payload["cmd_id"]] = evt.payload
+
+        assert final[illegal.cmd_id]["status"] == "rejected"
+        assert final[illegal.cmd_id]["reason"] == "illegal move"
+        assert final[legal.cmd_id]["status"] == "applied"
+        await c._ws.close()
@@ -0,0 +1,76 @@
+import pathlib
+import time
+
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..shared.command import Command
+from ..shared.profiling import PhaseProfiler
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def test_phase_profiler_sums_repeated_phases_per_tick():
+    now = [0.0]
+    prof = PhaseProfiler(("a", "b"), clock=lambda: now[0])
+    for _ in range(3):
+        prof.begin()
+        now[0] += 0.001
+        prof.mark("a")
+        now[0] += 0.004
+        prof.mark("b")
+        now[0] += 0.002
+        prof.mark("a")
+        prof.end()
+
+    st = prof.stats()
+    assert st["phases"]["a"]["count"] == 3 and round(st["phases"]["a"]["p50"], 6) == 3.0
+    assert round(st["phases"]["b"]["max"], 6) == 4.0
+    assert round(st["tick"]["p99"], 6) == 7.0
+    assert "a" in prof.dump().splitlines()[2]
+
+
+def test_game_loop_reports_phase_timings_only_when_enabled():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=2, is_with_graphics=False)
+    assert game.profile_stats() is None
+
+    game.enable_profiling()
+    game._run_game_loop(num_iterations=3, is_with_graphics=False)
+    st = game.profile_stats()
+    assert st["tick"]["count"] == 3
+    assert {"map", "input", "update", "deferred", "collisions", "snapshot"} <= set(st["phases"])
+    assert "draw" not in st["phases"]  # headless ticks never reach the render phases
+    assert all(s["count"] == 3 for s in st["phases"].values())
+
+    game.disable_profiling()
+    assert game.profile_stats() is None
+
+
+def test_watchdog_logs_slow_ticks_with_phase_context_and_stack():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    wd = game.enable_watchdog(budget_ms=10, maxlen=2, sample_stack=True)
+
+    piece = game.pieces[0]
+    real_update = piece.update
+
+    def stalled_update(now):
+        time.sleep(0.04)
+        return real_update(now)
+
+    piece.update = stalled_update
+    try:
+        game.user_input_queue.put(Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+        game._run_game_loop(num_iterations=3, is_with_graphics=False)
+    finally:
+        piece.update = real_update
+        wd.close()
+    game._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+    slow = game.slow_ticks()
+    assert wd.stats()["overruns"] == 3 and len(slow) == 2  # bounded log keeps the latest
+    first = slow[0]
+    assert first["phase"] == "update" and first["tick_ms"] > 10
+    assert first["pieces"] == len(game.pieces) and first["queue_depth"] == 0
+    assert any("stalled_update" in line for line in first["stack"])
+    assert wd.ticks == 4
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from ..shared.scheduler import FixedRateScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_absolute_deadlines_do_not_drift():
+    clock = FakeClock()
+    s = FixedRateScheduler(10.0, clock=clock)
+    clock.t += s.next_delay()  # first call anchors the schedule
+    delays = []
+    for _ in range(5):
+        clock.t += 0.03  # 30 ms of work per 100 ms period
+        d = s.next_delay()
+        delays.append(d)
+        clock.t += d
+    assert all(abs(d - 0.07) < 1e-9 for d in delays)
+    assert abs(clock.t - 0.6) < 1e-9  # exactly 6 periods, work cost absorbed
+    assert s.overruns == 0
+
+
+def test_overrun_catches_up_then_drops_beyond_limit():
+    clock = FakeClock()
+    s = FixedRateScheduler(10.0, max_catch_up=2, clock=clock)
+    clock.t += s.next_delay()
+    clock.t += 0.25  # first tick overruns by 1.5 periods
+    assert s.next_delay() == 0.0
+    assert s.overruns == 1 and s.dropped == 0
+
+    clock.t += 1.0  # way behind: slots beyond max_catch_up are dropped
+    assert s.next_delay() == 0.0
+    assert s.dropped > 0
+    # at most max_catch_up whole periods are left to catch up
+    assert 0.2 <= clock.t - s._deadline < 0.3
+
+
+def test_no_catch_up_drops_the_missed_slot():
+    clock = FakeClock()
+    s = FixedRateScheduler(10.0, catch_up=False, clock=clock)
+    clock.t += s.next_delay()
+    clock.t += 0.15
+    d = s.next_delay()
+    assert abs(d - 0.05) < 1e-9  # waits for the next slot instead of bursting
+    assert s.dropped == 1 and s.overruns == 1
+
+
+def test_adaptive_rate_backs_off_and_recovers():
+    clock = FakeClock()
+    s = FixedRateScheduler(100.0, adaptive=True, min_hz=40.0,
+                           overload_ticks=3, recover_ticks=3, clock=clock)
+    for _ in range(30):
+        clock.t += 0.05  # 50 ms per tick, far over a 10 ms budget
+        clock.t += s.next_delay()
+    assert s.hz == 40.0
+
+    for _ in range(60):
+        clock.t += 0.001
+        clock.t += s.next_delay()
+    assert s.hz == 100.0
+
+
+def test_stats_report_achieved_rate_and_jitter():
+    clock = FakeClock()
+    s = FixedRateScheduler(50.0, clock=clock)
+    for _ in range(20):
+        clock.t += s.next_delay() + 0.001  # woken 1 ms late every time
+        s._on_wake()
+    stats = s.stats()
+    assert abs(stats["achieved_hz"] - 50.0) < 0.5
+    assert abs(stats["jitter_ms"]["p50"] - 1.0) < 1e-6
+    assert stats["ticks"] == 20
+
+
+@pytest.mark.asyncio
+async def test_async_wait_paces_a_loop():
+    s = FixedRateScheduler(200.0)
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    for _ in range(10):
+        await s.wait()
+    assert loop.time() - t0 >= 0.045
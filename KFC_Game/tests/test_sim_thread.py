@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+import pathlib
+import threading
+
+import pytest
+
+from ..client.ws_client import WSClient
+from ..graphics.graphics_factory import MockImgFactory
+from ..server.game_factory import create_game
+from ..server.sim_thread import SimulationThread
+from ..server.ws_server import serve_and_tick
+from ..shared.bus import EventBus
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+@pytest.mark.asyncio
+async def test_events_reach_the_loop_in_one_batch_per_tick():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    loop = asyncio.get_running_loop()
+    out = EventBus()
+    seen = []
+    for et in EventType:
+        out.subscribe(et, lambda e: seen.append((e.type, threading.get_ident())))
+
+    sim = SimulationThread(game, loop, out, hz=200.0)
+    sim.start()
+    try:
+        await asyncio.sleep(0.05)
+        pw = game.piece_by_id["PW_(6, 0)"]
+        sim.submit(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (5, 0)]))
+        for _ in range(100):
+            if any(t == EventType.PIECE_MOVED for t, _ in seen):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        sim.stop()
+
+    assert any(t == EventType.PIECE_MOVED for t, _ in seen)
+    # subscribers on the out bus run on the loop thread, not the simulation thread
+    assert {tid for _, tid in seen} == {threading.get_ident()}
+    assert sim.events >= len(seen) and sim.batches < sim.events
+    assert not sim.is_alive()
+
+
+@pytest.mark.asyncio
+async def test_serve_and_tick_threaded_round_trip():
+    game = create_game(PIECES_DIR, MockImgFactory())
+    srv = asyncio.create_task(serve_and_tick(game, host="127.0.0.1", port=8805, threaded=True))
+    await asyncio.sleep(0.05)
+    try:
+        c = await WSClient("ws://127.0.0.1:8805").connect(player="W")
+        await c.send_command(Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+        agen = c.events()
+        moved = None
+        while moved is None:
+            evt = await asyncio.wait_for(agen.__anext__(), timeout=2.0)
+            if evt.type == EventType.PIECE_MOVED:
+                moved = evt
+        assert tuple(moved.payload["to"]) == (5, 0)
+        await c._ws.close()
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
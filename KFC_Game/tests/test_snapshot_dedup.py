@@ -0,0 +1,59 @@
+import asyncio
+import contextlib
+import json
+import pathlib
+
+import pytest
+import websockets
+
+from ..graphics.graphics_factory import MockImgFactory
+from ..network.protocol import command_to_json, events_from_json
+from ..server.game_factory import create_game
+from ..server.ws_server import serve
+from ..shared.command import Command
+from ..shared.event import EventType
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+async def _drain(ws, seconds=0.2):
+    events = []
+    with contextlib.suppress(asyncio.TimeoutError):
+        while True:
+            events += events_from_json(await asyncio.wait_for(ws.recv(), timeout=seconds))
+    return events
+
+
+@pytest.mark.parametrize("batch_events, port", [(False, 8807), (True, 8808)])
+@pytest.mark.asyncio
+async def test_one_snapshot_per_version_with_merged_cursors(batch_events, port):
+    game = create_game(PIECES_DIR, MockImgFactory())
+    game._update_cell2piece_map()
+    srv = asyncio.create_task(serve(game, host="127.0.0.1", port=port, batch_events=batch_events))
+    await asyncio.sleep(0.05)
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{port}") as ws:
+            await ws.send(json.dumps({"kind": "join", "player": "W"}))
+            welcome = await _drain(ws)
+            v0 = next(e for e in welcome if e.type == EventType.STATE_SNAPSHOT).payload["version"]
+
+            await ws.send(command_to_json(Command(0, "CURSOR", "cursor_update", [1, (5, 5)])))
+            pw = game.pos[(6, 0)][0]
+            await ws.send(command_to_json(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)])))
+            await _drain(ws, 0.05)  # ack
+
+            game._run_game_loop(num_iterations=3, is_with_graphics=False)
+            events = await _drain(ws)
+            assert any(e.type == EventType.PIECE_MOVED for e in events)
+            snaps = [e for e in events if e.type == EventType.STATE_SNAPSHOT]
+            assert [s.payload["version"] for s in snaps] == [v0 + 1]
+            assert snaps[0].payload["cursors"] == [{"player": 1, "cell": [5, 5]}]
+
+            # an explicit request is always answered, even for a version already sent
+            await ws.send(json.dumps({"kind": "get_snapshot"}))
+            again = [e for e in await _drain(ws) if e.type == EventType.STATE_SNAPSHOT]
+            assert [s.payload["version"] for s in again] == [v0 + 1]
+    finally:
+        srv.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await srv
@@ -0,0 +1,40 @@
+import pathlib
+
+import cv2
+import numpy as np
+
+from ..graphics.graphics import Graphics
+from ..graphics.graphics_factory import GraphicsFactory, ImgFactory
+from ..graphics.sprite_pool import SpritePool
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+SPRITES_DIR = PIECES_DIR / "PW" / "states" / "idle" / "sprites"
+
+
+def test_same_sprites_folder_shares_frames():
+    pool = SpritePool()
+    g1 = Graphics(SPRITES_DIR, (32, 32), img_loader=ImgFactory(), sprite_pool=pool)
+    g2 = Graphics(SPRITES_DIR, (32, 32), img_loader=ImgFactory(), sprite_pool=pool)
+
+    assert all(a is b for a, b in zip(g1.frames, g2.frames))
+    rep = pool.report()
+    assert rep.decoded == len(g1.frames)
+    assert rep.frames == 2 * len(g1.frames)
+    assert rep.bytes_saved == rep.bytes_total // 2
+
+
+def test_identical_pixels_in_different_files_share_one_buffer(tmp_path):
+    sprite = np.full((16, 16, 4), 200, dtype=np.uint8)
+    for state in ("idle", "idle_after_first_move"):
+        d = tmp_path / state
+        d.mkdir()
+        cv2.imwrite(str(d / "1.png"), sprite)
+
+    gf = GraphicsFactory(ImgFactory())
+    a = gf.load(tmp_path / "idle", cfg={}, cell_size=(16, 16))
+    b = gf.load(tmp_path / "idle_after_first_move", cfg={}, cell_size=(16, 16))
+
+    assert a.get_img() is b.get_img()
+    rep = gf.dedup_report()
+    assert rep.decoded == 2 and rep.unique == 1
+    assert rep.bytes_saved == sprite.nbytes